@@ -0,0 +1,206 @@
+"""asyncio front end for HurricaneSoft API.
+
+Selected with ``--engine asyncio``. Each client connection is a coroutine,
+so idle keep-alive and long-poll connections cost no OS thread. Once a full
+request (headers + Content-Length body) has been read, it is handed to the
+regular APIHandler on a thread pool: CORS, /api/version, ROUTE_MAP
+dispatch, authenticate(), static serving and every route module's
+handle(method, path, body, user) run unchanged, and blocking DB work never
+runs on the event loop.
+"""
+import asyncio
+import concurrent.futures
+import io
+import itertools
+import socket
+
+from hurricanesoft_api import context
+from hurricanesoft_api.logger import log_error
+
+
+MAX_HEADER_BYTES = 65536
+WRITE_BUFFER_BYTES = 65536
+# Larger request bodies get 413 before they are read (no route takes uploads)
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class _LoopWriter:
+    """File-like wfile that forwards writes from a worker thread to the loop.
+
+    Small writes are buffered and pushed on flush(); each push waits for
+    the transport to drain, so slow clients apply backpressure to the
+    worker instead of growing the transport buffer. A push that does not
+    drain within timeout seconds aborts the connection and raises
+    socket.timeout, like a blocked send() on the threads engine.
+    """
+
+    def __init__(self, loop, writer, timeout):
+        self._loop = loop
+        self._writer = writer
+        self._timeout = timeout
+        self._buf = bytearray()
+
+    def write(self, data):
+        self._buf += data
+        if len(self._buf) >= WRITE_BUFFER_BYTES:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if not self._buf:
+            return
+        data = bytes(self._buf)
+        self._buf.clear()
+        future = asyncio.run_coroutine_threadsafe(self._push(data), self._loop)
+        try:
+            future.result(self._timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self._loop.call_soon_threadsafe(self._writer.transport.abort)
+            raise socket.timeout('write timed out')
+
+    async def _push(self, data):
+        self._writer.write(data)
+        await self._writer.drain()
+
+
+class _BridgeMixin:
+    """Run one already-read request through a BaseHTTPRequestHandler subclass."""
+
+    def __init__(self, raw_request, wfile, client_address, server, served=0):
+        self.request = None
+        self.connection = None
+        self.client_address = client_address
+        self.server = server
+        self.rfile = io.BytesIO(raw_request)
+        self.wfile = wfile
+        self.close_connection = True
+        self.requests_on_connection = served
+        self.handle_one_request()
+        self.wfile.flush()
+
+
+def _content_length(head):
+    """Return the Content-Length declared in a raw header block (0 if absent).
+
+    Returns None for chunked request bodies, which are not supported.
+    """
+    length = 0
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        name = name.strip().lower()
+        if name == b'content-length':
+            length = int(value.strip())
+            if length < 0:
+                raise ValueError('negative Content-Length')
+        elif name == b'transfer-encoding' and b'chunked' in value.lower():
+            return None
+    return length
+
+
+class AsyncioHTTPServer:
+    """Event-loop HTTP server with the same serve_forever/server_close API
+    as ThreadPoolHTTPServer.
+
+    Args:
+        server_address: (host, port) to bind when ``sock`` is not given
+        handler_class: BaseHTTPRequestHandler subclass (APIHandler)
+        workers: Threads in the executor that runs request handlers
+        reuse_port: Bind with SO_REUSEPORT
+        sock: Already-listening socket to serve (pre-fork shared socket)
+    """
+
+    def __init__(self, server_address, handler_class, workers=8, reuse_port=False, sock=None):
+        self.server_address = server_address
+        self.workers = max(1, workers)
+        self.reuse_port = reuse_port
+        self._sock = sock
+        self._bridge = type('Async' + handler_class.__name__, (_BridgeMixin, handler_class), {})
+        self._executor = None
+        self._loop = None
+
+    def _init_worker(self, worker_ids):
+        state = context.worker_state()
+        state.worker_id = next(worker_ids)
+        state.requests = 0
+
+    def _dispatch(self, raw_request, client_address, writer, served):
+        wfile = _LoopWriter(self._loop, writer, self._bridge.timeout)
+        handler = self._bridge(raw_request, wfile, client_address, self, served)
+        return handler.close_connection
+
+    async def _handle_connection(self, reader, writer):
+        peer = writer.get_extra_info('peername') or ('', 0)
+        idle_timeout = self._bridge.timeout
+        served = 0
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), idle_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(b'HTTP/1.1 431 Request Header Fields Too Large\r\n'
+                                 b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+                    break
+                try:
+                    length = _content_length(head)
+                except ValueError:
+                    writer.write(b'HTTP/1.1 400 Bad Request\r\n'
+                                 b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+                    break
+                if length is None:
+                    writer.write(b'HTTP/1.1 411 Length Required\r\n'
+                                 b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(b'HTTP/1.1 413 Content Too Large\r\n'
+                                 b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+                    break
+                body = b''
+                if length:
+                    try:
+                        body = await asyncio.wait_for(reader.readexactly(length), idle_timeout)
+                    except asyncio.TimeoutError:
+                        break
+                close = await self._loop.run_in_executor(
+                    self._executor, self._dispatch, head + body, peer, writer, served)
+                served += 1
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, socket.timeout):
+            pass
+        except Exception as e:
+            log_error('asyncio', f"Connection error from {peer[0]}: {e}")
+        finally:
+            try:
+                await asyncio.wait_for(writer.drain(), idle_timeout)
+            except asyncio.TimeoutError:
+                writer.transport.abort()
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='hs-async-worker',
+            initializer=self._init_worker, initargs=(itertools.count(),))
+        if self._sock is not None:
+            server = await asyncio.start_server(
+                self._handle_connection, sock=self._sock, limit=MAX_HEADER_BYTES)
+        else:
+            host, port = self.server_address
+            server = await asyncio.start_server(
+                self._handle_connection, host, port, limit=MAX_HEADER_BYTES,
+                backlog=128, reuse_address=True, reuse_port=self.reuse_port or None)
+        async with server:
+            await server.serve_forever()
+
+    def serve_forever(self):
+        asyncio.run(self._serve())
+
+    def server_close(self):
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
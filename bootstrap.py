@@ -0,0 +1,66 @@
+"""One-time schema initialization for the tool databases.
+
+memotool, msgtool, announcetool and healthtool expose ``db.init_db``,
+which creates their tables and returns a connection. The route modules
+used it as their connection factory, so schema DDL (and the write lock it
+takes on SQLite) ran on every request. run() calls each tool's init_db
+once at startup; afterwards sqlite_init_fn() hands routes the plain
+``get_conn`` for every tool whose schema is ready, and init_db for tools
+that do not provide get_conn.
+
+A tool whose init fails at startup (database not reachable yet, package
+missing) keeps using init_db per connection, as before.
+"""
+import importlib
+import threading
+
+from hurricanesoft_cli.db_factory import get_connection
+from hurricanesoft_api.logger import log_error, log_info
+
+
+# Tools whose schema is created by db.init_db
+SCHEMA_TOOLS = ('memotool', 'msgtool', 'announcetool', 'healthtool')
+
+_ready = set()
+_lock = threading.Lock()
+
+
+def run(tools=SCHEMA_TOOLS):
+    """Initialise each tool's schema once and record which are ready."""
+    for tool in tools:
+        try:
+            sqlite_db = importlib.import_module(f'{tool}.db')
+        except ImportError:
+            continue
+        try:
+            pg_init = importlib.import_module(f'{tool}.db_pg').get_conn
+        except (ImportError, AttributeError, RuntimeError):
+            pg_init = None
+        try:
+            conn, _ = get_connection(tool, sqlite_init_fn=sqlite_db.init_db, pg_init_fn=pg_init)
+            conn.close()
+        except Exception as e:
+            log_error(tool, f"Schema init failed, will retry per connection: {e}")
+            continue
+        with _lock:
+            _ready.add(tool)
+    if _ready:
+        log_info(f"Schema ready: {', '.join(sorted(_ready))}")
+
+
+def is_ready(tool):
+    """True once tool's schema was initialised in this process."""
+    return tool in _ready
+
+
+def sqlite_init_fn(tool, sqlite_db):
+    """Connection factory for a tool's SQLite module.
+
+    The cheap get_conn once the tool's schema is ready (right away for
+    tools outside SCHEMA_TOOLS), init_db until then; modules without
+    get_conn always use init_db.
+    """
+    get_conn = getattr(sqlite_db, 'get_conn', None)
+    if get_conn is not None and (tool in _ready or tool not in SCHEMA_TOOLS):
+        return get_conn
+    return sqlite_db.init_db
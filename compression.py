@@ -0,0 +1,80 @@
+"""Response compression for HurricaneSoft API.
+
+Negotiates gzip/deflate from the request's Accept-Encoding header and
+compresses bodies above a size threshold. Static assets are compressed
+once when indexed (see static_files.py).
+"""
+import gzip
+import zlib
+
+
+# Bodies smaller than this are sent as-is (overridable via --gzip-min-size)
+MIN_SIZE = 1024
+# zlib level 1-9; 0 disables compression (overridable via --gzip-level)
+LEVEL = 6
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'image/svg+xml',
+)
+
+# Preferred when the client accepts several encodings with the same q-value
+_PREFERENCE = ('gzip', 'deflate')
+
+
+def configure(level=None, min_size=None):
+    """Override the compression level and size threshold."""
+    global LEVEL, MIN_SIZE
+    if level is not None:
+        LEVEL = max(0, min(9, level))
+    if min_size is not None:
+        MIN_SIZE = max(0, min_size)
+
+
+def negotiate(accept_encoding):
+    """Pick a content coding from an Accept-Encoding header.
+
+    Returns 'gzip', 'deflate' or None (identity).
+    """
+    if not accept_encoding or LEVEL == 0:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+    best, best_q = None, 0.0
+    for coding in _PREFERENCE:
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(content_type):
+    """True for text-like content types worth compressing."""
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(data, encoding):
+    """Compress data with the given content coding."""
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=LEVEL, mtime=0)
+    if encoding == 'deflate':
+        return zlib.compress(data, LEVEL)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compressor(encoding):
+    """Return an incremental compressor for streamed bodies."""
+    if encoding == 'gzip':
+        return zlib.compressobj(LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.compressobj(LEVEL, zlib.DEFLATED, zlib.MAX_WBITS)
+    raise ValueError(f"Unsupported encoding: {encoding}")
@@ -0,0 +1,66 @@
+"""Validators for conditional GET requests (ETag / Last-Modified).
+
+JSON responses carry a strong ETag derived from a hash of the
+uncompressed body; compressed representations get the content coding
+appended (``"3f2a...-gzip"``) so each variant has its own tag. Static
+files are tagged with their mtime and size and also carry Last-Modified.
+When the client already holds the current version, server.py answers
+304 Not Modified without a body.
+
+If-None-Match is compared weakly (RFC 9110 13.1.2): the W/ prefix and
+the content-coding suffix are ignored, so a client revalidating a gzip
+copy still matches after switching encodings.
+"""
+import hashlib
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+
+
+def body_etag(body):
+    """Opaque tag for a response body (without quotes or coding suffix)."""
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def file_etag(st):
+    """Opaque tag for a file version from its os.stat() result."""
+    return f'{st.st_mtime_ns:x}.{st.st_size:x}'
+
+
+def header_value(tag, encoding=None):
+    """Quoted ETag header value for the representation sent."""
+    return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+
+def http_date(timestamp):
+    """Format a Unix timestamp for Last-Modified."""
+    return formatdate(timestamp, usegmt=True)
+
+
+def none_match(header, tag):
+    """True if an If-None-Match header lists tag (the client's copy is current)."""
+    if not header:
+        return False
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate.strip('"').split('-', 1)[0] == tag:
+            return True
+    return False
+
+
+def not_modified_since(header, mtime):
+    """True if a file modified at mtime is no newer than If-Modified-Since."""
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return int(mtime) <= since.timestamp()
@@ -0,0 +1,93 @@
+"""Memoized view of the unified config file.
+
+authenticate() and the mail routes used to call load_config() several
+times per request, re-reading and re-parsing ~/.hurricanesoft/config.json
+each time. get() returns a Snapshot instead: the config file is stat'ed
+at most every CHECK_INTERVAL seconds and only re-parsed when its mtime or
+size changed. Each Snapshot also carries the derived sections callers
+need (LIDS settings, default user, admins, mail settings), built once
+per reload.
+
+A reload builds a complete new Snapshot and swaps it in with a single
+assignment, so a request holding a Snapshot always sees one consistent
+version of the config. Snapshots are shared; treat them as read-only.
+"""
+import os
+import threading
+import time
+
+from hurricanesoft_cli import config as cli_config
+
+
+# Seconds between stat() calls on the config file
+CHECK_INTERVAL = 2
+
+_DEFAULT_PATH = os.path.expanduser('~/.hurricanesoft/config.json')
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+class Snapshot:
+    """One parsed version of the config file and its derived sections."""
+
+    __slots__ = ('config', 'lids', 'default_user', 'admins', 'mail', 'signature', 'checked_at')
+
+    def __init__(self, config, signature):
+        self.config = config
+        self.lids = config.get('lids', {})
+        username = config.get('user', {}).get('username', 'default')
+        self.default_user = {'username': username, 'sub': username}
+        self.admins = frozenset(config.get('api', {}).get('admins', []))
+        mail = config.get('mail', {})
+        self.mail = {
+            'email': mail.get('email', ''),
+            'password': mail.get('password', ''),
+            'pop3': {'host': mail.get('pop3_host', ''), 'port': mail.get('pop3_port', 995)},
+            'smtp': {'host': mail.get('smtp_host', ''), 'port': mail.get('smtp_port', 465)},
+            'signature': mail.get('signature', ''),
+        }
+        self.signature = signature
+        self.checked_at = time.monotonic()
+
+
+def config_path():
+    """Path of the unified config file."""
+    return getattr(cli_config, 'CONFIG_PATH', _DEFAULT_PATH)
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def get():
+    """Return the current config Snapshot, reloading it if the file changed."""
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - snapshot.checked_at < CHECK_INTERVAL:
+        return snapshot
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is not None and time.monotonic() - snapshot.checked_at < CHECK_INTERVAL:
+            return snapshot
+        signature = _signature(config_path())
+        if snapshot is not None and signature == snapshot.signature:
+            snapshot.checked_at = time.monotonic()
+            return snapshot
+        return _reload(signature)
+
+
+def _reload(signature):
+    global _snapshot
+    _snapshot = Snapshot(cli_config.load_config() or {}, signature)
+    return _snapshot
+
+
+def invalidate():
+    """Force the next get() to re-read the config file."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
@@ -0,0 +1,112 @@
+"""Per-request timing context.
+
+server.py opens a RequestContext at the start of every request; code
+further down (authentication, dbpool, the router, response encoding)
+adds to it through the module-level helpers without having the request
+passed around. All durations use time.perf_counter(), so they are not
+affected by wall-clock adjustments.
+
+    with context.stage('auth'):
+        user, err = authenticate(self.headers)
+
+Stages do not overlap: time spent in a stage opened inside another one
+(db_connect inside handler) is counted only for the inner stage, so the
+stages of a request add up to at most its total time.
+
+The context is thread-local: each worker thread handles one request at a
+time, and helpers called outside a request are no-ops.
+
+State that should outlive a request but stay private to one worker
+thread (per-worker caches, counters) goes on worker_state(); database
+connections are already per worker through dbpool.
+"""
+import contextlib
+import threading
+import time
+
+
+_local = threading.local()
+_worker_local = threading.local()
+
+
+class RequestContext:
+    """Timings and counters collected while one request is handled."""
+
+    __slots__ = ('method', 'path', 'route', 'start', 'stages', 'bytes_out', 'nested')
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.route = None       # Route template once matched, e.g. /api/todo/<int:item_id>
+        self.start = time.perf_counter()
+        self.stages = {}        # stage name -> seconds
+        self.bytes_out = 0
+        self.nested = 0.0       # seconds in stages inside the open stage
+
+    def elapsed(self):
+        """Seconds since the request started."""
+        return time.perf_counter() - self.start
+
+
+def worker_state():
+    """Return the calling worker thread's private state namespace.
+
+    Only the owning thread touches it, so it needs no locking. Both
+    engines set ``worker_id`` (0 .. workers-1); begin() counts
+    ``requests``.
+    """
+    return _worker_local
+
+
+def begin(method, path):
+    """Start the context for the request handled by this thread."""
+    _worker_local.requests = getattr(_worker_local, 'requests', 0) + 1
+    ctx = _local.ctx = RequestContext(method, path)
+    return ctx
+
+
+def end():
+    """Detach and return this thread's context."""
+    ctx = getattr(_local, 'ctx', None)
+    _local.ctx = None
+    return ctx
+
+
+def current():
+    """Return this thread's RequestContext, or None outside a request."""
+    return getattr(_local, 'ctx', None)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Add the time spent in the block to stage name (accumulating).
+
+    Time spent in stages nested inside the block is left out.
+    """
+    ctx = getattr(_local, 'ctx', None)
+    if ctx is None:
+        yield
+        return
+    outer = ctx.nested
+    ctx.nested = 0.0
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        spent = time.perf_counter() - t0
+        ctx.stages[name] = ctx.stages.get(name, 0.0) + spent - ctx.nested
+        ctx.nested = outer + spent
+
+
+def set_route(template):
+    """Record the route template the request matched."""
+    ctx = getattr(_local, 'ctx', None)
+    if ctx is not None:
+        ctx.route = template
+
+
+def add_bytes(n):
+    """Count n response body bytes written."""
+    ctx = getattr(_local, 'ctx', None)
+    if ctx is not None:
+        ctx.bytes_out += n
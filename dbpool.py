@@ -0,0 +1,315 @@
+"""Per-tool database connection pools.
+
+Route modules used to call hurricanesoft_cli.db_factory.get_connection on
+every request, paying a PostgreSQL handshake (and for some tools a schema
+init) each time. connect() hands out pooled connections instead:
+
+    with dbpool.scope():            # server.py, around handle() + response
+        conn = dbpool.connect('todotool', sqlite_db.get_conn, pg_init)
+
+Connections checked out inside a scope are returned to their pool when
+the scope ends; asking for the same tool twice in one scope returns the
+same connection. Outside a scope connect() behaves like get_connection.
+
+PostgreSQL connections live in one shared pool per tool, bounded by
+MAX_SIZE, checked with ``SELECT 1`` when they have been idle for a while,
+and closed after IDLE_TIMEOUT once more than MIN_SIZE are open; a
+background thread sweeps the pools every REAP_INTERVAL seconds so that
+happens even when traffic stops. SQLite
+connections may only be used by the thread that opened them, so each
+worker thread keeps its own connection per tool instead.
+"""
+import contextlib
+import os
+import threading
+import time
+from collections import deque
+
+from hurricanesoft_cli.db_factory import get_connection
+from hurricanesoft_api import context
+
+
+# Connections kept open per tool even when idle (overridable via --db-pool-min)
+MIN_SIZE = 1
+# Max open connections per tool (overridable via --db-pool-max)
+MAX_SIZE = 10
+# Seconds an idle connection above MIN_SIZE is kept (overridable via --db-pool-idle-timeout)
+IDLE_TIMEOUT = 300
+# Seconds to wait for a free connection when a pool is at MAX_SIZE
+CHECKOUT_TIMEOUT = 10
+# Connections idle for longer than this are pinged before being handed out
+HEALTH_CHECK_AFTER = 5
+# Seconds between background sweeps for connections idle past IDLE_TIMEOUT
+REAP_INTERVAL = 30
+
+_pools = {}
+_pools_lock = threading.Lock()
+_local = threading.local()
+_backends = {}  # tool -> db_type reported by get_connection
+_reaper_pid = None
+
+
+def configure(min_size=None, max_size=None, idle_timeout=None):
+    """Override the pool limits. Call before the first request."""
+    global MIN_SIZE, MAX_SIZE, IDLE_TIMEOUT
+    if max_size is not None:
+        MAX_SIZE = max(1, max_size)
+    if min_size is not None:
+        MIN_SIZE = max(0, min(min_size, MAX_SIZE))
+    if idle_timeout is not None:
+        IDLE_TIMEOUT = max(0, idle_timeout)
+
+
+class Pool:
+    """Connections to one tool's database.
+
+    Args:
+        tool: Tool name, e.g. 'todotool'
+        factory: Callable returning (conn, db_type) like get_connection
+    """
+
+    def __init__(self, tool, factory):
+        self.tool = tool
+        self._factory = factory
+        self._cond = threading.Condition()
+        self._idle = deque()            # (conn, released_at), newest on the right
+        self._local = threading.local()  # SQLite: this thread's (conn, released_at)
+        self.db_type = None
+        self.open = 0
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.waits = 0
+        self.timeouts = 0
+
+    def acquire(self):
+        """Check out a healthy connection, opening one if needed.
+
+        Raises:
+            ConnectionError: the pool stayed exhausted for CHECKOUT_TIMEOUT
+        """
+        while True:
+            entry = self._take()
+            if entry is None:
+                return self._create()
+            conn, released_at = entry
+            if time.monotonic() - released_at < HEALTH_CHECK_AFTER or _ping(conn):
+                with self._cond:
+                    self.reused += 1
+                return conn
+            self._discard(conn)
+
+    def release(self, conn):
+        """Return a connection; it is closed if it cannot be reset."""
+        try:
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        now = time.monotonic()
+        if self.db_type == 'sqlite':
+            with self._cond:
+                self.in_use -= 1
+            if getattr(self._local, 'entry', None) is None:
+                self._local.entry = (conn, now)
+            else:
+                self._close(conn)
+            return
+        with self._cond:
+            self.in_use -= 1
+            self._idle.append((conn, now))
+            stale = self._reap(now)
+            self._cond.notify()
+        for old in stale:
+            _quietly_close(old)
+
+    def reap(self):
+        """Close connections idle past IDLE_TIMEOUT beyond MIN_SIZE."""
+        with self._cond:
+            stale = self._reap(time.monotonic())
+            if stale:
+                self._cond.notify()
+        for old in stale:
+            _quietly_close(old)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'backend': self.db_type,
+                'open': self.open,
+                'in_use': self.in_use,
+                'idle': self.open - self.in_use,
+                'max_size': None if self.db_type == 'sqlite' else MAX_SIZE,
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+            }
+
+    def _take(self):
+        """Pop an idle connection, or reserve a slot for a new one (None)."""
+        entry = getattr(self._local, 'entry', None)
+        if entry is not None:
+            self._local.entry = None
+            with self._cond:
+                self.in_use += 1
+            return entry
+
+        deadline = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    self.in_use += 1
+                    return self._idle.pop()
+                if self.db_type == 'sqlite' or self.open < MAX_SIZE:
+                    self.open += 1
+                    self.in_use += 1
+                    return None
+                if deadline is None:
+                    self.waits += 1
+                    deadline = time.monotonic() + CHECKOUT_TIMEOUT
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise ConnectionError(f"{self.tool}: no free database connection")
+                self._cond.wait(remaining)
+
+    def _create(self):
+        try:
+            conn, db_type = self._factory()
+        except BaseException:
+            with self._cond:
+                self.open -= 1
+                self.in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.db_type = db_type
+            self.created += 1
+        _backends[self.tool] = db_type
+        return conn
+
+    def _discard(self, conn):
+        with self._cond:
+            self.in_use -= 1
+            self.discarded += 1
+        self._close(conn)
+
+    def _close(self, conn):
+        with self._cond:
+            self.open -= 1
+            self._cond.notify()
+        _quietly_close(conn)
+
+    def _reap(self, now):
+        """Drop connections idle past IDLE_TIMEOUT beyond MIN_SIZE (lock held)."""
+        stale = []
+        while (self._idle and self.open > MIN_SIZE
+               and now - self._idle[0][1] > IDLE_TIMEOUT):
+            stale.append(self._idle.popleft()[0])
+            self.open -= 1
+        return stale
+
+
+def _ping(conn):
+    try:
+        cur = conn.cursor()
+        try:
+            cur.execute('SELECT 1')
+            cur.fetchone()
+        finally:
+            cur.close()
+        return True
+    except Exception:
+        return False
+
+
+def _quietly_close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def get_pool(tool, sqlite_init_fn, pg_init_fn=None):
+    """Return the pool for tool, creating it on first use."""
+    pool = _pools.get(tool)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(tool)
+            if pool is None:
+                pool = Pool(tool, lambda: get_connection(
+                    tool, sqlite_init_fn=sqlite_init_fn, pg_init_fn=pg_init_fn))
+                _pools[tool] = pool
+    _ensure_reaper()
+    return pool
+
+
+def _ensure_reaper():
+    # Threads do not survive fork(), so each worker process starts its own
+    global _reaper_pid
+    if _reaper_pid == os.getpid():
+        return
+    with _pools_lock:
+        if _reaper_pid == os.getpid():
+            return
+        _reaper_pid = os.getpid()
+        threading.Thread(target=_reap_loop, name='dbpool-reaper', daemon=True).start()
+
+
+def _reap_loop():
+    while True:
+        time.sleep(REAP_INTERVAL)
+        for pool in list(_pools.values()):
+            pool.reap()
+
+
+def connect(tool, sqlite_init_fn, pg_init_fn=None):
+    """Return a connection to tool's database.
+
+    Inside a scope() the connection comes from the tool's pool and is
+    returned when the scope ends; outside one a fresh connection is opened.
+    """
+    held = getattr(_local, 'held', None)
+    if held is not None and tool in held:
+        return held[tool][1]
+    with context.stage('db_connect'):
+        if held is None:
+            conn, db_type = get_connection(tool, sqlite_init_fn=sqlite_init_fn, pg_init_fn=pg_init_fn)
+            _backends[tool] = db_type
+            return conn
+        pool = get_pool(tool, sqlite_init_fn, pg_init_fn)
+        conn = pool.acquire()
+    held[tool] = (pool, conn)
+    return conn
+
+
+@contextlib.contextmanager
+def scope():
+    """Return every connection checked out on this thread when the block exits."""
+    if getattr(_local, 'held', None) is not None:
+        yield
+        return
+    _local.held = {}
+    try:
+        yield
+    finally:
+        held, _local.held = _local.held, None
+        for pool, conn in held.values():
+            pool.release(conn)
+
+
+def paramstyle(tool):
+    """DB-API paramstyle of tool's database: 'qmark' (?) for SQLite,
+    'pyformat' (%s) for psycopg2, None before the first connection."""
+    db_type = _backends.get(tool)
+    if db_type is None:
+        return None
+    return 'qmark' if db_type == 'sqlite' else 'pyformat'
+
+
+def stats():
+    """Pool counters per tool, for the dashboard and tuning."""
+    return {tool: pool.stats() for tool, pool in sorted(_pools.items())}
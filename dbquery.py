@@ -0,0 +1,605 @@
+"""Database-side pagination for list endpoints.
+
+The tool packages (todotool, memotool, ...) build their list queries
+inside functions such as ``db.list_todos(conn, ..., limit=None)``.
+Instead of duplicating their SQL here, capture() runs such a function
+against a recording connection to obtain the exact SELECT it would
+execute, and paginate() wraps that statement:
+
+    <tool's SELECT ... WHERE ... ORDER BY ...> LIMIT n OFFSET m
+    SELECT COUNT(*) FROM (<tool's SELECT>) AS _q
+
+so only one page of rows is read from SQLite or PostgreSQL. The page is
+still produced by the list function itself: it is called again on a
+connection that runs the paged statement in place of the captured one,
+so whatever it does with the rows (attaching tags, converting types)
+still happens. If it returns fewer rows than it fetched (it filters in
+Python), the page is cut from its full result instead. Totals are cached
+per tool generation (see generations.py) with a short TTL for writes made
+outside this process.
+
+The same capture serves the dashboard's statistics: count_rows() and
+count_by() turn a list function into
+
+    SELECT status AS value, COUNT(*) AS n FROM (<tool's SELECT>) AS _q GROUP BY status
+
+so the database returns a handful of numbers instead of the whole table.
+
+If a list function cannot be captured (it runs several statements or
+already limits its result), the helpers fall back to calling it normally
+and slicing in Python.
+
+stream(raw=True) is for list functions that return their cursor's rows
+unchanged: it returns an iterator that reads the cursor FETCH_SIZE rows
+at a time while server.py streams the response, inside the
+dbpool.scope() that keeps the connection checked out. SQLite steps the
+statement as rows are fetched; psycopg2's default cursor receives the
+whole result on execute.
+
+paginate_keyset() is the cursor mode for deep scrolling. Instead of an
+OFFSET it filters on the sort key of the last row already sent:
+
+    SELECT * FROM (<tool's SELECT>) AS _q
+    WHERE (date IS NULL OR date < ? OR (date = ? AND id < ?))
+    ORDER BY (date IS NULL), date DESC, id DESC LIMIT n
+
+Both SQLite and PostgreSQL push that predicate into the inner query, so
+with an index on the key every page costs about the same however deep
+the client scrolls. Rows with a NULL sort key come last, after all dated
+rows, in either direction. The placeholders follow the
+paramstyle of the backend dbpool connected to. Cursor pages are always
+ordered by the route's keys, newest first, whereas paginate() keeps the
+tool's own ORDER BY, so the two modes may list rows in different orders.
+"""
+import base64
+import functools
+import json
+import math
+import re
+import threading
+import time
+
+from hurricanesoft_api import context, dbpool, generations, streaming
+
+
+# Rows read per fetchmany() while a result is streamed
+FETCH_SIZE = 100
+# Seconds a cached COUNT stays valid even without a generation bump
+COUNT_TTL = 10
+COUNT_CACHE_ENTRIES = 1024
+
+_counts = {}
+_counts_lock = threading.Lock()
+
+_LIMIT_RE = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+
+
+class CaptureError(Exception):
+    """The list function's query could not be captured."""
+
+
+class _RecordingCursor:
+    """Cursor stand-in that records statements and returns no rows."""
+
+    def __init__(self, recorder, cursor_args):
+        self._recorder = recorder
+        self._cursor_args = cursor_args
+        self.description = None
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self._recorder.statements.append((sql, params, self._cursor_args))
+        return self
+
+    def fetchall(self):
+        return []
+
+    def fetchmany(self, size=None):
+        return []
+
+    def fetchone(self):
+        return None
+
+    def __iter__(self):
+        return iter(())
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Recorder:
+    """Connection stand-in passed to a tool's list function."""
+
+    def __init__(self, conn):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, 'statements', [])
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params, ((), {})))
+        return _RecordingCursor(self, ((), {}))
+
+    def cursor(self, *args, **kwargs):
+        return _RecordingCursor(self, (args, kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+
+class Query:
+    """A captured SELECT: statement, parameters and cursor arguments."""
+
+    __slots__ = ('sql', 'params', 'cursor_args')
+
+    def __init__(self, sql, params, cursor_args):
+        self.sql = sql.strip().rstrip(';')
+        self.params = params
+        self.cursor_args = cursor_args
+
+    def cache_key(self):
+        params = self.params
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif params is not None:
+            params = tuple(params)
+        return (self.sql, params)
+
+
+def capture(conn, list_fn, args=(), kwargs=None, limited=False):
+    """Return the Query list_fn(conn, *args, **kwargs) would run.
+
+    Args:
+        limited: Accept a statement that has its own LIMIT (for callers
+            that do not add one)
+
+    Raises:
+        CaptureError: list_fn ran no SELECT, several statements, or
+            (unless limited) a statement that already has a LIMIT
+    """
+    recorder = _Recorder(conn)
+    list_fn(recorder, *args, **(kwargs or {}))
+    statements = recorder.statements
+    if len(statements) != 1:
+        raise CaptureError(f"expected 1 statement, got {len(statements)}")
+    sql, params, cursor_args = statements[0]
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')) or (
+            not limited and _LIMIT_RE.search(sql)):
+        raise CaptureError("not a plain SELECT")
+    return Query(sql, params, cursor_args)
+
+
+def fetch(conn, query, sql=None, params=None):
+    """Run sql (default: the captured statement) with the captured cursor
+    arguments, so rows come back in the shape the tool expects."""
+    args, kwargs = query.cursor_args
+    cur = conn.cursor(*args, **kwargs)
+    params = query.params if params is None else params
+    if params is None:
+        cur.execute(sql or query.sql)
+    else:
+        cur.execute(sql or query.sql, params)
+    return cur
+
+
+def iter_rows(cur, size=FETCH_SIZE):
+    """Yield cur's rows, size at a time, and close it when done.
+
+    The connection must stay checked out until the iterator is exhausted;
+    server.py holds dbpool.scope() until the response has been written.
+    The fetches usually run while the response is serialized, so they are
+    timed as their own db_fetch stage rather than as serialize.
+    """
+    try:
+        while True:
+            with context.stage('db_fetch'):
+                rows = cur.fetchmany(size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        cur.close()
+
+
+def stream(conn, list_fn, args=(), kwargs=None, raw=False):
+    """Iterate list_fn(conn, *args, **kwargs)'s rows.
+
+    Args:
+        raw: list_fn returns its cursor's rows unchanged, so they can be
+            read straight off the cursor instead of through list_fn
+    """
+    if raw:
+        try:
+            query = capture(conn, list_fn, args, kwargs, limited=True)
+        except CaptureError:
+            pass
+        else:
+            return iter_rows(fetch(conn, query))
+    return iter(list_fn(conn, *args, **(kwargs or {})))
+
+
+def _run_page(conn, list_fn, args, kwargs, query, sql, params):
+    """Call list_fn with sql / params run in place of its captured query.
+
+    Returns:
+        list_fn's rows, or None if it returned fewer rows than it fetched
+        (it filters in Python, so a page of the SQL is not a page of it)
+    """
+    paged = _PageConnection(conn, query, sql, params)
+    rows = list(list_fn(paged, *args, **(kwargs or {})))
+    if not paged.replaced or len(rows) != paged.fetched:
+        return None
+    return rows
+
+
+class _PageConnection:
+    """Connection stand-in that swaps the captured statement for a page
+    query and counts the rows fetched from it; everything else (follow-up
+    queries, commits) goes to the real connection."""
+
+    def __init__(self, conn, query, sql, params):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_query', query)
+        object.__setattr__(self, '_page', (sql, params))
+        object.__setattr__(self, 'replaced', False)
+        object.__setattr__(self, 'fetched', 0)
+
+    def _statement(self, sql, params):
+        """(sql, params, is_page) to execute for a statement list_fn runs."""
+        if not self.replaced and sql.strip().rstrip(';') == self._query.sql:
+            object.__setattr__(self, 'replaced', True)
+            return self._page + (True,)
+        return sql, params, False
+
+    def _count(self, n):
+        object.__setattr__(self, 'fetched', self.fetched + n)
+
+    def execute(self, sql, params=None):
+        cur = _PageCursor(self, self._conn.cursor())
+        return cur.execute(sql, params)
+
+    def cursor(self, *args, **kwargs):
+        return _PageCursor(self, self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+
+class _PageCursor:
+    """Cursor wrapper for _PageConnection."""
+
+    def __init__(self, owner, cur):
+        self._owner = owner
+        self._cur = cur
+        self._counting = False
+
+    def execute(self, sql, params=None):
+        sql, params, self._counting = self._owner._statement(sql, params)
+        if params is None:
+            self._cur.execute(sql)
+        else:
+            self._cur.execute(sql, params)
+        return self
+
+    def _seen(self, rows):
+        if self._counting:
+            self._owner._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        return self._seen(self._cur.fetchall())
+
+    def fetchmany(self, *args):
+        return self._seen(self._cur.fetchmany(*args))
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        if row is not None:
+            self._seen((row,))
+        return row
+
+    def __iter__(self):
+        for row in self._cur:
+            self._seen((row,))
+            yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+def count(tool, conn, query):
+    """COUNT(*) of a captured query, cached per tool generation."""
+    return _cached_count(tool, query, None, lambda: _first(
+        fetch(conn, query, f"SELECT COUNT(*) FROM ({query.sql}) AS _q").fetchone()))
+
+
+def count_rows(tool, conn, list_fn, args=(), kwargs=None):
+    """Number of rows list_fn(conn, *args, **kwargs) would return."""
+    try:
+        query = capture(conn, list_fn, args, kwargs)
+    except CaptureError:
+        return len(list_fn(conn, *args, **(kwargs or {})))
+    return count(tool, conn, query)
+
+
+def count_by(tool, conn, list_fn, args=(), kwargs=None, column='status'):
+    """Count list_fn's rows grouped by column.
+
+    Returns:
+        {value: count} for every value of column present in the rows
+    """
+    try:
+        query = capture(conn, list_fn, args, kwargs)
+    except CaptureError:
+        counts = {}
+        for row in list_fn(conn, *args, **(kwargs or {})):
+            value = row[column]
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def run():
+        sql = f"SELECT {column} AS value, COUNT(*) AS n FROM ({query.sql}) AS _q GROUP BY {column}"
+        counts = {}
+        for row in fetch(conn, query, sql).fetchall():
+            if isinstance(row, dict):
+                counts[row['value']] = row['n']
+            else:
+                counts[row[0]] = row[1]
+        return counts
+    return dict(_cached_count(tool, query, column, run))
+
+
+def _cached_count(tool, query, group, compute):
+    key = (tool, generations.current(tool), group) + query.cache_key()
+    now = time.monotonic()
+    hit = _counts.get(key)
+    if hit and now - hit[1] < COUNT_TTL:
+        return hit[0]
+
+    result = compute()
+    with _counts_lock:
+        if len(_counts) >= COUNT_CACHE_ENTRIES:
+            _counts.clear()
+        _counts[key] = (result, now)
+    return result
+
+
+def paginate(tool, conn, list_fn, args=(), kwargs=None, page=1, per_page=20, convert=None):
+    """Return one page of list_fn's rows in the standard envelope.
+
+    Args:
+        tool: Tool name the data belongs to (count cache / generations)
+        conn: Real DB connection
+        list_fn: Tool list function, called as list_fn(conn, *args, **kwargs)
+        convert: Optional row -> dict conversion applied lazily to items
+
+    Returns:
+        {'items', 'total', 'page', 'per_page', 'pages'}
+    """
+    offset = (page - 1) * per_page
+    try:
+        query = capture(conn, list_fn, args, kwargs)
+    except CaptureError:
+        rows = list_fn(conn, *args, **(kwargs or {}))
+        total = len(rows)
+        rows = rows[offset:offset + per_page]
+    else:
+        total = count(tool, conn, query)
+        rows = []
+        if offset < total:
+            sql = f"{query.sql} LIMIT {int(per_page)} OFFSET {int(offset)}"
+            rows = _run_page(conn, list_fn, args, kwargs, query, sql, query.params)
+            if rows is None:
+                rows = list_fn(conn, *args, **(kwargs or {}))
+                total = len(rows)
+                rows = rows[offset:offset + per_page]
+
+    return {
+        'items': (convert(r) for r in rows) if convert else rows,
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': math.ceil(total / per_page) if per_page > 0 else 1,
+    }
+
+
+def encode_cursor(values):
+    """Encode sort-key values as an opaque URL-safe cursor."""
+    raw = json.dumps(list(values), separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor from encode_cursor().
+
+    Raises:
+        ValueError: cursor is malformed or has the wrong number of values
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError('malformed cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('malformed cursor')
+    return values
+
+
+def paginate_keyset(tool, conn, list_fn, args=(), kwargs=None, keys=('id',),
+                    cursor=None, per_page=20, convert=None, descending=True):
+    """Return the page of list_fn's rows after cursor, ordered by keys.
+
+    The page is sorted by keys alone, not by list_fn's ORDER BY.
+
+    Args:
+        tool: Tool name; its dbpool backend decides the placeholder style
+        keys: Sort-key columns, most significant first; the last one
+            must be unique (normally 'id')
+        cursor: next_cursor of the previous page; None or '' for the first
+        descending: Newest first (the order every list endpoint uses)
+
+    Returns:
+        {'items', 'per_page', 'next_cursor'} — next_cursor (None on the
+        last page) is a streaming.Deferred, known once items has been
+        consumed
+
+    Raises:
+        ValueError: cursor is malformed
+    """
+    after = decode_cursor(cursor, len(keys)) if cursor else None
+    try:
+        query = capture(conn, list_fn, args, kwargs)
+    except CaptureError:
+        rows = _keyset_slice(list_fn(conn, *args, **(kwargs or {})),
+                             keys, after, per_page + 1, descending)
+    else:
+        sql, params = _keyset_sql(query, keys, after, per_page + 1, descending,
+                                  dbpool.paramstyle(tool))
+        rows = _run_page(conn, list_fn, args, kwargs, query, sql, params)
+        if rows is None:
+            rows = _keyset_slice(list_fn(conn, *args, **(kwargs or {})),
+                                 keys, after, per_page + 1, descending)
+
+    page = _KeysetPage(rows, per_page, keys)
+    return {
+        'items': (convert(r) for r in page) if convert else page,
+        'per_page': per_page,
+        'next_cursor': streaming.Deferred(page.next_cursor),
+    }
+
+
+class _KeysetPage:
+    """Iterator over up to per_page rows; one more row, if the query
+    returns it, only tells that another page follows."""
+
+    def __init__(self, rows, per_page, keys):
+        self._rows = iter(rows)
+        self._left = per_page
+        self._keys = keys
+        self._last = None
+        self._more = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._left <= 0:
+            if self._left == 0:
+                self._left = -1
+                self._more = next(self._rows, None) is not None
+                close = getattr(self._rows, 'close', None)
+                if close:
+                    close()
+            raise StopIteration
+        row = next(self._rows)
+        self._left -= 1
+        self._last = row
+        return row
+
+    def next_cursor(self):
+        """Cursor of the following page, or None; consumes the page."""
+        for _ in self:
+            pass
+        return encode_cursor(_key(self._last, self._keys)) if self._more else None
+
+
+def _keyset_sql(query, keys, after, limit, descending, paramstyle):
+    """Wrap a captured query with a keyset range predicate.
+
+    Rows whose leading keys are NULL sort last in both directions (SQLite
+    and PostgreSQL disagree on where NULLs go), and the predicate spells
+    out the NULL cases: a row value comparison is never true for them, so
+    a page ending on a NULL key would otherwise be followed by nothing.
+    The last key must be unique and NOT NULL.
+
+    paramstyle ('qmark' or 'pyformat', see dbpool.paramstyle) picks the
+    placeholders; the captured SQL may have none to go by.
+    """
+    pyformat = paramstyle == 'pyformat'
+    order = 'DESC' if descending else 'ASC'
+    sql = f"SELECT * FROM ({query.sql}) AS _q"
+    params = query.params
+    if after is not None:
+        if isinstance(params, dict):
+            params = dict(params)
+            style = '%({})s' if pyformat else ':{}'
+
+            def mark(value):
+                name = f'_k{len(params)}'
+                params[name] = value
+                return style.format(name)
+        else:
+            params = list(params or ())
+
+            def mark(value):
+                params.append(value)
+                return '%s' if pyformat else '?'
+        sql += f" WHERE {_after_predicate(keys, after, '<' if descending else '>', mark)}"
+    sql += ' ORDER BY ' + ', '.join([f'({k} IS NULL), {k} {order}' for k in keys[:-1]]
+                                    + [f'{keys[-1]} {order}'])
+    sql += f" LIMIT {int(limit)}"
+    return sql, params
+
+
+def _after_predicate(keys, after, op, mark):
+    """SQL matching rows that sort after the cursor values (NULLs last).
+
+    mark(value) adds a parameter and returns its placeholder; it is
+    called in the order the placeholders appear.
+    """
+    column, value = keys[0], after[0]
+    if len(keys) == 1:
+        return f"{column} {op} {mark(value)}"
+    if value is None:
+        return f"({column} IS NULL AND {_after_predicate(keys[1:], after[1:], op, mark)})"
+    before, equal = mark(value), mark(value)
+    rest = _after_predicate(keys[1:], after[1:], op, mark)
+    return f"({column} IS NULL OR {column} {op} {before} OR ({column} = {equal} AND {rest}))"
+
+
+def _keyset_slice(rows, keys, after, limit, descending):
+    """Python equivalent of _keyset_sql for uncapturable list functions."""
+    def compare(a, b):
+        # Negative if a comes first on the page: NULLs last, then by direction
+        for x, y in zip(a, b):
+            if x == y:
+                continue
+            if x is None or y is None:
+                return 1 if x is None else -1
+            return (x > y) - (x < y) if not descending else (x < y) - (x > y)
+        return 0
+
+    rows = sorted(rows, key=functools.cmp_to_key(lambda r, s: compare(_key(r, keys), _key(s, keys))))
+    if after is not None:
+        after = tuple(after)
+        rows = [r for r in rows if compare(_key(r, keys), after) > 0]
+    return rows[:limit]
+
+
+def _key(row, keys):
+    return tuple(row[k] for k in keys)
+
+
+def _first(row):
+    if row is None:
+        return 0
+    if hasattr(row, 'keys'):
+        return list(row.values())[0] if isinstance(row, dict) else row[0]
+    return row[0]
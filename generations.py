@@ -0,0 +1,36 @@
+"""Per-tool data generation counters.
+
+Write endpoints (POST/PUT/PATCH/DELETE) bump the counter of the tool
+whose data they changed. Caches include the current generation in their
+keys, so a write makes every older entry unreachable without having to
+find and delete it. Listeners can subscribe to be told about bumps.
+
+Counters are per process; caches that must also notice writes made by
+other processes or by the CLI tools should additionally use a TTL.
+"""
+import threading
+
+
+_generations = {}
+_listeners = []
+_lock = threading.Lock()
+
+
+def current(tool):
+    """Return the current generation of a tool's data."""
+    return _generations.get(tool, 0)
+
+
+def bump(tool):
+    """Record that a tool's data changed and notify listeners."""
+    with _lock:
+        _generations[tool] = _generations.get(tool, 0) + 1
+        generation = _generations[tool]
+    for listener in list(_listeners):
+        listener(tool, generation)
+    return generation
+
+
+def subscribe(listener):
+    """Call listener(tool, generation) after every bump."""
+    _listeners.append(listener)
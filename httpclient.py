@@ -0,0 +1,165 @@
+"""Pooled keep-alive HTTP client for outbound calls (LIDS, JWKS).
+
+urllib.request.urlopen opens a new TCP (and TLS) connection for every
+call. request() keeps idle http.client connections per (scheme, host,
+port) and reuses them, so a cache-miss token lookup costs one round trip
+instead of three or four.
+
+    resp = httpclient.get('https://lids.example.com/connect/userinfo',
+                          headers={'Authorization': f'Bearer {token}'})
+    if resp.status == 200:
+        user = resp.json()
+
+Connect and read timeouts are separate. Idempotent requests are retried
+with jittered backoff on connection errors and 502/503/504; a reused
+connection the server already closed is replaced without counting as a
+retry.
+"""
+import http.client
+import json
+import os
+import random
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+
+CONNECT_TIMEOUT = 3
+READ_TIMEOUT = 10
+# Idle connections kept per host
+POOL_SIZE = 4
+# Extra attempts for idempotent requests
+RETRIES = 1
+# Base backoff in seconds; attempt n sleeps up to BACKOFF * 2**n
+BACKOFF = 0.1
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+RETRY_STATUSES = (502, 503, 504)
+
+_pools = {}         # (scheme, host, port) -> deque of idle connections
+_lock = threading.Lock()
+_ssl_context = None
+
+
+class Response:
+    """A fully read HTTP response."""
+
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+def _context():
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+def _checkout(key, connect_timeout):
+    with _lock:
+        idle = _pools.get(key)
+        if idle:
+            return idle.pop(), True
+    scheme, host, port = key
+    if scheme == 'https':
+        conn = http.client.HTTPSConnection(host, port, timeout=connect_timeout, context=_context())
+    else:
+        conn = http.client.HTTPConnection(host, port, timeout=connect_timeout)
+    return conn, False
+
+
+def _checkin(key, conn):
+    with _lock:
+        idle = _pools.setdefault(key, deque())
+        if len(idle) < POOL_SIZE:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+def request(method, url, headers=None, body=None, connect_timeout=None,
+            read_timeout=None, retries=None):
+    """Send a request over a pooled connection.
+
+    Returns:
+        Response
+
+    Raises:
+        OSError / http.client.HTTPException: all attempts failed
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https'):
+        raise ValueError(f"Unsupported URL scheme: {url}")
+    port = parts.port or (443 if scheme == 'https' else 80)
+    key = (scheme, parts.hostname, port)
+    target = parts.path or '/'
+    if parts.query:
+        target += '?' + parts.query
+    connect_timeout = CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+    read_timeout = READ_TIMEOUT if read_timeout is None else read_timeout
+    retries = RETRIES if retries is None else retries
+    if method.upper() not in IDEMPOTENT_METHODS:
+        retries = 0
+
+    attempt = 0
+    while True:
+        conn, reused = _checkout(key, connect_timeout)
+        try:
+            if conn.sock is None:
+                conn.connect()
+            conn.sock.settimeout(read_timeout)
+            conn.request(method, target, body=body, headers=headers or {})
+            resp = conn.getresponse()
+            data = resp.read()
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            if reused and not isinstance(e, socket.timeout):
+                continue  # the server closed an idle connection; use a fresh one
+            if attempt >= retries:
+                raise
+        else:
+            if resp.will_close:
+                conn.close()
+            else:
+                _checkin(key, conn)
+            if resp.status not in RETRY_STATUSES or attempt >= retries:
+                return Response(resp.status, resp.headers, data)
+        time.sleep(random.uniform(0, BACKOFF * (2 ** attempt)))
+        attempt += 1
+
+
+def get(url, headers=None, **kwargs):
+    """GET url; see request()."""
+    return request('GET', url, headers=headers, **kwargs)
+
+
+def close_all():
+    """Close every idle connection."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for idle in pools:
+        for conn in idle:
+            conn.close()
+
+
+def _after_fork():
+    # Sockets inherited from the parent must not be shared with it
+    global _lock
+    _lock = threading.Lock()
+    _pools.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
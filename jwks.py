@@ -0,0 +1,256 @@
+"""Local verification of LIDS-signed JWT access tokens.
+
+With ``"token_verification": "jwks"`` in the lids config, authenticate()
+checks RS256/RS384/RS512 signed access tokens against the server's JWKS
+document instead of calling /connect/userinfo. The document is fetched
+once and then refreshed by a background thread, so verifying a token is
+pure CPU work.
+
+Config (``lids`` section):
+    jwks_uri          URL or file:// path of the JWKS document; defaults to
+                      the jwks_uri from {server}/.well-known/openid-configuration
+    jwks_refresh      Seconds between background refreshes (default 3600)
+    issuer            Required ``iss`` claim (optional)
+    audience          Required ``aud`` claim (optional)
+
+Tokens that cannot be checked locally (opaque tokens, unknown ``kid``,
+unsupported algorithms, JWKS not loaded yet) raise Unverifiable so the
+caller can fall back to userinfo. So do tokens without a
+``preferred_username`` claim: userinfo is where that name comes from, and
+falling back to ``sub`` here would give the same user a different
+username depending on the verification mode.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import urllib.request
+
+from hurricanesoft_api import httpclient
+
+
+# Seconds between background JWKS refreshes (overridable via lids.jwks_refresh)
+REFRESH_INTERVAL = 3600
+# Earliest re-fetch after a token named a kid we do not know (key rotation)
+MIN_REFRESH_INTERVAL = 60
+# Clock skew tolerated for exp / nbf
+LEEWAY = 30
+FETCH_TIMEOUT = 10
+
+# DER DigestInfo prefixes for RSASSA-PKCS1-v1_5
+_ALGORITHMS = {
+    'RS256': (hashlib.sha256, bytes.fromhex('3031300d060960864801650304020105000420')),
+    'RS384': (hashlib.sha384, bytes.fromhex('3041300d060960864801650304020205000430')),
+    'RS512': (hashlib.sha512, bytes.fromhex('3051300d060960864801650304020305000440')),
+}
+
+_keysets = {}
+_keysets_lock = threading.Lock()
+
+
+class TokenError(Exception):
+    """The token is a JWT signed by a known key but is not valid."""
+
+
+class Unverifiable(Exception):
+    """The token cannot be checked locally; ask LIDS instead."""
+
+
+class KeySet:
+    """RSA public keys from one JWKS source, kept fresh in the background.
+
+    Args:
+        source: JWKS URL (http(s):// or file://), or an OpenID discovery
+            document URL ending in /.well-known/openid-configuration
+        refresh: Seconds between background refreshes
+    """
+
+    def __init__(self, source, refresh=REFRESH_INTERVAL):
+        self.source = source
+        self.refresh = refresh
+        self.keys = {}                  # kid -> (n, e)
+        self.loaded_at = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread_pid = None
+        self._last_attempt = None
+
+    def get(self, kid):
+        """Return (n, e) for kid.
+
+        Raises:
+            Unverifiable: the key is not (yet) known
+        """
+        self._ensure_refresher()
+        if self.loaded_at is None:
+            self._initial_load()
+        key = self.keys.get(kid)
+        if key is None:
+            if kid is None and len(self.keys) == 1:
+                return next(iter(self.keys.values()))
+            # Possibly a rotated key: refresh soon, let userinfo handle this one
+            self._wake.set()
+            raise Unverifiable(f"unknown key id {kid!r}")
+        return key
+
+    def load(self):
+        """Fetch the JWKS document now; failures keep the previous keys."""
+        with self._lock:
+            self._load_locked()
+
+    def _initial_load(self):
+        with self._lock:
+            if self.loaded_at is not None:
+                return
+            if self._last_attempt and time.monotonic() - self._last_attempt < MIN_REFRESH_INTERVAL:
+                raise Unverifiable('JWKS unavailable')
+            self._load_locked()
+
+    def _load_locked(self):
+        self._last_attempt = time.monotonic()
+        try:
+            document = _fetch_json(self.source)
+            if 'jwks_uri' in document and 'keys' not in document:
+                document = _fetch_json(document['jwks_uri'])
+            self.keys = _parse_keys(document)
+            self.loaded_at = time.time()
+        except Exception as e:
+            if self.loaded_at is None:
+                raise Unverifiable(f"JWKS unavailable: {e}")
+
+    def _ensure_refresher(self):
+        # Threads do not survive fork(), so each worker process starts its own
+        if self._thread_pid == os.getpid():
+            return
+        with _keysets_lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._refresh_loop, name='jwks-refresh', daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            self._wake.wait(self.refresh)
+            self._wake.clear()
+            if self._last_attempt is not None:
+                wait = MIN_REFRESH_INTERVAL - (time.monotonic() - self._last_attempt)
+                if wait > 0:
+                    time.sleep(wait)
+            try:
+                self.load()
+            except Unverifiable:
+                pass
+
+
+def _fetch_json(url):
+    if url.startswith('file:'):
+        with urllib.request.urlopen(url) as resp:
+            return json.loads(resp.read())
+    resp = httpclient.get(url, read_timeout=FETCH_TIMEOUT)
+    if resp.status != 200:
+        raise OSError(f"{url}: HTTP {resp.status}")
+    return resp.json()
+
+
+def _parse_keys(document):
+    keys = {}
+    for jwk in document.get('keys', []):
+        if jwk.get('kty') != 'RSA' or jwk.get('use', 'sig') != 'sig':
+            continue
+        n = int.from_bytes(_b64decode(jwk['n']), 'big')
+        e = int.from_bytes(_b64decode(jwk['e']), 'big')
+        keys[jwk.get('kid')] = (n, e)
+    return keys
+
+
+def get_keyset(lids):
+    """Return the shared KeySet for a lids config section."""
+    source = lids.get('jwks_uri')
+    if not source:
+        server = lids.get('server', '').rstrip('/')
+        source = f"{server}/.well-known/openid-configuration"
+    keyset = _keysets.get(source)
+    if keyset is None:
+        with _keysets_lock:
+            keyset = _keysets.get(source)
+            if keyset is None:
+                keyset = KeySet(source, lids.get('jwks_refresh', REFRESH_INTERVAL))
+                _keysets[source] = keyset
+    return keyset
+
+
+def verify(token, lids):
+    """Verify a JWT access token locally.
+
+    Returns:
+        The token's claims dict
+
+    Raises:
+        Unverifiable: not a JWT we can check here (fall back to userinfo)
+        TokenError: bad signature, expired or missing exp, or wrong
+            issuer / audience
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.split('.')
+        header = json.loads(_b64decode(header_b64))
+        alg = header.get('alg')
+    except (ValueError, TypeError, AttributeError):
+        raise Unverifiable('not a JWT')
+    if alg not in _ALGORITHMS:
+        raise Unverifiable(f"unsupported alg {alg!r}")
+
+    n, e = get_keyset(lids).get(header.get('kid'))
+    try:
+        signed = f"{header_b64}.{payload_b64}".encode('ascii')
+        signature = _b64decode(signature_b64)
+        claims = json.loads(_b64decode(payload_b64))
+    except ValueError:
+        raise TokenError('malformed token')
+    if not isinstance(claims, dict) or not _rsa_verify(n, e, signed, signature, alg):
+        raise TokenError('bad signature')
+
+    now = time.time()
+    try:
+        if 'exp' not in claims:
+            raise TokenError('token has no exp')
+        if now > float(claims['exp']) + LEEWAY:
+            raise TokenError('token expired')
+        if 'nbf' in claims and now < float(claims['nbf']) - LEEWAY:
+            raise TokenError('token not yet valid')
+    except (TypeError, ValueError):
+        raise TokenError('malformed time claim')
+    issuer = lids.get('issuer')
+    if issuer and claims.get('iss') != issuer:
+        raise TokenError('wrong issuer')
+    audience = lids.get('audience')
+    if audience:
+        aud = claims.get('aud')
+        if audience not in (aud if isinstance(aud, list) else [aud]):
+            raise TokenError('wrong audience')
+    if not claims.get('preferred_username'):
+        raise Unverifiable('no preferred_username claim')
+    return claims
+
+
+def _rsa_verify(n, e, signed, signature, alg):
+    """RSASSA-PKCS1-v1_5 signature check (RFC 8017 section 8.2.2)."""
+    hash_fn, prefix = _ALGORITHMS[alg]
+    k = (n.bit_length() + 7) // 8
+    if len(signature) != k:
+        return False
+    s = int.from_bytes(signature, 'big')
+    if s >= n:
+        return False
+    encoded = pow(s, e, n).to_bytes(k, 'big')
+    t = prefix + hash_fn(signed).digest()
+    if k < len(t) + 11:
+        return False
+    expected = b'\x00\x01' + b'\xff' * (k - len(t) - 3) + b'\x00' + t
+    return hmac.compare_digest(encoded, expected)
+
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
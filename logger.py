@@ -1,13 +1,49 @@
 #!/usr/bin/env python3
-"""Logging module for HurricaneSoft API."""
+"""Logging module for HurricaneSoft API.
+
+Request threads never write to stdout or the log file themselves: the
+logger's only handler puts records on a bounded in-memory queue, and a
+background writer thread drains it in batches, flushing once per batch.
+When the queue is full, records are dropped (and counted) or the caller
+blocks, depending on HURRICANESOFT_LOG_OVERFLOW.
+
+Environment:
+    HURRICANESOFT_LOG_FILE        Also write to this file, rotated by size
+    HURRICANESOFT_LOG_MAX_BYTES   Rotate the file at this size (default 10 MiB)
+    HURRICANESOFT_LOG_BACKUPS     Rotated files kept (default 5)
+    HURRICANESOFT_LOG_QUEUE_SIZE  Records buffered in memory (default 10000)
+    HURRICANESOFT_LOG_OVERFLOW    'drop' (default) or 'block' when full
+
+Structured access log (JSON lines, one object per request with per-stage
+timings), off unless HURRICANESOFT_ACCESS_LOG is set:
+    HURRICANESOFT_ACCESS_LOG          File path, or '-' for stdout
+    HURRICANESOFT_ACCESS_LOG_SAMPLE   Fraction of fast 2xx/3xx requests logged (default 1.0)
+    HURRICANESOFT_ACCESS_LOG_SLOW_MS  Requests at least this slow are always logged (default 500)
+Failed (4xx/5xx) requests are always logged.
+"""
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import sys
+import threading
 from datetime import datetime
 
 
-# Global logger instance
+# Records written per batch before the outputs are flushed
+BATCH_SIZE = 256
+
+# Global logger instances (_access_logger is False when disabled)
 _logger = None
+_access_logger = None
+_writers = []
+
+# Access log sampling, read from the environment on first use
+ACCESS_SAMPLE = 1.0
+ACCESS_SLOW_MS = 500.0
 
 
 def get_logger():
@@ -18,8 +54,167 @@ def get_logger():
     return _logger
 
 
+class _DeferredFlush:
+    """Output handler mixin: skip the per-record flush while a batch is written."""
+
+    deferred = False
+
+    def flush(self):
+        if not self.deferred:
+            super().flush()
+
+
+class _StreamOutput(_DeferredFlush, logging.StreamHandler):
+    pass
+
+
+class _RotatingFileOutput(_DeferredFlush, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records without ever blocking on I/O."""
+
+    def __init__(self, q, block):
+        super().__init__(q)
+        self.block = block
+        self.dropped = 0
+
+    def enqueue(self, record):
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Writer:
+    """Background thread writing queued records to the output handlers."""
+
+    _STOP = object()
+
+    def __init__(self, outputs, maxsize, block):
+        self.outputs = outputs
+        self.maxsize = maxsize
+        self.handler = _QueueHandler(queue.Queue(maxsize), block)
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write everything still queued, then stop the thread."""
+        if self._thread and self._thread.is_alive():
+            self.handler.queue.put(self._STOP)
+            self._thread.join(timeout=5)
+
+    def restart_after_fork(self):
+        # The parent's queue lock may have been held by its writer at fork time
+        self.handler.queue = queue.Queue(self.maxsize)
+        self.start()
+
+    def _run(self):
+        q = self.handler.queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                stopping = self._write(batch)
+            except Exception:
+                # Never let a bad record or output stop the writer: with
+                # OVERFLOW=block, request threads would hang on a full queue
+                stopping = any(record is self._STOP for record in batch)
+            if stopping:
+                return
+
+    def _write(self, batch):
+        stopping = False
+        for out in self.outputs:
+            out.deferred = True
+        try:
+            for record in batch:
+                if record is self._STOP:
+                    stopping = True
+                    continue
+                for out in self.outputs:
+                    if record.levelno >= out.level:
+                        _emit(out, record)
+            if self.handler.dropped:
+                dropped, self.handler.dropped = self.handler.dropped, 0
+                warning = logging.makeLogRecord({
+                    'name': 'hurricanesoft_api', 'levelno': logging.WARNING,
+                    'levelname': 'WARNING', 'msg': f"Log queue full, dropped {dropped} records"})
+                for out in self.outputs:
+                    _emit(out, warning)
+        finally:
+            for out in self.outputs:
+                out.deferred = False
+                try:
+                    out.flush()
+                except Exception:
+                    # Closed stdout (BrokenPipeError), full disk (ENOSPC):
+                    # report like a failed emit and keep the other outputs
+                    out.handleError(logging.makeLogRecord({
+                        'name': 'hurricanesoft_api', 'msg': 'Log output flush failed'}))
+        return stopping
+
+
+def _emit(out, record):
+    """Write record to one output; failures go to its handleError()."""
+    try:
+        out.handle(record)
+    except Exception:
+        out.handleError(record)
+
+
+def _queue_settings():
+    return {
+        'maxsize': int(os.environ.get('HURRICANESOFT_LOG_QUEUE_SIZE', 10000)),
+        'block': os.environ.get('HURRICANESOFT_LOG_OVERFLOW', 'drop') == 'block',
+    }
+
+
+def _rotating_output(log_file, formatter):
+    # Create log directory if needed
+    log_dir = os.path.dirname(log_file)
+    if log_dir and not os.path.exists(log_dir):
+        os.makedirs(log_dir, exist_ok=True)
+    handler = _RotatingFileOutput(
+        log_file, encoding='utf-8',
+        maxBytes=int(os.environ.get('HURRICANESOFT_LOG_MAX_BYTES', 10 * 1024 * 1024)),
+        backupCount=int(os.environ.get('HURRICANESOFT_LOG_BACKUPS', 5)))
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(formatter)
+    return handler
+
+
+def _start_writer(logger, outputs):
+    writer = _Writer(outputs, **_queue_settings())
+    writer.start()
+    atexit.register(writer.stop)
+    _writers.append(writer)
+    logger.addHandler(writer.handler)
+
+
+def stop_writers():
+    """Write out everything still queued and stop the writer threads.
+
+    Runs at exit; processes that leave with os._exit() (pre-forked
+    workers) must call it themselves.
+    """
+    for writer in _writers:
+        writer.stop()
+
+
 def _setup_logger():
-    """Setup logger with stdout + file handlers."""
+    """Setup logger with stdout + file outputs behind a background writer."""
     logger = logging.getLogger('hurricanesoft_api')
     logger.setLevel(logging.INFO)
     
@@ -33,31 +228,76 @@ def _setup_logger():
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
-    # Console handler (stdout)
-    console_handler = logging.StreamHandler(sys.stdout)
+    outputs = []
+
+    # Console output (stdout)
+    console_handler = _StreamOutput(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    outputs.append(console_handler)
     
-    # File handler (optional, configurable via env)
+    # File output (optional, configurable via env), rotated by size
+    setup_error = None
     log_file = os.environ.get('HURRICANESOFT_LOG_FILE')
     if log_file:
         try:
-            # Create log directory if needed
-            log_dir = os.path.dirname(log_file)
-            if log_dir and not os.path.exists(log_dir):
-                os.makedirs(log_dir, exist_ok=True)
-            
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
-            file_handler.setLevel(logging.INFO)
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            outputs.append(_rotating_output(log_file, formatter))
         except Exception as e:
-            logger.warning(f"Failed to setup file logging: {e}")
+            setup_error = e
+
+    _start_writer(logger, outputs)
+
+    if setup_error:
+        logger.warning(f"Failed to setup file logging: {setup_error}")
     
     return logger
 
 
+def get_access_logger():
+    """Get the JSON access logger, or False when it is disabled."""
+    global _access_logger
+    if _access_logger is None:
+        _access_logger = _setup_access_logger()
+    return _access_logger
+
+
+def _setup_access_logger():
+    global ACCESS_SAMPLE, ACCESS_SLOW_MS
+    target = os.environ.get('HURRICANESOFT_ACCESS_LOG')
+    if not target:
+        return False
+    ACCESS_SAMPLE = float(os.environ.get('HURRICANESOFT_ACCESS_LOG_SAMPLE', ACCESS_SAMPLE))
+    ACCESS_SLOW_MS = float(os.environ.get('HURRICANESOFT_ACCESS_LOG_SLOW_MS', ACCESS_SLOW_MS))
+
+    logger = logging.getLogger('hurricanesoft_api.access')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if logger.handlers:
+        return logger
+
+    formatter = logging.Formatter('%(message)s')
+    if target == '-':
+        output = _StreamOutput(sys.stdout)
+        output.setFormatter(formatter)
+    else:
+        try:
+            output = _rotating_output(target, formatter)
+        except Exception as e:
+            get_logger().warning(f"Failed to setup access log: {e}")
+            return False
+    _start_writer(logger, [output])
+    return logger
+
+
+def _after_fork():
+    for writer in _writers:
+        writer.restart_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
 def log_request(method, path, user, status_code, duration_ms):
     """Log API request.
     
@@ -73,6 +313,38 @@ def log_request(method, path, user, status_code, duration_ms):
     logger.info(f"[{path}] {method} {status_code} {username} {duration_ms:.0f}ms")
 
 
+def log_access(ctx, status_code, user, client=None):
+    """Write a JSON access log entry for a finished request.
+
+    Args:
+        ctx: context.RequestContext with the request's stage timings
+        status_code: HTTP status code
+        user: Username or 'anonymous'
+        client: Client IP address
+    """
+    logger = get_access_logger()
+    if not logger:
+        return
+    total_ms = ctx.elapsed() * 1000
+    if (status_code < 400 and total_ms < ACCESS_SLOW_MS
+            and ACCESS_SAMPLE < 1 and random.random() >= ACCESS_SAMPLE):
+        return
+    entry = {
+        'ts': datetime.now().isoformat(timespec='milliseconds'),
+        'method': ctx.method,
+        'path': ctx.path,
+        'route': ctx.route,
+        'status': status_code,
+        'user': user or 'anonymous',
+        'client': client,
+        'total_ms': round(total_ms, 2),
+    }
+    for name, seconds in ctx.stages.items():
+        entry[f'{name}_ms'] = round(seconds * 1000, 2)
+    entry['bytes'] = ctx.bytes_out
+    logger.info(json.dumps(entry, ensure_ascii=False))
+
+
 def log_error(path, error, traceback_str=None):
     """Log error with optional traceback.
     
@@ -0,0 +1,191 @@
+"""In-process metrics in Prometheus text exposition format.
+
+Recording is lock-free: every thread writes to its own shard (plain
+dicts only that thread mutates) and render() sums the shards when
+/api/metrics is scraped. A lock is only taken the first time a thread
+records anything, to register its shard.
+
+    metrics.inc('token_cache_hits_total')
+    metrics.observe_request('/api/todo/<int:item_id>', 'GET', 200, 0.012, 512)
+
+Counters are per process; with --processes each worker process reports
+its own values.
+"""
+import bisect
+import os
+import threading
+
+
+PREFIX = 'hurricanesoft_'
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help) for everything render() may emit
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by route template, method and status.'),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency by route template and method.'),
+    'http_response_bytes_total': ('counter', 'Response body bytes by route template.'),
+    'http_requests_in_flight': ('gauge', 'Requests currently being handled.'),
+    'token_cache_hits_total': ('counter', 'LIDS token lookups answered from the cache.'),
+    'token_cache_misses_total': ('counter', 'LIDS token lookups that called userinfo.'),
+    'token_cache_coalesced_total': ('counter', 'LIDS token lookups that waited on another request\'s call.'),
+    'token_cache_hit_ratio': ('gauge', 'Share of LIDS token lookups not needing their own userinfo call.'),
+    'token_jwks_verified_total': ('counter', 'Access tokens verified locally against JWKS.'),
+    'db_pool_connections': ('gauge', 'Open database connections by tool and state.'),
+    'db_pool_events_total': ('counter', 'Database pool events by tool and event.'),
+    'response_cache_hits_total': ('counter', 'GET responses served from the response cache.'),
+    'response_cache_misses_total': ('counter', 'Cacheable GET responses that had to be computed.'),
+    'response_cache_entries': ('gauge', 'Responses held in the response cache.'),
+    'response_cache_bytes': ('gauge', 'Bytes of response bodies held in the response cache.'),
+}
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()
+
+
+class _Shard:
+    """One thread's counters; only the owning thread writes to it."""
+
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self):
+        self.counters = {}      # (name, labels) -> number
+        self.histograms = {}    # (name, labels) -> [bucket counts..., +Inf count, sum]
+
+
+def _shard():
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            _shards.append(shard)
+        return shard
+
+
+def inc(name, labels=(), n=1):
+    """Add n to counter (or up/down gauge) name with the given label pairs."""
+    counters = _shard().counters
+    key = (name, labels)
+    counters[key] = counters.get(key, 0) + n
+
+
+def observe(name, labels, value, buckets=LATENCY_BUCKETS):
+    """Record value in histogram name."""
+    histograms = _shard().histograms
+    key = (name, labels)
+    h = histograms.get(key)
+    if h is None:
+        h = histograms[key] = [0] * (len(buckets) + 2)
+    h[bisect.bisect_left(buckets, value)] += 1
+    h[-1] += value
+
+
+def request_started():
+    inc('http_requests_in_flight')
+
+
+def observe_request(route, method, status, seconds, bytes_out):
+    """Record one finished request (called from APIHandler._route)."""
+    inc('http_requests_in_flight', n=-1)
+    inc('http_requests_total', (('route', route), ('method', method), ('status', str(status))))
+    observe('http_request_duration_seconds', (('route', route), ('method', method)), seconds)
+    if bytes_out:
+        inc('http_response_bytes_total', (('route', route),), bytes_out)
+
+
+def _collect():
+    counters = {}
+    histograms = {}
+    with _shards_lock:
+        shards = list(_shards)
+    for shard in shards:
+        # dict() copies without running Python code, so it is safe while
+        # the owning thread keeps writing
+        for key, value in dict(shard.counters).items():
+            counters[key] = counters.get(key, 0) + value
+        for key, h in dict(shard.histograms).items():
+            total = histograms.get(key)
+            if total is None:
+                histograms[key] = list(h)
+            else:
+                histograms[key] = [a + b for a, b in zip(total, h)]
+    return counters, histograms
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    inner = ','.join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return '{' + inner + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def render(extra=()):
+    """Return all metrics in Prometheus text format.
+
+    Args:
+        extra: Additional (name, labels, value) samples, e.g. gauges read
+            from other modules at scrape time
+    """
+    counters, histograms = _collect()
+    samples = {}
+    for (name, labels), value in counters.items():
+        samples.setdefault(name, []).append((labels, value))
+    for name, labels, value in extra:
+        samples.setdefault(name, []).append((labels, value))
+
+    hits = counters.get(('token_cache_hits_total', ()), 0)
+    coalesced = counters.get(('token_cache_coalesced_total', ()), 0)
+    lookups = hits + coalesced + counters.get(('token_cache_misses_total', ()), 0)
+    if lookups:
+        samples['token_cache_hit_ratio'] = [((), (hits + coalesced) / lookups)]
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        if kind == 'histogram':
+            series = [(k[1], h) for k, h in sorted(histograms.items()) if k[0] == name]
+            if not series:
+                continue
+            lines.append(f'# HELP {PREFIX}{name} {help_text}')
+            lines.append(f'# TYPE {PREFIX}{name} histogram')
+            for labels, h in series:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), h[:-1]):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else repr(bound)
+                    lines.append(f'{PREFIX}{name}_bucket{_labels(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{PREFIX}{name}_sum{_labels(labels)} {_number(h[-1])}')
+                lines.append(f'{PREFIX}{name}_count{_labels(labels)} {cumulative}')
+            continue
+        series = samples.get(name)
+        if not series:
+            continue
+        lines.append(f'# HELP {PREFIX}{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}{name} {kind}')
+        for labels, value in sorted(series):
+            lines.append(f'{PREFIX}{name}{_labels(labels)} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _after_fork():
+    # Each worker process starts counting from zero
+    global _local, _shards_lock
+    _local = threading.local()
+    _shards_lock = threading.Lock()
+    _shards.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -1,20 +1,48 @@
 """LIDS OAuth2 authentication middleware and CORS support."""
+import base64
+import hashlib
 import json
-import urllib.request
-import urllib.error
+import threading
+import time
+from collections import OrderedDict
 
-from hurricanesoft_cli.config import load_config
+from hurricanesoft_api import config_cache, httpclient, jwks, metrics
+
+
+# Seconds a validated token is trusted without asking LIDS again, capped by
+# the token's own expiry (overridable via lids.token_cache_ttl)
+TOKEN_CACHE_TTL = 60
+# Seconds a token LIDS rejected is remembered as invalid
+TOKEN_NEGATIVE_TTL = 10
+# Max tokens kept; least recently used are evicted first
+TOKEN_CACHE_SIZE = 1024
+
+_token_cache = OrderedDict()    # key -> (user dict or None, expires_at)
+_token_lock = threading.Lock()
+_inflight = {}                  # key -> _Flight
+
+
+class _Flight:
+    """One upstream userinfo call that concurrent requests wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.user = None
 
 
 def get_lids_config():
     """Get LIDS config from unified config."""
-    config = load_config()
-    return config.get('lids', {})
+    return config_cache.get().lids
 
 
 def validate_token(token):
     """Validate a Bearer token against LIDS userinfo endpoint.
 
+    Results are cached by token hash: valid tokens for up to
+    TOKEN_CACHE_TTL seconds (never past the token's exp), rejected ones
+    for TOKEN_NEGATIVE_TTL. Concurrent lookups of the same uncached token
+    share one upstream call.
+
     Returns user dict {'username': ..., 'email': ..., ...} or None.
     """
     lids = get_lids_config()
@@ -23,14 +51,81 @@ def validate_token(token):
     server = lids.get('server', '').rstrip('/')
     if not server:
         return None
+
+    key = hashlib.sha256(f"{server}\0{token}".encode('utf-8')).hexdigest()
+    now = time.monotonic()
+    with _token_lock:
+        hit = _token_cache.get(key)
+        if hit and hit[1] > now:
+            _token_cache.move_to_end(key)
+            metrics.inc('token_cache_hits_total')
+            return dict(hit[0]) if hit[0] else None
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+
+    if not leader:
+        metrics.inc('token_cache_coalesced_total')
+        flight.done.wait()
+        return dict(flight.user) if flight.user else None
+
+    metrics.inc('token_cache_misses_total')
+    try:
+        user, cacheable = _fetch_userinfo(server, token)
+        flight.user = user
+        if cacheable:
+            if user:
+                ttl = min(lids.get('token_cache_ttl', TOKEN_CACHE_TTL), _seconds_left(token))
+            else:
+                ttl = TOKEN_NEGATIVE_TTL
+            _cache_token(key, user, time.monotonic() + ttl)
+    finally:
+        with _token_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+    return dict(user) if user else None
+
+
+def _fetch_userinfo(server, token):
+    """Ask LIDS who owns token.
+
+    Returns (user dict or None, cacheable) — network errors and 5xx
+    responses are not cached so a LIDS hiccup does not lock users out.
+    """
     url = f"{server}/connect/userinfo"
-    req = urllib.request.Request(url)
-    req.add_header('Authorization', f'Bearer {token}')
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            return json.loads(resp.read())
-    except (urllib.error.HTTPError, urllib.error.URLError, Exception):
-        return None
+        resp = httpclient.get(url, headers={'Authorization': f'Bearer {token}'})
+    except Exception:
+        return None, False
+    if resp.status != 200:
+        return None, resp.status < 500
+    try:
+        return resp.json(), True
+    except ValueError:
+        return None, False
+
+
+def _seconds_left(token):
+    """Seconds until a JWT's exp claim; unlimited for opaque tokens.
+
+    The payload is only read to bound the cache lifetime; the token
+    itself is still validated by LIDS.
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return max(0, float(claims['exp']) - time.time())
+    except (IndexError, KeyError, TypeError, ValueError):
+        return float('inf')
+
+
+def _cache_token(key, user, expires_at):
+    with _token_lock:
+        _token_cache[key] = (user, expires_at)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
 
 
 def authenticate(headers):
@@ -39,19 +134,28 @@ def authenticate(headers):
     Returns (user_dict, error_message).
     If LIDS is disabled, returns a default user.
     """
-    lids = get_lids_config()
+    snapshot = config_cache.get()
+    lids = snapshot.lids
     if not lids.get('use_lids'):
         # No auth required — return default user from config
-        config = load_config()
-        username = config.get('user', {}).get('username', 'default')
-        return {'username': username, 'sub': username}, None
+        return dict(snapshot.default_user), None
 
     auth_header = headers.get('Authorization', '')
     if not auth_header.startswith('Bearer '):
         return None, 'Missing or invalid Authorization header'
 
     token = auth_header[7:]
-    user = validate_token(token)
+    user = None
+    if lids.get('token_verification') == 'jwks':
+        try:
+            user = jwks.verify(token, lids)
+            metrics.inc('token_jwks_verified_total')
+        except jwks.TokenError:
+            return None, 'Invalid or expired token'
+        except jwks.Unverifiable:
+            user = None  # opaque token or unknown key: ask LIDS
+    if user is None:
+        user = validate_token(token)
     if not user:
         return None, 'Invalid or expired token'
 
@@ -0,0 +1,138 @@
+"""Pre-fork process supervisor for HurricaneSoft API.
+
+The supervisor forks N worker processes that all serve the same listening
+socket (either inherited from the parent or bound per-process with
+SO_REUSEPORT), restarts workers that exit unexpectedly and forwards
+SIGTERM/SIGINT to them.
+
+SIGHUP replaces the workers one at a time: each is asked to finish its
+in-flight requests and exit, and its replacement is forked before the
+next worker is signalled, so the port is served throughout. Workers are
+forked from the supervisor and share the code it imported, so picking up
+new code still needs a full restart.
+"""
+import os
+import signal
+import sys
+import time
+
+from hurricanesoft_api.logger import log_info, log_warning, stop_writers
+
+
+# A worker that dies sooner than this after being forked counts as a crash
+# loop; the supervisor waits before respawning it.
+MIN_WORKER_LIFETIME = 1.0
+RESPAWN_BACKOFF = 1.0
+
+
+class Supervisor:
+    """Fork and babysit worker processes.
+
+    Args:
+        processes: Number of worker processes to keep alive
+        worker_main: Callable run in each forked child; the child exits
+            with status 0 when it returns
+    """
+
+    def __init__(self, processes, worker_main):
+        self.processes = processes
+        self.worker_main = worker_main
+        self._children = {}  # pid -> (slot, started_at)
+        self._stopping = False
+        self._restarting = []   # pids still to be replaced after SIGHUP
+        self._replacing = None  # pid asked to exit for a SIGHUP restart
+
+    def _spawn(self, slot):
+        pid = os.fork()
+        if pid == 0:
+            # Child: drop supervisor signal handlers before serving
+            signal.signal(signal.SIGHUP, _exit_gracefully)
+            signal.signal(signal.SIGTERM, _exit_gracefully)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            status = 0
+            try:
+                self.worker_main(slot)
+            except SystemExit as e:
+                status = e.code if isinstance(e.code, int) else 0
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                status = 1
+            finally:
+                # os._exit skips atexit, which would drain the log queue
+                stop_writers()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        self._children[pid] = (slot, time.monotonic())
+        return pid
+
+    def _forward(self, signum, frame=None):
+        if signum == signal.SIGHUP:
+            self._restart()
+            return
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _restart(self):
+        """Replace every worker, one at a time (SIGHUP)."""
+        if self._stopping:
+            return
+        self._restarting = [pid for pid in self._children if pid != self._replacing]
+        log_info(f"Restarting {len(self._children)} worker processes")
+        if self._replacing is None:
+            self._replace_next()
+
+    def _replace_next(self):
+        self._replacing = None
+        while self._restarting:
+            pid = self._restarting.pop(0)
+            if pid not in self._children:
+                continue
+            try:
+                os.kill(pid, signal.SIGHUP)
+            except ProcessLookupError:
+                continue
+            self._replacing = pid
+            return
+
+    def run(self):
+        """Fork workers and supervise them until SIGTERM/SIGINT."""
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, self._forward)
+
+        for slot in range(self.processes):
+            self._spawn(slot)
+        log_info(f"Supervisor started {self.processes} worker processes")
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            slot, started_at = self._children.pop(pid, (None, 0))
+            if slot is None or self._stopping:
+                continue
+            if pid == self._replacing:
+                self._spawn(slot)
+                self._replace_next()
+                continue
+
+            code = os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status
+            if code != 0:
+                log_warning(f"Worker {slot} (pid {pid}) exited with status {code}, restarting")
+            if time.monotonic() - started_at < MIN_WORKER_LIFETIME:
+                time.sleep(RESPAWN_BACKOFF)
+            if not self._stopping:
+                self._spawn(slot)
+
+        log_info("Supervisor stopped")
+
+
+def _exit_gracefully(signum, frame):
+    # Unwinds serve_forever() in the worker so server_close() can drain
+    raise SystemExit(0)
@@ -0,0 +1,167 @@
+"""cProfile hooks for individual API requests.
+
+A request is profiled when one of these triggers fires:
+
+    header  an admin sends ``X-Profile: 1`` (admins: ``api.admins`` in config)
+    sample  a random SAMPLE fraction of requests (--profile-sample)
+    slow    the route recently took longer than SLOW_MS (--profile-slow-ms);
+            the next request to that route is profiled, at most once per
+            SLOW_COOLDOWN seconds per route
+
+Finished profiles are kept in a ring buffer of KEEP entries and served
+to admins by server.py:
+
+    GET /api/admin/profiles        list
+    GET /api/admin/profiles/<id>   pstats file (python -m pstats <file>)
+
+Only one request is profiled at a time. When no trigger fires nothing is
+installed, so requests that are not profiled pay no profiling overhead.
+"""
+import cProfile
+import itertools
+import marshal
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from hurricanesoft_api import config_cache
+
+
+HEADER = 'X-Profile'
+
+# Fraction of requests profiled at random (overridable via --profile-sample)
+SAMPLE = 0.0
+# Routes slower than this are profiled on their next request; 0 = off
+# (overridable via --profile-slow-ms)
+SLOW_MS = 0
+# Seconds before a slow route is profiled again
+SLOW_COOLDOWN = 60
+# Profiles kept in memory (overridable via --profile-keep)
+KEEP = 20
+
+_profiles = deque(maxlen=KEEP)
+_ids = itertools.count(1)
+_running = threading.Lock()     # held while a request is being profiled
+_armed = set()                  # (method, route) to profile next
+_last_slow_profile = {}         # (method, route) -> monotonic time
+_lock = threading.Lock()
+
+
+def configure(sample=None, slow_ms=None, keep=None):
+    """Override the profiling triggers and buffer size."""
+    global SAMPLE, SLOW_MS, KEEP, _profiles
+    if sample is not None:
+        SAMPLE = max(0.0, min(1.0, sample))
+    if slow_ms is not None:
+        SLOW_MS = max(0, slow_ms)
+    if keep is not None:
+        KEEP = max(1, keep)
+        _profiles = deque(_profiles, maxlen=KEEP)
+
+
+def is_admin(user):
+    """True if user is listed in the config's api.admins."""
+    return bool(user) and user.get('username') in config_cache.get().admins
+
+
+class _Active:
+    __slots__ = ('profiler', 'trigger', 'method', 'path', 'route', 'start')
+
+    def __init__(self, trigger, method, path, route):
+        self.profiler = cProfile.Profile()
+        self.trigger = trigger
+        self.method = method
+        self.path = path
+        self.route = route
+        self.start = time.perf_counter()
+
+
+def begin(method, path, header, user, route_of):
+    """Start profiling this request if a trigger fires.
+
+    Args:
+        header: Value of the X-Profile request header, or None
+        route_of: Callable returning the request's route template; only
+            called when slow-route profiling is armed
+
+    Returns:
+        A handle for finish(), or None when the request is not profiled
+    """
+    trigger = None
+    route = None
+    if header and header != '0' and is_admin(user):
+        trigger = 'header'
+    elif SAMPLE and random.random() < SAMPLE:
+        trigger = 'sample'
+    elif _armed:
+        route = route_of()
+        if (method, route) in _armed:
+            trigger = 'slow'
+    if trigger is None or not _running.acquire(blocking=False):
+        return None
+    active = _Active(trigger, method, path, route)
+    try:
+        active.profiler.enable()
+    except ValueError:
+        # Another profiler (e.g. a debugger) is already installed
+        _running.release()
+        return None
+    return active
+
+
+def finish(active, route, status):
+    """Stop a profile started by begin() and store it."""
+    try:
+        active.profiler.disable()
+    finally:
+        _running.release()
+    duration = time.perf_counter() - active.start
+    route = route or active.route
+    if active.trigger == 'slow':
+        key = (active.method, active.route)
+        with _lock:
+            _armed.discard(key)
+            _last_slow_profile[key] = time.monotonic()
+    stats = pstats.Stats(active.profiler)
+    _profiles.append({
+        'id': next(_ids),
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'method': active.method,
+        'path': active.path,
+        'route': route,
+        'status': status,
+        'trigger': active.trigger,
+        'duration_ms': round(duration * 1000, 2),
+        'data': marshal.dumps(stats.stats),
+    })
+
+
+def note_latency(method, route, seconds):
+    """Arm slow-route profiling when a request took longer than SLOW_MS."""
+    if not SLOW_MS or route is None or seconds * 1000 < SLOW_MS:
+        return
+    key = (method, route)
+    with _lock:
+        if key in _armed:
+            return
+        last = _last_slow_profile.get(key)
+        if last is not None and time.monotonic() - last < SLOW_COOLDOWN:
+            return
+        _armed.add(key)
+
+
+def list_profiles():
+    """Stored profiles, newest first, without their data."""
+    return [dict({k: v for k, v in p.items() if k != 'data'}, size=len(p['data']))
+            for p in reversed(_profiles)]
+
+
+def get_profile(profile_id):
+    """Return the pstats bytes of a stored profile, or None."""
+    for p in list(_profiles):
+        if p['id'] == profile_id:
+            return p['data']
+    return None
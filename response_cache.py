@@ -0,0 +1,138 @@
+"""Cache of encoded JSON responses for read-mostly GET endpoints.
+
+Routes opt in when they are registered, on a Router that names the tool
+whose data they read:
+
+    routes = Router('/api/todo', tool='todotool')
+
+    @routes.route('GET', '/tags', cache=True)
+
+server.py looks such requests up before calling the route module's
+handle(). On a hit the stored JSON bytes (and their gzip/deflate
+variants, compressed once) are written directly, without touching the
+database or encoding JSON again.
+
+Keys are (route template, tool generation, user, query parameters).
+Write endpoints bump the tool's generation (see generations.py), so
+after a write older entries are never hit again and age out of the LRU.
+Entries also expire after TTL seconds to pick up writes made by the CLI
+tools or by other processes. Bodies, including compressed variants, are
+limited to MAX_BYTES in total.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from hurricanesoft_api import compression, conditional, generations, metrics
+from hurricanesoft_api.router import RouteError
+
+
+# Seconds an entry is served without a generation bump
+TTL = 30
+# Total bytes of cached bodies (overridable via --response-cache-mb); 0 disables
+MAX_BYTES = 8 * 1024 * 1024
+# Larger responses are not cached
+MAX_ENTRY_BYTES = 256 * 1024
+
+_entries = OrderedDict()    # key -> Entry, least recently used first
+_bytes = 0
+_lock = threading.Lock()
+
+
+def configure(max_bytes=None):
+    """Override the cache size."""
+    global MAX_BYTES
+    if max_bytes is not None:
+        MAX_BYTES = max(0, int(max_bytes))
+
+
+class Entry:
+    """One cached response body and its compressed variants."""
+
+    __slots__ = ('key', 'body', 'etag', 'variants', 'expires', 'size')
+
+    def __init__(self, key, body, expires):
+        self.key = key
+        self.body = body
+        self.etag = conditional.body_etag(body)
+        self.variants = {}      # content coding -> compressed body
+        self.expires = expires
+        self.size = len(body)
+
+    def compressed(self, encoding):
+        """Return the body compressed with encoding, compressing it once."""
+        packed = self.variants.get(encoding)
+        if packed is None:
+            packed = compression.compress(self.body, encoding)
+            with _lock:
+                if encoding not in self.variants:
+                    self.variants[encoding] = packed
+                    self.size += len(packed)
+                    if _entries.get(self.key) is self:
+                        _grow(len(packed))
+        return packed
+
+
+def key_for(routes, method, path, params, user):
+    """Cache key for a request, or None if its route is not cacheable.
+
+    Args:
+        routes: The route module's Router
+        params: Parsed query parameters
+        user: Username the response is cached for
+    """
+    if method != 'GET' or not MAX_BYTES or routes is None or routes.tool is None:
+        return None
+    try:
+        route, _ = routes.match(method, path)
+    except RouteError:
+        return None
+    if not route.cache:
+        return None
+    frozen = tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()))
+    return (route.template, generations.current(routes.tool), user, frozen)
+
+
+def get(key):
+    """Return the live Entry for key, or None."""
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.expires <= now:
+            _remove(key)
+            entry = None
+        if entry is not None:
+            _entries.move_to_end(key)
+    metrics.inc('response_cache_hits_total' if entry is not None else 'response_cache_misses_total')
+    return entry
+
+
+def put(key, body):
+    """Store an encoded JSON body; returns its Entry, or None if too large."""
+    if len(body) > MAX_ENTRY_BYTES or len(body) > MAX_BYTES:
+        return None
+    entry = Entry(key, body, time.monotonic() + TTL)
+    with _lock:
+        if key in _entries:
+            _remove(key)
+        _entries[key] = entry
+        _grow(entry.size)
+    return entry
+
+
+def stats():
+    with _lock:
+        return {'entries': len(_entries), 'bytes': _bytes}
+
+
+def _grow(n):
+    """Account n more bytes and evict least recently used entries (lock held)."""
+    global _bytes
+    _bytes += n
+    while _bytes > MAX_BYTES and _entries:
+        _remove(next(iter(_entries)))
+
+
+def _remove(key):
+    global _bytes
+    _bytes -= _entries.pop(key).size
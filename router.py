@@ -0,0 +1,164 @@
+"""Compiled route table for HurricaneSoft API.
+
+Route modules register endpoints with path patterns relative to their
+prefix, e.g. ``'/list'`` or ``'/<int:item_id>/done'``. Patterns are
+compiled into a segment trie when the module is imported, so matching a
+request costs one dict lookup per path segment no matter how many
+endpoints exist, and 404 / 405 responses fall out of the lookup.
+
+Usage:
+    routes = Router('/api/todo', tool='todotool')
+
+    @routes.route('GET', '', '/list')
+    def _list(db, conn, body, username):
+        ...
+
+    @routes.route('POST', '/<int:item_id>/done')
+    def _done(db, conn, body, username, item_id):
+        ...
+
+    @routes.route('GET', '/tags', cache=True)     # see response_cache.py
+    def _tags(db, conn, body, username):
+        ...
+"""
+from hurricanesoft_api import context
+
+# Path parameter converters: <int:name>, <str:name> (or just <name>)
+CONVERTERS = {
+    'int': int,
+    'str': str,
+}
+
+
+class RouteError(Exception):
+    """Raised by Router.match when no endpoint accepts the request."""
+
+    def __init__(self, status, message, allowed=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.allowed = allowed or []
+
+
+class Route:
+    """A compiled endpoint."""
+
+    __slots__ = ('method', 'template', 'fn', 'cache')
+
+    def __init__(self, method, template, fn, cache=False):
+        self.method = method
+        self.template = template
+        self.fn = fn
+        self.cache = cache      # Response may be cached (see response_cache.py)
+
+
+class _Node:
+    __slots__ = ('static', 'params', 'methods')
+
+    def __init__(self):
+        self.static = {}    # segment -> _Node
+        self.params = []    # [(name, converter, _Node)], tried in order
+        self.methods = {}   # HTTP method -> Route
+
+
+class Router:
+    """Segment-trie router for one route module.
+
+    Args:
+        prefix: URL prefix the module is mounted at (e.g. '/api/todo')
+        tool: Tool whose data the routes serve (its generations.py
+            counter invalidates cached responses)
+    """
+
+    def __init__(self, prefix='', tool=None):
+        self.prefix = prefix.rstrip('/')
+        self.tool = tool
+        self._root = _Node()
+
+    def add(self, method, pattern, fn, cache=False):
+        """Register fn for method + pattern.
+
+        Args:
+            cache: Let server.py cache the response until the tool's data
+                changes; only for GET routes whose result depends on
+                nothing but the path, query parameters and user
+        """
+        node = self._root
+        for seg in _split(pattern):
+            if seg.startswith('<') and seg.endswith('>'):
+                conv_name, _, name = seg[1:-1].rpartition(':')
+                converter = CONVERTERS[conv_name or 'str']
+                for p_name, p_conv, child in node.params:
+                    if p_name == name and p_conv is converter:
+                        node = child
+                        break
+                else:
+                    child = _Node()
+                    node.params.append((name, converter, child))
+                    node = child
+            else:
+                node = node.static.setdefault(seg, _Node())
+        if method in node.methods:
+            raise ValueError(f"Duplicate route: {method} {self.prefix}{pattern}")
+        node.methods[method] = Route(method, self.prefix + pattern, fn, cache)
+
+    def route(self, method, *patterns, cache=False):
+        """Decorator registering a handler under one or more patterns."""
+        def decorator(fn):
+            for pattern in patterns:
+                self.add(method, pattern, fn, cache)
+            return fn
+        return decorator
+
+    def match(self, method, path):
+        """Resolve a request path.
+
+        Returns:
+            (Route, params dict)
+
+        Raises:
+            RouteError: 404 when no pattern matches, 405 when the path
+                matches but not for this method. Route modules let it
+                propagate; server.py sends it with an Allow header for 405.
+        """
+        if self.prefix and path.startswith(self.prefix):
+            path = path[len(self.prefix):]
+        segments = _split(path)
+        allowed = set()
+        found = _walk(self._root, segments, 0, {}, method, allowed)
+        if found:
+            context.set_route(found[0].template)
+            return found
+        if allowed:
+            raise RouteError(405, 'Method not allowed', sorted(allowed))
+        raise RouteError(404, 'not found')
+
+
+def _split(path):
+    return [s for s in path.split('/') if s]
+
+
+def _walk(node, segments, i, params, method, allowed):
+    if i == len(segments):
+        route = node.methods.get(method)
+        if route:
+            return route, params
+        allowed.update(node.methods)
+        return None
+
+    seg = segments[i]
+    child = node.static.get(seg)
+    if child is not None:
+        found = _walk(child, segments, i + 1, params, method, allowed)
+        if found:
+            return found
+
+    for name, converter, child in node.params:
+        try:
+            value = converter(seg)
+        except (ValueError, TypeError):
+            continue
+        found = _walk(child, segments, i + 1, dict(params, **{name: value}), method, allowed)
+        if found:
+            return found
+    return None
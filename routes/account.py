@@ -1,7 +1,7 @@
 """AccounTool REST API routes.
 
 Endpoints:
-    GET    /api/account/list         — list transactions (?start=&end=&type=&category_id=&keyword=&page=&per_page=)
+    GET    /api/account/list         — list transactions (?start=&end=&type=&category_id=&keyword=&page=&per_page=|&cursor=)
     POST   /api/account/add          — add transaction {date, type, amount, category_id, note?}
     DELETE /api/account/<id>         — delete transaction
     GET    /api/account/balance      — current balance
@@ -12,9 +12,9 @@ Endpoints:
     GET    /api/account/reminders    — list reminders
     POST   /api/account/reminders    — add reminder {name, amount, category_id, day_of_month, note?}
 """
-import math
 import traceback
-from hurricanesoft_cli.db_factory import get_connection
+from hurricanesoft_api import bootstrap, dbpool, dbquery, generations
+from hurricanesoft_api.router import Router
 
 
 def _get_conn():
@@ -25,7 +25,7 @@ def _get_conn():
             pg_init = db_pg.get_conn
         except (ImportError, RuntimeError):
             pg_init = None
-        conn, _ = get_connection('accountool', sqlite_init_fn=sqlite_db.get_conn, pg_init_fn=pg_init)
+        conn = dbpool.connect('accountool', bootstrap.sqlite_init_fn('accountool', sqlite_db), pg_init)
         return conn
     except Exception as e:
         raise ConnectionError(f"Database connection failed: {e}")
@@ -37,171 +37,179 @@ def _row(r):
     return dict(r) if hasattr(r, 'keys') else r
 
 
-def _paginate(items, page=1, per_page=20):
-    """Apply pagination to a list and return paginated response."""
-    total = len(items)
-    pages = math.ceil(total / per_page) if per_page > 0 else 1
-    start = (page - 1) * per_page
-    end = start + per_page
+routes = Router('/api/account', tool='accountool')
+
+
+@routes.route('GET', '', '/list')
+def _list(db, conn, body, username):
+    p = body or {}
+    
+    # Pagination
+    try:
+        page = int(p.get('page', 1))
+        per_page = int(p.get('per_page', 20))
+        if page < 1:
+            page = 1
+        if per_page < 1 or per_page > 100:
+            per_page = 20
+    except (ValueError, TypeError):
+        return 400, {'error': 'Invalid pagination parameters'}
+    
+    kwargs = {'start_date': p.get('start'),
+              'end_date': p.get('end'),
+              'type_': p.get('type'),
+              'category_id': p.get('category_id'),
+              'keyword': p.get('keyword'),
+              'limit': None}
+    if 'cursor' in p:
+        return 200, dbquery.paginate_keyset('accountool', conn, db.list_transactions, kwargs=kwargs,
+                                            keys=('date', 'id'), cursor=p['cursor'],
+                                            per_page=per_page, convert=_row)
+    return 200, dbquery.paginate('accountool', conn, db.list_transactions, kwargs=kwargs,
+                                 page=page, per_page=per_page, convert=_row)
+
+
+@routes.route('POST', '/add')
+def _add(db, conn, body, username):
+    # Input validation
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    
+    missing = []
+    for k in ('date', 'type', 'amount', 'category_id'):
+        if k not in body:
+            missing.append(k)
+    if missing:
+        return 400, {'error': f'Missing required fields: {", ".join(missing)}'}
+    
+    # Validate type
+    if body['type'] not in ('income', 'expense'):
+        return 400, {'error': 'type must be either "income" or "expense"'}
+    
+    # Validate amount is numeric
+    try:
+        amount = float(body['amount'])
+        if amount <= 0:
+            return 400, {'error': 'amount must be greater than 0'}
+    except (ValueError, TypeError):
+        return 400, {'error': 'amount must be a valid number'}
+    
+    try:
+        category_id = int(body['category_id'])
+    except (ValueError, TypeError):
+        return 400, {'error': 'category_id must be a valid integer'}
+    
+    txn_id = db.add_transaction(conn, body['date'], body['type'],
+                                amount, category_id,
+                                note=body.get('note', ''),
+                                created_by=username)
+    return 201, {'id': txn_id, 'message': 'created'}
+
+
+@routes.route('GET', '/balance', cache=True)
+def _balance(db, conn, body, username):
+    result = db.get_balance(conn)
+    return 200, _row(result)
+
+
+@routes.route('GET', '/report')
+def _report(db, conn, body, username):
+    p = body or {}
+    if 'year' not in p or 'month' not in p:
+        return 400, {'error': 'year and month are required'}
+    
+    try:
+        year = int(p['year'])
+        month = int(p['month'])
+        if month < 1 or month > 12:
+            return 400, {'error': 'month must be between 1 and 12'}
+    except (ValueError, TypeError):
+        return 400, {'error': 'year and month must be valid integers'}
     
-    return {
-        'items': items[start:end],
-        'total': total,
-        'page': page,
-        'per_page': per_page,
-        'pages': pages
-    }
+    rows = db.monthly_report(conn, year, month)
+    return 200, [_row(r) for r in rows]
+
+
+@routes.route('GET', '/stats')
+def _stats(db, conn, body, username):
+    p = body or {}
+    rows = db.category_stats(conn, start_date=p.get('start'), end_date=p.get('end'))
+    return 200, [_row(r) for r in rows]
+
+
+@routes.route('GET', '/categories', cache=True)
+def _categories(db, conn, body, username):
+    p = body or {}
+    rows = db.list_categories(conn, type_=p.get('type'))
+    return 200, [_row(r) for r in rows]
+
+
+@routes.route('POST', '/categories')
+def _add_category(db, conn, body, username):
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    if 'name' not in body or not body['name']:
+        return 400, {'error': 'name is required'}
+    if 'type' not in body or body['type'] not in ('income', 'expense'):
+        return 400, {'error': 'type is required and must be "income" or "expense"'}
+    
+    cat_id = db.add_category(conn, body['name'], body['type'],
+                             description=body.get('description', ''))
+    return 201, {'id': cat_id, 'message': 'created'}
+
+
+@routes.route('GET', '/reminders')
+def _reminders(db, conn, body, username):
+    rows = db.list_reminders(conn)
+    return 200, [_row(r) for r in rows]
+
+
+@routes.route('POST', '/reminders')
+def _add_reminder(db, conn, body, username):
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    
+    missing = []
+    for k in ('name', 'amount', 'category_id', 'day_of_month'):
+        if k not in body:
+            missing.append(k)
+    if missing:
+        return 400, {'error': f'Missing required fields: {", ".join(missing)}'}
+    
+    try:
+        amount = float(body['amount'])
+        category_id = int(body['category_id'])
+        day = int(body['day_of_month'])
+        if day < 1 or day > 31:
+            return 400, {'error': 'day_of_month must be between 1 and 31'}
+    except (ValueError, TypeError):
+        return 400, {'error': 'Invalid numeric field values'}
+    
+    r_id = db.add_reminder(conn, body['name'], amount,
+                           category_id, day,
+                           note=body.get('note', ''))
+    return 201, {'id': r_id, 'message': 'created'}
+
+
+# DELETE /api/account/<id>
+@routes.route('DELETE', '/<int:item_id>')
+def _delete(db, conn, body, username, item_id):
+    db.delete_transaction(conn, item_id)
+    return 200, {'message': 'deleted'}
 
 
 def handle(method, path, body, user):
+    # RouteError (404 / 405) propagates to server.py, which adds Allow
+    route, params = routes.match(method, path)
+
     try:
         from accountool import db
         conn = _get_conn()
         username = user.get('username', '')
-        parts = path.strip('/').split('/')
-        sub = parts[2] if len(parts) > 2 else 'list'
-
-        if method == 'GET' and sub == 'list':
-            p = body or {}
-            
-            # Pagination
-            try:
-                page = int(p.get('page', 1))
-                per_page = int(p.get('per_page', 20))
-                if page < 1:
-                    page = 1
-                if per_page < 1 or per_page > 100:
-                    per_page = 20
-            except (ValueError, TypeError):
-                return 400, {'error': 'Invalid pagination parameters'}
-            
-            rows = db.list_transactions(conn,
-                                        start_date=p.get('start'),
-                                        end_date=p.get('end'),
-                                        type_=p.get('type'),
-                                        category_id=p.get('category_id'),
-                                        keyword=p.get('keyword'),
-                                        limit=None)
-            items = [_row(r) for r in rows]
-            return 200, _paginate(items, page, per_page)
-
-        if method == 'POST' and sub == 'add':
-            # Input validation
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            
-            missing = []
-            for k in ('date', 'type', 'amount', 'category_id'):
-                if k not in body:
-                    missing.append(k)
-            if missing:
-                return 400, {'error': f'Missing required fields: {", ".join(missing)}'}
-            
-            # Validate type
-            if body['type'] not in ('income', 'expense'):
-                return 400, {'error': 'type must be either "income" or "expense"'}
-            
-            # Validate amount is numeric
-            try:
-                amount = float(body['amount'])
-                if amount <= 0:
-                    return 400, {'error': 'amount must be greater than 0'}
-            except (ValueError, TypeError):
-                return 400, {'error': 'amount must be a valid number'}
-            
-            try:
-                category_id = int(body['category_id'])
-            except (ValueError, TypeError):
-                return 400, {'error': 'category_id must be a valid integer'}
-            
-            txn_id = db.add_transaction(conn, body['date'], body['type'],
-                                        amount, category_id,
-                                        note=body.get('note', ''),
-                                        created_by=username)
-            return 201, {'id': txn_id, 'message': 'created'}
-
-        if method == 'GET' and sub == 'balance':
-            result = db.get_balance(conn)
-            return 200, _row(result)
-
-        if method == 'GET' and sub == 'report':
-            p = body or {}
-            if 'year' not in p or 'month' not in p:
-                return 400, {'error': 'year and month are required'}
-            
-            try:
-                year = int(p['year'])
-                month = int(p['month'])
-                if month < 1 or month > 12:
-                    return 400, {'error': 'month must be between 1 and 12'}
-            except (ValueError, TypeError):
-                return 400, {'error': 'year and month must be valid integers'}
-            
-            rows = db.monthly_report(conn, year, month)
-            return 200, [_row(r) for r in rows]
-
-        if method == 'GET' and sub == 'stats':
-            p = body or {}
-            rows = db.category_stats(conn, start_date=p.get('start'), end_date=p.get('end'))
-            return 200, [_row(r) for r in rows]
-
-        if method == 'GET' and sub == 'categories':
-            p = body or {}
-            rows = db.list_categories(conn, type_=p.get('type'))
-            return 200, [_row(r) for r in rows]
-
-        if method == 'POST' and sub == 'categories':
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            if 'name' not in body or not body['name']:
-                return 400, {'error': 'name is required'}
-            if 'type' not in body or body['type'] not in ('income', 'expense'):
-                return 400, {'error': 'type is required and must be "income" or "expense"'}
-            
-            cat_id = db.add_category(conn, body['name'], body['type'],
-                                     description=body.get('description', ''))
-            return 201, {'id': cat_id, 'message': 'created'}
-
-        if method == 'GET' and sub == 'reminders':
-            rows = db.list_reminders(conn)
-            return 200, [_row(r) for r in rows]
-
-        if method == 'POST' and sub == 'reminders':
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            
-            missing = []
-            for k in ('name', 'amount', 'category_id', 'day_of_month'):
-                if k not in body:
-                    missing.append(k)
-            if missing:
-                return 400, {'error': f'Missing required fields: {", ".join(missing)}'}
-            
-            try:
-                amount = float(body['amount'])
-                category_id = int(body['category_id'])
-                day = int(body['day_of_month'])
-                if day < 1 or day > 31:
-                    return 400, {'error': 'day_of_month must be between 1 and 31'}
-            except (ValueError, TypeError):
-                return 400, {'error': 'Invalid numeric field values'}
-            
-            r_id = db.add_reminder(conn, body['name'], amount,
-                                   category_id, day,
-                                   note=body.get('note', ''))
-            return 201, {'id': r_id, 'message': 'created'}
-
-        # DELETE /api/account/<id>
-        try:
-            item_id = int(sub)
-        except (ValueError, TypeError):
-            return 404, {'error': 'not found'}
-
-        if method == 'DELETE':
-            db.delete_transaction(conn, item_id)
-            return 200, {'message': 'deleted'}
-
-        return 404, {'error': 'not found'}
+        status, data = route.fn(db, conn, body, username, **params)
+        if method != 'GET' and status < 400:
+            generations.bump('accountool')
+        return status, data
     
     except ConnectionError as e:
         return 503, {'error': str(e)}
@@ -1,7 +1,7 @@
 """AnnounceTool REST API routes.
 
 Endpoints:
-    GET    /api/announce/list             — list announcements (?priority=&archived=&page=&per_page=)
+    GET    /api/announce/list             — list announcements (?priority=&archived=&page=&per_page=|&cursor=)
     GET    /api/announce/<id>             — get announcement
     POST   /api/announce/add              — post announcement {title, body?, priority?}
     POST   /api/announce/<id>/archive     — archive
@@ -14,9 +14,9 @@ Endpoints:
     POST   /api/announce/contacts         — add contact {name, email}
     DELETE /api/announce/contacts/<name>  — remove contact
 """
-import math
 import traceback
-from hurricanesoft_cli.db_factory import get_connection
+from hurricanesoft_api import bootstrap, dbpool, dbquery, generations
+from hurricanesoft_api.router import Router
 
 
 def _get_conn():
@@ -27,8 +27,8 @@ def _get_conn():
             pg_init = db_pg.get_conn
         except (ImportError, RuntimeError):
             pg_init = None
-        # Use init_db to ensure tables exist
-        conn, _ = get_connection('announcetool', sqlite_init_fn=sqlite_db.init_db, pg_init_fn=pg_init)
+        # init_db until the startup bootstrap has created the tables
+        conn = dbpool.connect('announcetool', bootstrap.sqlite_init_fn('announcetool', sqlite_db), pg_init)
         return conn
     except Exception as e:
         raise ConnectionError(f"Database connection failed: {e}")
@@ -40,141 +40,149 @@ def _row(r):
     return dict(r) if hasattr(r, 'keys') else r
 
 
-def _paginate(items, page=1, per_page=20):
-    """Apply pagination to a list and return paginated response."""
-    total = len(items)
-    pages = math.ceil(total / per_page) if per_page > 0 else 1
-    start = (page - 1) * per_page
-    end = start + per_page
+routes = Router('/api/announce', tool='announcetool')
+
+
+@routes.route('GET', '', '/list')
+def _list(db, conn, body, username):
+    p = body or {}
+    
+    # Pagination
+    try:
+        page = int(p.get('page', 1))
+        per_page = int(p.get('per_page', 20))
+        if page < 1:
+            page = 1
+        if per_page < 1 or per_page > 100:
+            per_page = 20
+    except (ValueError, TypeError):
+        return 400, {'error': 'Invalid pagination parameters'}
     
-    return {
-        'items': items[start:end],
-        'total': total,
-        'page': page,
-        'per_page': per_page,
-        'pages': pages
-    }
+    kwargs = {'priority': p.get('priority'),
+              'archived': p.get('archived') == '1',
+              'limit': None}
+    if 'cursor' in p:
+        return 200, dbquery.paginate_keyset('announcetool', conn, db.list_announcements, kwargs=kwargs,
+                                            keys=('id',), cursor=p['cursor'],
+                                            per_page=per_page, convert=_row)
+    return 200, dbquery.paginate('announcetool', conn, db.list_announcements, kwargs=kwargs,
+                                 page=page, per_page=per_page, convert=_row)
+
+
+@routes.route('POST', '/add')
+def _add(db, conn, body, username):
+    # Input validation
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    if 'title' not in body or not body['title']:
+        return 400, {'error': 'title is required'}
+    if 'content' not in body or not body['content']:
+        return 400, {'error': 'content is required'}
+    
+    ann_id = db.post_announcement(conn, body['title'],
+                                  body=body.get('content', ''),
+                                  priority=body.get('priority', 'normal'),
+                                  posted_by=username)
+    return 201, {'id': ann_id, 'message': 'created'}
+
+
+@routes.route('GET', '/contacts', cache=True)
+def _contacts(db, conn, body, username):
+    rows = db.list_contacts(conn)
+    return 200, [_row(r) for r in rows]
+
+
+@routes.route('POST', '/contacts')
+def _add_contact(db, conn, body, username):
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    if 'name' not in body or not body['name']:
+        return 400, {'error': 'name is required'}
+    if 'email' not in body or not body['email']:
+        return 400, {'error': 'email is required'}
+    
+    result = db.add_contact(conn, body['name'], body['email'])
+    return 201, {'success': bool(result), 'message': 'created'}
+
+
+# DELETE /api/announce/contacts/<name>
+@routes.route('DELETE', '/contacts/<name>')
+def _remove_contact(db, conn, body, username, name):
+    db.remove_contact(conn, name)
+    return 200, {'message': 'deleted'}
+
+
+@routes.route('GET', '/<int:item_id>')
+def _get(db, conn, body, username, item_id):
+    row = db.get_announcement(conn, item_id)
+    if not row:
+        return 404, {'error': 'Announcement not found'}
+    return 200, _row(row)
+
+
+@routes.route('POST', '/<int:item_id>/archive')
+def _archive(db, conn, body, username, item_id):
+    db.archive_announcement(conn, item_id)
+    return 200, {'message': 'archived'}
+
+
+@routes.route('POST', '/<int:item_id>/unarchive')
+def _unarchive(db, conn, body, username, item_id):
+    db.unarchive_announcement(conn, item_id)
+    return 200, {'message': 'unarchived'}
+
+
+@routes.route('GET', '/<int:item_id>/recipients')
+def _recipients(db, conn, body, username, item_id):
+    rows = db.get_recipients(conn, item_id)
+    return 200, [_row(r) for r in rows]
+
+
+@routes.route('POST', '/<int:item_id>/recipients')
+def _add_recipients(db, conn, body, username, item_id):
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    if 'contacts' not in body or not isinstance(body['contacts'], list):
+        return 400, {'error': 'contacts list is required'}
+    
+    db.add_recipients(conn, item_id, body['contacts'])
+    return 200, {'message': 'recipients added'}
+
+
+@routes.route('POST', '/<int:item_id>/ack')
+def _ack(db, conn, body, username, item_id):
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    if 'email' not in body or not body['email']:
+        return 400, {'error': 'email is required'}
+    
+    db.mark_read(conn, item_id, body['email'])
+    return 200, {'message': 'acknowledged'}
+
+
+@routes.route('POST', '/<int:item_id>/remind')
+def _remind(db, conn, body, username, item_id):
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    if 'email' not in body or not body['email']:
+        return 400, {'error': 'email is required'}
+    
+    db.increment_remind(conn, item_id, body['email'])
+    return 200, {'message': 'reminded'}
 
 
 def handle(method, path, body, user):
+    # RouteError (404 / 405) propagates to server.py, which adds Allow
+    route, params = routes.match(method, path)
+
     try:
         from announcetool import db
         conn = _get_conn()
         username = user.get('username', '')
-        parts = path.strip('/').split('/')
-        sub = parts[2] if len(parts) > 2 else 'list'
-
-        if method == 'GET' and sub == 'list':
-            p = body or {}
-            
-            # Pagination
-            try:
-                page = int(p.get('page', 1))
-                per_page = int(p.get('per_page', 20))
-                if page < 1:
-                    page = 1
-                if per_page < 1 or per_page > 100:
-                    per_page = 20
-            except (ValueError, TypeError):
-                return 400, {'error': 'Invalid pagination parameters'}
-            
-            rows = db.list_announcements(conn,
-                                         priority=p.get('priority'),
-                                         archived=p.get('archived') == '1',
-                                         limit=None)
-            items = [_row(r) for r in rows]
-            return 200, _paginate(items, page, per_page)
-
-        if method == 'POST' and sub == 'add':
-            # Input validation
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            if 'title' not in body or not body['title']:
-                return 400, {'error': 'title is required'}
-            if 'content' not in body or not body['content']:
-                return 400, {'error': 'content is required'}
-            
-            ann_id = db.post_announcement(conn, body['title'],
-                                          body=body.get('content', ''),
-                                          priority=body.get('priority', 'normal'),
-                                          posted_by=username)
-            return 201, {'id': ann_id, 'message': 'created'}
-
-        if method == 'GET' and sub == 'contacts':
-            rows = db.list_contacts(conn)
-            return 200, [_row(r) for r in rows]
-
-        if method == 'POST' and sub == 'contacts':
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            if 'name' not in body or not body['name']:
-                return 400, {'error': 'name is required'}
-            if 'email' not in body or not body['email']:
-                return 400, {'error': 'email is required'}
-            
-            result = db.add_contact(conn, body['name'], body['email'])
-            return 201, {'success': bool(result), 'message': 'created'}
-
-        # DELETE /api/announce/contacts/<name>
-        if method == 'DELETE' and sub == 'contacts' and len(parts) > 3:
-            name = parts[3]
-            db.remove_contact(conn, name)
-            return 200, {'message': 'deleted'}
-
-        # Numeric ID routes
-        try:
-            item_id = int(sub)
-        except (ValueError, TypeError):
-            return 404, {'error': 'not found'}
-
-        action = parts[3] if len(parts) > 3 else None
-
-        if method == 'GET' and action is None:
-            row = db.get_announcement(conn, item_id)
-            if not row:
-                return 404, {'error': 'Announcement not found'}
-            return 200, _row(row)
-
-        if method == 'POST' and action == 'archive':
-            db.archive_announcement(conn, item_id)
-            return 200, {'message': 'archived'}
-
-        if method == 'POST' and action == 'unarchive':
-            db.unarchive_announcement(conn, item_id)
-            return 200, {'message': 'unarchived'}
-
-        if method == 'GET' and action == 'recipients':
-            rows = db.get_recipients(conn, item_id)
-            return 200, [_row(r) for r in rows]
-
-        if method == 'POST' and action == 'recipients':
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            if 'contacts' not in body or not isinstance(body['contacts'], list):
-                return 400, {'error': 'contacts list is required'}
-            
-            db.add_recipients(conn, item_id, body['contacts'])
-            return 200, {'message': 'recipients added'}
-
-        if method == 'POST' and action == 'ack':
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            if 'email' not in body or not body['email']:
-                return 400, {'error': 'email is required'}
-            
-            db.mark_read(conn, item_id, body['email'])
-            return 200, {'message': 'acknowledged'}
-
-        if method == 'POST' and action == 'remind':
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            if 'email' not in body or not body['email']:
-                return 400, {'error': 'email is required'}
-            
-            db.increment_remind(conn, item_id, body['email'])
-            return 200, {'message': 'reminded'}
-
-        return 404, {'error': 'not found'}
+        status, data = route.fn(db, conn, body, username, **params)
+        if method != 'GET' and status < 400:
+            generations.bump('announcetool')
+        return status, data
     
     except ConnectionError as e:
         return 503, {'error': str(e)}
@@ -2,21 +2,80 @@
 
 Endpoint:
     GET /api/dashboard — aggregate system stats
+
+The per-tool collectors run concurrently on a shared thread pool. A
+source that has not answered within SOURCE_TIMEOUT seconds is reported
+as timed out instead of holding up the whole response; its collector
+keeps running in the background, and later requests wait on that same
+call rather than starting another one.
+
+Requests are answered from a snapshot of the sections that are the same
+for every user (todo, memo, mail, announce, health), so dashboard latency
+does not depend on backend latency. A background thread refreshes the
+snapshot every REFRESH_INTERVAL seconds while the dashboard is in use,
+and sooner after a write to one of those tools (see generations.py). A
+request finding the snapshot old gets it anyway and wakes the refresher;
+only a missing snapshot, or one older than IDLE_AFTER, is rebuilt while
+the request waits. The per-user section (unread messages) is cached for
+USER_TTL seconds. snapshot_age in the response is the snapshot's age in
+seconds.
 """
+import os
+import threading
 import traceback
 import time
-from hurricanesoft_cli.db_factory import get_connection
-from hurricanesoft_api import __version__
+from concurrent.futures import ThreadPoolExecutor, wait
+from hurricanesoft_api import __version__, bootstrap, dbpool, dbquery, generations
+from hurricanesoft_api.router import Router
 
 
 # Server start time for uptime calculation
 _start_time = time.time()
 
+# Seconds to wait for the slowest stat source
+SOURCE_TIMEOUT = 2.0
+# Threads running stat collectors, shared by all dashboard requests
+COLLECTOR_THREADS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+_inflight = {}      # (section, args) -> Future of a running collector
+_inflight_lock = threading.Lock()
+
+# Seconds between background snapshot refreshes (overridable via --dashboard-refresh)
+REFRESH_INTERVAL = 30
+# Without a dashboard request for this long the refresher pauses, and the
+# next request rebuilds the snapshot before answering
+IDLE_AFTER = 300
+# Minimum seconds between two refreshes, so bursts of writes coalesce
+MIN_REFRESH_GAP = 1
+# Seconds a user's own sections are cached
+USER_TTL = 10
+USER_CACHE_ENTRIES = 1024
+
+# Tools whose writes make the shared snapshot stale
+SNAPSHOT_TOOLS = ('todotool', 'memotool', 'mailtool', 'announcetool', 'healthtool')
+
+_snapshot = None
+_dirty = False                  # a write changed data in the snapshot
+_last_request = 0.0             # monotonic time of the last dashboard request
+_wake = threading.Event()
+_refresh_lock = threading.Lock()
+_refresher_pid = None
+_user_sections = {}             # (username, msgtool generation) -> (result, ms, expires)
+
+
+def configure(refresh_interval=None):
+    """Override the snapshot refresh interval."""
+    global REFRESH_INTERVAL
+    if refresh_interval is not None:
+        REFRESH_INTERVAL = max(1, refresh_interval)
+
 
 def _get_conn(tool_name, sqlite_init_fn, pg_init_fn=None):
     """Helper to get DB connection for a tool."""
     try:
-        conn, _ = get_connection(tool_name, sqlite_init_fn=sqlite_init_fn, pg_init_fn=pg_init_fn)
+        conn = dbpool.connect(tool_name, sqlite_init_fn, pg_init_fn)
         return conn
     except Exception:
         return None
@@ -32,20 +91,20 @@ def _get_todo_stats():
         except (ImportError, RuntimeError):
             pg_init = None
         
-        conn = _get_conn('todotool', sqlite_db.get_conn, pg_init)
+        conn = _get_conn('todotool', bootstrap.sqlite_init_fn('todotool', sqlite_db), pg_init)
         if not conn:
             return {'error': 'DB unavailable'}
         
         from todotool import db
-        all_todos = db.list_todos(conn, limit=None)
-        
-        pending = sum(1 for t in all_todos if dict(t).get('status') != 'done')
-        completed = sum(1 for t in all_todos if dict(t).get('status') == 'done')
+        by_status = dbquery.count_by('todotool', conn, db.list_todos,
+                                     kwargs={'limit': None}, column='status')
+        total = sum(by_status.values())
+        completed = by_status.get('done', 0)
         
         return {
-            'pending': pending,
+            'pending': total - completed,
             'completed': completed,
-            'total': len(all_todos)
+            'total': total
         }
     except Exception as e:
         return {'error': str(e)}
@@ -61,15 +120,14 @@ def _get_memo_stats():
         except (ImportError, RuntimeError):
             pg_init = None
         
-        conn = _get_conn('memotool', sqlite_db.init_db, pg_init)
+        conn = _get_conn('memotool', bootstrap.sqlite_init_fn('memotool', sqlite_db), pg_init)
         if not conn:
             return {'error': 'DB unavailable'}
         
         from memotool import db
-        all_memos = db.list_memos(conn, limit=None)
         
         return {
-            'total': len(all_memos)
+            'total': dbquery.count_rows('memotool', conn, db.list_memos, kwargs={'limit': None})
         }
     except Exception as e:
         return {'error': str(e)}
@@ -85,7 +143,7 @@ def _get_msg_stats(username):
         except (ImportError, RuntimeError):
             pg_init = None
         
-        conn = _get_conn('msgtool', sqlite_db.init_db, pg_init)
+        conn = _get_conn('msgtool', bootstrap.sqlite_init_fn('msgtool', sqlite_db), pg_init)
         if not conn:
             return {'error': 'DB unavailable'}
         
@@ -103,15 +161,16 @@ def _get_mail_stats():
     """Get mail statistics."""
     try:
         from mailtool import db as sqlite_db
-        conn = _get_conn('mailtool', sqlite_db.get_conn)
+        conn = _get_conn('mailtool', bootstrap.sqlite_init_fn('mailtool', sqlite_db))
         if not conn:
             return {'error': 'DB unavailable'}
         
         from mailtool import db
-        messages = db.list_messages(conn, folder='inbox', limit=None, is_read=0)
+        unread = dbquery.count_rows('mailtool', conn, db.list_messages,
+                                    kwargs={'folder': 'inbox', 'limit': None, 'is_read': 0})
         
         return {
-            'unread': len(messages)
+            'unread': unread
         }
     except Exception as e:
         return {'error': str(e)}
@@ -127,16 +186,17 @@ def _get_announce_stats():
         except (ImportError, RuntimeError):
             pg_init = None
         
-        conn = _get_conn('announcetool', sqlite_db.init_db, pg_init)
+        conn = _get_conn('announcetool', bootstrap.sqlite_init_fn('announcetool', sqlite_db), pg_init)
         if not conn:
             return {'error': 'DB unavailable'}
         
         from announcetool import db
         # Count announcements that need acknowledgement (not archived)
-        announcements = db.list_announcements(conn, archived=False, limit=None)
+        pending = dbquery.count_rows('announcetool', conn, db.list_announcements,
+                                     kwargs={'archived': False, 'limit': None})
         
         return {
-            'pending': len(announcements)
+            'pending': pending
         }
     except Exception as e:
         return {'error': str(e)}
@@ -145,7 +205,6 @@ def _get_announce_stats():
 def _get_health_status():
     """Get health check status."""
     try:
-        from hurricanesoft_cli.db_factory import get_connection
         from healthtool import db as sqlite_db
         try:
             from healthtool import db_pg
@@ -153,7 +212,7 @@ def _get_health_status():
         except (ImportError, RuntimeError):
             pg_init = None
         
-        conn = _get_conn('healthtool', sqlite_db.get_conn, pg_init)
+        conn = _get_conn('healthtool', bootstrap.sqlite_init_fn('healthtool', sqlite_db), pg_init)
         if not conn:
             return {'status': 'unavailable'}
         
@@ -180,32 +239,236 @@ def _get_system_info():
     return {
         'version': __version__,
         'uptime': f"{hours}h {minutes}m",
-        'uptime_seconds': uptime_seconds
+        'uptime_seconds': uptime_seconds,
+        'db_pool': dbpool.stats()
+    }
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=COLLECTOR_THREADS,
+                                               thread_name_prefix='dashboard')
+    return _executor
+
+
+def _timed(fn, args):
+    """Run a collector in its own DB scope; returns (result, milliseconds)."""
+    t0 = time.perf_counter()
+    with dbpool.scope():
+        result = fn(*args)
+    return result, round((time.perf_counter() - t0) * 1000, 2)
+
+
+def _submit(section, fn, args):
+    """Start fn(*args), or join the same call if one is still running."""
+    key = (section, args)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+        future = _inflight[key] = _get_executor().submit(_timed, fn, args)
+    # Outside the lock: the callback runs immediately if fn already finished
+    future.add_done_callback(lambda f: _forget(key, f))
+    return future
+
+
+def _forget(key, future):
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+def _collect(sources, timeout=None):
+    """Run collectors concurrently.
+
+    Args:
+        sources: (section, fn, args, timeout result) tuples
+        timeout: Seconds to wait for all of them (default SOURCE_TIMEOUT)
+
+    Returns:
+        (results dict, timings dict in milliseconds, timed-out sections)
+    """
+    t0 = time.perf_counter()
+    futures = {section: _submit(section, fn, args) for section, fn, args, _ in sources}
+    wait(futures.values(), timeout=SOURCE_TIMEOUT if timeout is None else timeout)
+    waited = round((time.perf_counter() - t0) * 1000, 2)
+
+    results, timings, timed_out = {}, {}, []
+    for section, _, _, on_timeout in sources:
+        future = futures[section]
+        if not future.done():
+            results[section], timings[section] = dict(on_timeout), waited
+            timed_out.append(section)
+            continue
+        try:
+            results[section], timings[section] = future.result()
+        except Exception as e:
+            results[section], timings[section] = {'error': str(e)}, waited
+    return results, timings, timed_out
+
+
+class _Snapshot:
+    """Shared dashboard sections collected at one point in time."""
+
+    __slots__ = ('sections', 'timings', 'taken_at')
+
+    def __init__(self, sections, timings):
+        self.sections = sections
+        self.timings = timings
+        self.taken_at = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.taken_at
+
+
+def _shared_sources():
+    return [
+        ('todo', _get_todo_stats, (), {'error': 'timeout'}),
+        ('memo', _get_memo_stats, (), {'error': 'timeout'}),
+        ('mail', _get_mail_stats, (), {'error': 'timeout'}),
+        ('announce', _get_announce_stats, (), {'error': 'timeout'}),
+        ('health', _get_health_status, (), {'status': 'timeout'}),
+    ]
+
+
+def _refresh(max_age=None):
+    """Collect the shared sections and swap in a new snapshot.
+
+    Args:
+        max_age: Skip the refresh if, once it is our turn, a clean
+            snapshot younger than this exists (another thread refreshed)
+    """
+    global _snapshot, _dirty
+    with _refresh_lock:
+        old = _snapshot
+        if max_age is not None and old is not None and not _dirty and old.age() < max_age:
+            return old
+        _dirty = False
+        sections, timings, timed_out = _collect(_shared_sources())
+        if old is not None:
+            # A slow source keeps its last known value rather than a timeout marker
+            for section in timed_out:
+                if section in old.sections:
+                    sections[section] = old.sections[section]
+        _snapshot = _Snapshot(sections, timings)
+        return _snapshot
+
+
+def _refresh_loop():
+    while True:
+        _wake.wait(REFRESH_INTERVAL)
+        _wake.clear()
+        if time.monotonic() - _last_request > IDLE_AFTER:
+            continue
+        try:
+            _refresh()
+        except Exception:
+            traceback.print_exc()
+        time.sleep(MIN_REFRESH_GAP)
+
+
+def _ensure_refresher():
+    global _refresher_pid
+    if _refresher_pid == os.getpid():
+        return
+    with _refresh_lock:
+        if _refresher_pid == os.getpid():
+            return
+        threading.Thread(target=_refresh_loop, name='dashboard-refresh', daemon=True).start()
+        _refresher_pid = os.getpid()
+
+
+def _get_snapshot():
+    """Return the shared snapshot, stale-while-revalidate."""
+    global _last_request
+    _last_request = time.monotonic()
+    _ensure_refresher()
+    snapshot = _snapshot
+    if snapshot is None or snapshot.age() > IDLE_AFTER:
+        return _refresh(max_age=IDLE_AFTER)
+    if _dirty or snapshot.age() > REFRESH_INTERVAL:
+        _wake.set()
+    return snapshot
+
+
+def _on_write(tool, generation):
+    global _dirty
+    if tool in SNAPSHOT_TOOLS:
+        _dirty = True
+        _wake.set()
+
+
+generations.subscribe(_on_write)
+
+
+def _user_stats(username):
+    """Per-user sections, cached for USER_TTL; returns (results, timings)."""
+    key = (username, generations.current('msgtool'))
+    now = time.monotonic()
+    hit = _user_sections.get(key)
+    if hit is not None and hit[2] > now:
+        return hit[0], hit[1]
+    results, timings, timed_out = _collect([
+        ('msg', _get_msg_stats, (username,), {'error': 'timeout'}),
+    ])
+    if not timed_out:
+        if len(_user_sections) >= USER_CACHE_ENTRIES:
+            _user_sections.clear()
+        _user_sections[key] = (results, timings, now + USER_TTL)
+    return results, timings
+
+
+routes = Router('/api/dashboard')
+
+
+@routes.route('GET', '')
+def _dashboard(username):
+    """Aggregate all stats."""
+    snapshot = _get_snapshot()
+    user_sections, user_timings = _user_stats(username)
+    shared = snapshot.sections
+    return 200, {
+        'todo': shared['todo'],
+        'memo': shared['memo'],
+        'msg': user_sections['msg'],
+        'mail': shared['mail'],
+        'announce': shared['announce'],
+        'health': shared['health'],
+        'system': _get_system_info(),
+        'timings': dict(snapshot.timings, **user_timings),
+        'snapshot_age': round(snapshot.age(), 1),
     }
 
 
 def handle(method, path, body, user):
     """Handle /api/dashboard requests."""
+    # RouteError (404 / 405) propagates to server.py, which adds Allow
+    route, params = routes.match(method, path)
+
     try:
-        if method != 'GET':
-            return 405, {'error': 'Method not allowed'}
-        
         username = user.get('username', '')
-        
-        # Aggregate all stats
-        dashboard = {
-            'todo': _get_todo_stats(),
-            'memo': _get_memo_stats(),
-            'msg': _get_msg_stats(username),
-            'mail': _get_mail_stats(),
-            'announce': _get_announce_stats(),
-            'health': _get_health_status(),
-            'system': _get_system_info()
-        }
-        
-        return 200, dashboard
+        return route.fn(username, **params)
     
     except Exception as e:
         tb = traceback.format_exc()
         print(f"Error in dashboard route: {e}\n{tb}")
         return 500, {'error': f'Internal server error: {str(e)}'}
+
+
+def _after_fork():
+    # Executor and refresher threads do not survive fork(); the child
+    # starts its own on first use (_ensure_refresher checks the pid)
+    global _executor, _executor_lock, _inflight_lock, _wake, _refresh_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+    _inflight_lock = threading.Lock()
+    _inflight.clear()
+    _wake = threading.Event()
+    _refresh_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -6,14 +6,15 @@ Endpoints:
     GET    /api/health/history     — check history (?machine=&check=&limit=&days=)
     GET    /api/health/machines    — list machines
 """
-from hurricanesoft_cli.db_factory import get_connection
+from hurricanesoft_api import bootstrap, dbpool, dbquery, generations
+from hurricanesoft_api.router import Router
 import socket
 
 
 def _get_conn():
     from healthtool import db as sqlite_db
-    # Initialize DB if needed (creates tables on first access)
-    conn, _ = get_connection('healthtool', sqlite_init_fn=sqlite_db.init_db)
+    # init_db until the startup bootstrap has created the tables
+    conn = dbpool.connect('healthtool', bootstrap.sqlite_init_fn('healthtool', sqlite_db))
     return conn
 
 
@@ -23,40 +24,55 @@ def _row(r):
     return dict(r) if hasattr(r, 'keys') else r
 
 
+routes = Router('/api/health', tool='healthtool')
+
+
+@routes.route('GET', '', '/status')
+def _status(db, checks, conn, body):
+    p = body or {}
+    machine = p.get('machine', socket.gethostname())
+    rows = db.get_latest(conn, machine)
+    return 200, [_row(r) for r in rows] if rows else []
+
+
+@routes.route('POST', '/run')
+def _run(db, checks, conn, body):
+    machine = socket.gethostname()
+    results = []
+    results.append(checks.check_cpu())
+    results.append(checks.check_memory())
+    results.append(checks.check_disk('/'))
+    results.append(checks.check_network())
+    for r in results:
+        db.save_check(conn, machine, r['name'], r['status'], r.get('detail', ''), r)
+    return 200, results
+
+
+@routes.route('GET', '/history')
+def _history(db, checks, conn, body):
+    p = body or {}
+    rows = dbquery.stream(conn, db.get_history, kwargs={
+        'machine': p.get('machine'),
+        'check_name': p.get('check'),
+        'limit': int(p.get('limit', 100)),
+        'days': int(p.get('days', 30)),
+    })
+    return 200, (_row(r) for r in rows)
+
+
+@routes.route('GET', '/machines', cache=True)
+def _machines(db, checks, conn, body):
+    rows = db.list_machines(conn)
+    return 200, [_row(r) for r in rows]
+
+
 def handle(method, path, body, user):
+    # RouteError (404 / 405) propagates to server.py, which adds Allow
+    route, params = routes.match(method, path)
+
     from healthtool import db, checks
     conn = _get_conn()
-    parts = path.strip('/').split('/')
-    sub = parts[2] if len(parts) > 2 else 'status'
-
-    if method == 'GET' and sub == 'status':
-        p = body or {}
-        machine = p.get('machine', socket.gethostname())
-        rows = db.get_latest(conn, machine)
-        return 200, [_row(r) for r in rows] if rows else []
-
-    if method == 'POST' and sub == 'run':
-        machine = socket.gethostname()
-        results = []
-        results.append(checks.check_cpu())
-        results.append(checks.check_memory())
-        results.append(checks.check_disk('/'))
-        results.append(checks.check_network())
-        for r in results:
-            db.save_check(conn, machine, r['name'], r['status'], r.get('detail', ''), r)
-        return 200, results
-
-    if method == 'GET' and sub == 'history':
-        p = body or {}
-        rows = db.get_history(conn,
-                              machine=p.get('machine'),
-                              check_name=p.get('check'),
-                              limit=int(p.get('limit', 100)),
-                              days=int(p.get('days', 30)))
-        return 200, [_row(r) for r in rows]
-
-    if method == 'GET' and sub == 'machines':
-        rows = db.list_machines(conn)
-        return 200, [_row(r) for r in rows]
-
-    return 404, {'error': 'not found'}
+    status, data = route.fn(db, checks, conn, body, **params)
+    if method != 'GET' and status < 400:
+        generations.bump('healthtool')
+    return status, data
@@ -1,8 +1,8 @@
 """MsgTool REST API routes.
 
 Endpoints:
-    GET    /api/msg/inbox          — inbox (?unread=1&page=&per_page=)
-    GET    /api/msg/sent           — sent messages (?page=&per_page=)
+    GET    /api/msg/inbox          — inbox (?unread=1&page=&per_page=|&cursor=)
+    GET    /api/msg/sent           — sent messages (?page=&per_page=|&cursor=)
     GET    /api/msg/<id>           — get message
     POST   /api/msg/send           — send {to, msg, reply_to?}
     POST   /api/msg/broadcast      — broadcast {msg}
@@ -12,9 +12,9 @@ Endpoints:
     GET    /api/msg/unread         — unread count
     GET    /api/msg/users          — list users
 """
-import math
 import traceback
-from hurricanesoft_cli.db_factory import get_connection
+from hurricanesoft_api import bootstrap, dbpool, dbquery, generations
+from hurricanesoft_api.router import Router
 
 
 def _get_conn():
@@ -25,8 +25,8 @@ def _get_conn():
             pg_init = db_pg.get_conn
         except (ImportError, RuntimeError):
             pg_init = None
-        # Use init_db to ensure tables exist
-        conn, _ = get_connection('msgtool', sqlite_init_fn=sqlite_db.init_db, pg_init_fn=pg_init)
+        # init_db until the startup bootstrap has created the tables
+        conn = dbpool.connect('msgtool', bootstrap.sqlite_init_fn('msgtool', sqlite_db), pg_init)
         return conn
     except Exception as e:
         raise ConnectionError(f"Database connection failed: {e}")
@@ -38,131 +38,140 @@ def _row(r):
     return dict(r) if hasattr(r, 'keys') else r
 
 
-def _paginate(items, page=1, per_page=20):
-    """Apply pagination to a list and return paginated response."""
-    total = len(items)
-    pages = math.ceil(total / per_page) if per_page > 0 else 1
-    start = (page - 1) * per_page
-    end = start + per_page
+routes = Router('/api/msg', tool='msgtool')
+
+
+@routes.route('GET', '', '/inbox')
+def _inbox(db, conn, body, username):
+    p = body or {}
+    
+    # Pagination
+    try:
+        page = int(p.get('page', 1))
+        per_page = int(p.get('per_page', 20))
+        if page < 1:
+            page = 1
+        if per_page < 1 or per_page > 100:
+            per_page = 20
+    except (ValueError, TypeError):
+        return 400, {'error': 'Invalid pagination parameters'}
     
-    return {
-        'items': items[start:end],
-        'total': total,
-        'page': page,
-        'per_page': per_page,
-        'pages': pages
-    }
+    kwargs = {'unread_only': p.get('unread') == '1',
+              'limit': None}
+    if 'cursor' in p:
+        return 200, dbquery.paginate_keyset('msgtool', conn, db.get_inbox, args=(username,),
+                                            kwargs=kwargs, keys=('sent_at', 'id'), cursor=p['cursor'],
+                                            per_page=per_page, convert=_row)
+    return 200, dbquery.paginate('msgtool', conn, db.get_inbox, args=(username,), kwargs=kwargs,
+                                 page=page, per_page=per_page, convert=_row)
+
+
+@routes.route('GET', '/sent')
+def _sent(db, conn, body, username):
+    p = body or {}
+    
+    # Pagination
+    try:
+        page = int(p.get('page', 1))
+        per_page = int(p.get('per_page', 20))
+        if page < 1:
+            page = 1
+        if per_page < 1 or per_page > 100:
+            per_page = 20
+    except (ValueError, TypeError):
+        return 400, {'error': 'Invalid pagination parameters'}
+    
+    kwargs = {'limit': None}
+    if 'cursor' in p:
+        return 200, dbquery.paginate_keyset('msgtool', conn, db.get_sent, args=(username,),
+                                            kwargs=kwargs, keys=('sent_at', 'id'), cursor=p['cursor'],
+                                            per_page=per_page, convert=_row)
+    return 200, dbquery.paginate('msgtool', conn, db.get_sent, args=(username,), kwargs=kwargs,
+                                 page=page, per_page=per_page, convert=_row)
 
 
-def handle(method, path, body, user):
+@routes.route('GET', '/users', cache=True)
+def _users(db, conn, body, username):
+    rows = db.list_users(conn)
+    return 200, [_row(r) for r in rows]
+
+
+@routes.route('GET', '/unread')
+def _unread(db, conn, body, username):
+    count = db.count_unread(conn, username)
+    return 200, {'count': count}
+
+
+@routes.route('GET', '/mentions')
+def _mentions(db, conn, body, username):
+    p = body or {}
     try:
-        from msgtool import db
-        conn = _get_conn()
-        username = user.get('username', '')
-        parts = path.strip('/').split('/')
-        sub = parts[2] if len(parts) > 2 else 'inbox'
-
-        if method == 'GET' and sub == 'inbox':
-            p = body or {}
-            
-            # Pagination
-            try:
-                page = int(p.get('page', 1))
-                per_page = int(p.get('per_page', 20))
-                if page < 1:
-                    page = 1
-                if per_page < 1 or per_page > 100:
-                    per_page = 20
-            except (ValueError, TypeError):
-                return 400, {'error': 'Invalid pagination parameters'}
-            
-            rows = db.get_inbox(conn, username,
-                                unread_only=p.get('unread') == '1',
-                                limit=None)
-            items = [_row(r) for r in rows]
-            return 200, _paginate(items, page, per_page)
-
-        if method == 'GET' and sub == 'sent':
-            p = body or {}
-            
-            # Pagination
-            try:
-                page = int(p.get('page', 1))
-                per_page = int(p.get('per_page', 20))
-                if page < 1:
-                    page = 1
-                if per_page < 1 or per_page > 100:
-                    per_page = 20
-            except (ValueError, TypeError):
-                return 400, {'error': 'Invalid pagination parameters'}
-            
-            rows = db.get_sent(conn, username, limit=None)
-            items = [_row(r) for r in rows]
-            return 200, _paginate(items, page, per_page)
-
-        if method == 'GET' and sub == 'users':
-            rows = db.list_users(conn)
-            return 200, [_row(r) for r in rows]
-
-        if method == 'GET' and sub == 'unread':
-            count = db.count_unread(conn, username)
-            return 200, {'count': count}
-
-        if method == 'GET' and sub == 'mentions':
-            p = body or {}
-            try:
-                limit = int(p.get('limit', 20))
-            except (ValueError, TypeError):
-                return 400, {'error': 'Invalid limit parameter'}
-            
-            rows = db.get_mentions(conn, username, limit=limit)
-            return 200, [_row(r) for r in rows]
-
-        if method == 'POST' and sub == 'send':
-            # Input validation
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            if 'to' not in body or not body['to']:
-                return 400, {'error': 'to is required'}
-            if 'msg' not in body or not body['msg']:
-                return 400, {'error': 'msg is required'}
-            
-            msg_id = db.send_message(conn, username, body['to'], body['msg'],
-                                     reply_to=body.get('reply_to'))
-            return 201, {'id': msg_id, 'message': 'sent'}
-
-        if method == 'POST' and sub == 'broadcast':
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            if 'msg' not in body or not body['msg']:
-                return 400, {'error': 'msg is required'}
-            
-            count = db.broadcast(conn, username, body['msg'])
-            return 200, {'count': count, 'message': 'broadcast sent'}
-
-        # Numeric ID routes
-        try:
-            item_id = int(sub)
-        except (ValueError, TypeError):
-            return 404, {'error': 'not found'}
+        limit = int(p.get('limit', 20))
+    except (ValueError, TypeError):
+        return 400, {'error': 'Invalid limit parameter'}
+    
+    rows = db.get_mentions(conn, username, limit=limit)
+    return 200, [_row(r) for r in rows]
+
+
+@routes.route('POST', '/send')
+def _send(db, conn, body, username):
+    # Input validation
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    if 'to' not in body or not body['to']:
+        return 400, {'error': 'to is required'}
+    if 'msg' not in body or not body['msg']:
+        return 400, {'error': 'msg is required'}
+    
+    msg_id = db.send_message(conn, username, body['to'], body['msg'],
+                             reply_to=body.get('reply_to'))
+    return 201, {'id': msg_id, 'message': 'sent'}
+
+
+@routes.route('POST', '/broadcast')
+def _broadcast(db, conn, body, username):
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    if 'msg' not in body or not body['msg']:
+        return 400, {'error': 'msg is required'}
+    
+    count = db.broadcast(conn, username, body['msg'])
+    return 200, {'count': count, 'message': 'broadcast sent'}
+
+
+@routes.route('GET', '/<int:item_id>')
+def _get(db, conn, body, username, item_id):
+    row = db.get_message(conn, item_id)
+    if not row:
+        return 404, {'error': 'Message not found'}
+    return 200, _row(row)
 
-        action = parts[3] if len(parts) > 3 else None
 
-        if method == 'GET' and action is None:
-            row = db.get_message(conn, item_id)
-            if not row:
-                return 404, {'error': 'Message not found'}
-            return 200, _row(row)
+@routes.route('POST', '/<int:item_id>/read')
+def _read(db, conn, body, username, item_id):
+    db.mark_read(conn, item_id)
+    return 200, {'message': 'marked read'}
 
-        if method == 'POST' and action == 'read':
-            db.mark_read(conn, item_id)
-            return 200, {'message': 'marked read'}
 
-        if method == 'GET' and action == 'thread':
-            rows = db.get_thread(conn, item_id)
-            return 200, [_row(r) for r in rows]
+@routes.route('GET', '/<int:item_id>/thread')
+def _thread(db, conn, body, username, item_id):
+    rows = db.get_thread(conn, item_id)
+    return 200, [_row(r) for r in rows]
 
-        return 404, {'error': 'not found'}
+
+def handle(method, path, body, user):
+    # RouteError (404 / 405) propagates to server.py, which adds Allow
+    route, params = routes.match(method, path)
+
+    try:
+        from msgtool import db
+        conn = _get_conn()
+        username = user.get('username', '')
+        status, data = route.fn(db, conn, body, username, **params)
+        if method != 'GET' and status < 400:
+            generations.bump('msgtool')
+        return status, data
     
     except ConnectionError as e:
         return 503, {'error': str(e)}
@@ -1,7 +1,7 @@
 """TodoTool REST API routes.
 
 Endpoints:
-    GET    /api/todo/list          — list todos (?status=&tag=&priority=&limit=&page=&per_page=)
+    GET    /api/todo/list          — list todos (?status=&tag=&priority=&limit=&page=&per_page=|&cursor=)
     GET    /api/todo/<id>          — get single todo
     POST   /api/todo/add           — add todo {title, priority?, due_date?, note?, tags?}
     PUT    /api/todo/<id>          — edit todo {title?, priority?, due_date?, note?, tags?}
@@ -11,9 +11,9 @@ Endpoints:
     GET    /api/todo/due           — due within N days (?days=7)
     DELETE /api/todo/<id>          — (not supported yet)
 """
-import math
 import traceback
-from hurricanesoft_cli.db_factory import get_connection
+from hurricanesoft_api import bootstrap, dbpool, dbquery, generations
+from hurricanesoft_api.router import Router
 
 
 def _get_conn():
@@ -24,7 +24,7 @@ def _get_conn():
             pg_init = db_pg.get_conn
         except (ImportError, RuntimeError):
             pg_init = None
-        conn, _ = get_connection('todotool', sqlite_init_fn=sqlite_db.get_conn, pg_init_fn=pg_init)
+        conn = dbpool.connect('todotool', bootstrap.sqlite_init_fn('todotool', sqlite_db), pg_init)
         return conn
     except Exception as e:
         raise ConnectionError(f"Database connection failed: {e}")
@@ -38,126 +38,127 @@ def _row_to_dict(row):
     return row
 
 
-def _paginate(items, page=1, per_page=20):
-    """Apply pagination to a list and return paginated response."""
-    total = len(items)
-    pages = math.ceil(total / per_page) if per_page > 0 else 1
-    start = (page - 1) * per_page
-    end = start + per_page
+routes = Router('/api/todo', tool='todotool')
+
+
+# GET /api/todo/list
+@routes.route('GET', '', '/list')
+def _list(db, conn, body, username):
+    params = body or {}
+    
+    # Pagination params
+    try:
+        page = int(params.get('page', 1))
+        per_page = int(params.get('per_page', 20))
+        if page < 1:
+            page = 1
+        if per_page < 1 or per_page > 100:
+            per_page = 20
+    except (ValueError, TypeError):
+        return 400, {'error': 'Invalid pagination parameters'}
+    
+    kwargs = {'status': params.get('status'),
+              'tag': params.get('tag'),
+              'priority': params.get('priority'),
+              'limit': None}
+    if 'cursor' in params:
+        return 200, dbquery.paginate_keyset('todotool', conn, db.list_todos, kwargs=kwargs,
+                                            keys=('id',), cursor=params['cursor'],
+                                            per_page=per_page, convert=_row_to_dict)
+    return 200, dbquery.paginate('todotool', conn, db.list_todos, kwargs=kwargs,
+                                 page=page, per_page=per_page, convert=_row_to_dict)
+
+
+# GET /api/todo/tags
+@routes.route('GET', '/tags', cache=True)
+def _tags(db, conn, body, username):
+    tags = db.list_all_tags(conn)
+    return 200, [_row_to_dict(t) for t in tags]
+
+
+# GET /api/todo/due
+@routes.route('GET', '/due')
+def _due(db, conn, body, username):
+    params = body or {}
+    try:
+        days = int(params.get('days', 7))
+    except (ValueError, TypeError):
+        return 400, {'error': 'Invalid days parameter'}
+    
+    rows = db.list_due_within(conn, days)
+    return 200, [_row_to_dict(r) for r in rows]
+
+
+# POST /api/todo/add
+@routes.route('POST', '/add')
+def _add(db, conn, body, username):
+    # Input validation
+    if not body:
+        return 400, {'error': 'Request body is required'}
+    if 'title' not in body or not body['title']:
+        return 400, {'error': 'title is required'}
+    
+    todo_id = db.add_todo(conn, body['title'],
+                          priority=body.get('priority', 'medium'),
+                          due_date=body.get('due_date'),
+                          note=body.get('note', ''),
+                          created_by=username,
+                          tags=body.get('tags'))
+    return 201, {'id': todo_id, 'message': 'created'}
+
+
+# POST /api/todo/<id>/done
+@routes.route('POST', '/<int:item_id>/done')
+def _done(db, conn, body, username, item_id):
+    db.mark_done(conn, item_id, changed_by=username)
+    return 200, {'message': 'marked done'}
+
+
+# GET /api/todo/<id>/history
+@routes.route('GET', '/<int:item_id>/history')
+def _history(db, conn, body, username, item_id):
+    rows = db.get_history(conn, item_id)
+    return 200, [_row_to_dict(r) for r in rows]
+
+
+# GET /api/todo/<id>
+@routes.route('GET', '/<int:item_id>')
+def _get(db, conn, body, username, item_id):
+    row = db.get_todo(conn, item_id)
+    if not row:
+        return 404, {'error': 'Todo not found'}
+    return 200, _row_to_dict(row)
+
+
+# PUT /api/todo/<id>
+@routes.route('PUT', '/<int:item_id>')
+def _edit(db, conn, body, username, item_id):
+    if not body:
+        return 400, {'error': 'Request body is required'}
     
-    return {
-        'items': items[start:end],
-        'total': total,
-        'page': page,
-        'per_page': per_page,
-        'pages': pages
-    }
+    db.edit_todo(conn, item_id,
+                 title=body.get('title'),
+                 priority=body.get('priority'),
+                 due_date=body.get('due_date'),
+                 note=body.get('note'),
+                 tags=body.get('tags'),
+                 changed_by=username)
+    return 200, {'message': 'updated'}
 
 
 def handle(method, path, body, user):
     """Handle /api/todo/* requests."""
+    # RouteError (404 / 405) propagates to server.py, which adds Allow
+    route, params = routes.match(method, path)
+
     try:
         from todotool import db
         conn = _get_conn()
         username = user.get('username', '')
-        parts = path.strip('/').split('/')  # e.g. ['api', 'todo', 'list']
-        sub = parts[2] if len(parts) > 2 else 'list'
-
-        # GET /api/todo/list
-        if method == 'GET' and sub == 'list':
-            params = body or {}
-            
-            # Pagination params
-            try:
-                page = int(params.get('page', 1))
-                per_page = int(params.get('per_page', 20))
-                if page < 1:
-                    page = 1
-                if per_page < 1 or per_page > 100:
-                    per_page = 20
-            except (ValueError, TypeError):
-                return 400, {'error': 'Invalid pagination parameters'}
-            
-            rows = db.list_todos(conn,
-                                 status=params.get('status'),
-                                 tag=params.get('tag'),
-                                 priority=params.get('priority'),
-                                 limit=None)  # Get all, then paginate
-            items = [_row_to_dict(r) for r in rows]
-            return 200, _paginate(items, page, per_page)
-
-        # GET /api/todo/tags
-        if method == 'GET' and sub == 'tags':
-            tags = db.list_all_tags(conn)
-            return 200, [_row_to_dict(t) for t in tags]
-
-        # GET /api/todo/due
-        if method == 'GET' and sub == 'due':
-            params = body or {}
-            try:
-                days = int(params.get('days', 7))
-            except (ValueError, TypeError):
-                return 400, {'error': 'Invalid days parameter'}
-            
-            rows = db.list_due_within(conn, days)
-            return 200, [_row_to_dict(r) for r in rows]
-
-        # POST /api/todo/add
-        if method == 'POST' and sub == 'add':
-            # Input validation
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            if 'title' not in body or not body['title']:
-                return 400, {'error': 'title is required'}
-            
-            todo_id = db.add_todo(conn, body['title'],
-                                  priority=body.get('priority', 'medium'),
-                                  due_date=body.get('due_date'),
-                                  note=body.get('note', ''),
-                                  created_by=username,
-                                  tags=body.get('tags'))
-            return 201, {'id': todo_id, 'message': 'created'}
-
-        # Numeric ID routes
-        try:
-            item_id = int(sub)
-        except (ValueError, TypeError):
-            return 404, {'error': 'not found'}
-
-        action = parts[3] if len(parts) > 3 else None
-
-        # POST /api/todo/<id>/done
-        if method == 'POST' and action == 'done':
-            db.mark_done(conn, item_id, changed_by=username)
-            return 200, {'message': 'marked done'}
-
-        # GET /api/todo/<id>/history
-        if method == 'GET' and action == 'history':
-            rows = db.get_history(conn, item_id)
-            return 200, [_row_to_dict(r) for r in rows]
-
-        # GET /api/todo/<id>
-        if method == 'GET' and action is None:
-            row = db.get_todo(conn, item_id)
-            if not row:
-                return 404, {'error': 'Todo not found'}
-            return 200, _row_to_dict(row)
-
-        # PUT /api/todo/<id>
-        if method == 'PUT' and action is None:
-            if not body:
-                return 400, {'error': 'Request body is required'}
-            
-            db.edit_todo(conn, item_id,
-                         title=body.get('title'),
-                         priority=body.get('priority'),
-                         due_date=body.get('due_date'),
-                         note=body.get('note'),
-                         tags=body.get('tags'),
-                         changed_by=username)
-            return 200, {'message': 'updated'}
-
-        return 404, {'error': 'not found'}
+        status, data = route.fn(db, conn, body, username, **params)
+        if method != 'GET' and status < 400:
+            generations.bump('todotool')
+        return status, data
     
     except ConnectionError as e:
         return 503, {'error': str(e)}
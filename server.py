@@ -6,19 +6,28 @@ No Flask/FastAPI dependency.
 
 Usage:
     python -m hurricanesoft_api.server [--port 8080] [--host 0.0.0.0] [--static ./static]
+                                       [--workers 8] [--queue-size 64]
+                                       [--processes 4] [--reuse-port]
+                                       [--engine threads|asyncio]
 """
 import http.server
 import json
 import os
-import sys
+import queue
+import selectors
+import socket
 import datetime
+import threading
 import time
 import traceback
+from collections import deque
 from urllib.parse import urlparse, parse_qs
 
-from hurricanesoft_api import __version__
+from hurricanesoft_api import (__version__, bootstrap, compression, conditional, context, dbpool,
+                               metrics, profiling, response_cache, static_files, streaming)
 from hurricanesoft_api.middleware import authenticate, cors_headers, handle_cors_preflight
-from hurricanesoft_api.logger import log_request, log_error, log_info
+from hurricanesoft_api.router import RouteError
+from hurricanesoft_api.logger import log_access, log_request, log_error, log_info, log_warning
 
 # Route registry: prefix → module
 ROUTE_MAP = {
@@ -32,11 +41,38 @@ ROUTE_MAP = {
     '/api/dashboard': 'hurricanesoft_api.routes.dashboard',
 }
 
+# Admin-only profile downloads (see profiling.py)
+PROFILES_PATH = '/api/admin/profiles'
+
 # Cached route modules
 _route_modules = {}
 
+# Segment counts of the ROUTE_MAP prefixes, longest first (see _compile_prefixes)
+_prefix_depths = []
+
 STATIC_DIR = None
 
+# Worker pool defaults (overridable via --workers / --queue-size)
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 64
+
+# HTTP/1.1 keep-alive (overridable via --keepalive-timeout / --max-keepalive-requests)
+KEEPALIVE_TIMEOUT = 5
+MAX_KEEPALIVE_REQUESTS = 100
+
+# Query parameters that are meaningful even when empty (?cursor= asks for
+# the first page in keyset pagination mode)
+BLANK_QUERY_PARAMS = ('cursor',)
+
+# Cache-Control for static URLs carrying a ?v= version (see static_files.py)
+STATIC_IMMUTABLE = 'public, max-age=31536000, immutable'
+# Read size when a large static file cannot be sent with sendfile()
+STATIC_CHUNK_SIZE = 64 * 1024
+
+# Unread request bodies up to this size are drained to keep the connection
+# usable; anything larger closes the connection instead.
+MAX_DISCARD_BYTES = 1024 * 1024
+
 
 def _get_route_module(prefix):
     """Lazily import and cache route module."""
@@ -46,6 +82,38 @@ def _get_route_module(prefix):
     return _route_modules[prefix]
 
 
+def _compile_prefixes():
+    """Precompute the prefix depths _match_prefix probes."""
+    global _prefix_depths
+    _prefix_depths = sorted({prefix.count('/') + 1 for prefix in ROUTE_MAP}, reverse=True)
+
+
+def _match_prefix(path):
+    """Return the ROUTE_MAP prefix owning path, or None.
+
+    One dict probe per distinct prefix depth instead of a scan over every
+    prefix; the longest matching prefix wins.
+    """
+    segments = path.split('/')
+    for depth in _prefix_depths:
+        if len(segments) >= depth:
+            candidate = '/'.join(segments[:depth])
+            if candidate in ROUTE_MAP:
+                return candidate
+    return None
+
+
+_compile_prefixes()
+
+
+def _route_template(mod, method, path):
+    """Route template path resolves to in mod, or None."""
+    try:
+        return mod.routes.match(method, path)[0].template
+    except (AttributeError, RouteError):
+        return None
+
+
 def _json_serial(obj):
     """JSON serializer for non-standard types."""
     if isinstance(obj, (datetime.date, datetime.datetime)):
@@ -55,18 +123,191 @@ def _json_serial(obj):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
+def _render_metrics():
+    """Request metrics plus gauges read from other modules at scrape time."""
+    extra = []
+    for tool, stats in dbpool.stats().items():
+        for state in ('in_use', 'idle'):
+            extra.append(('db_pool_connections', (('tool', tool), ('state', state)), stats[state]))
+        for event in ('created', 'reused', 'discarded', 'waits', 'timeouts'):
+            extra.append(('db_pool_events_total', (('tool', tool), ('event', event)), stats[event]))
+    cache = response_cache.stats()
+    extra.append(('response_cache_entries', (), cache['entries']))
+    extra.append(('response_cache_bytes', (), cache['bytes']))
+    return metrics.render(extra)
+
+
 class APIHandler(http.server.BaseHTTPRequestHandler):
     """Request handler for the unified API."""
 
+    protocol_version = 'HTTP/1.1'
+    # Idle timeout between requests on a persistent connection
+    timeout = KEEPALIVE_TIMEOUT
+    requests_on_connection = 0
+    _close_after_response = False
+    # Set when the connection stays open with no request pending; a server
+    # with park_idle waits for the next one without holding a worker
+    idle = False
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        self._handle_pending()
+
+    def resume(self):
+        """Serve the next request on a connection the server parked as idle."""
+        self.idle = False
+        try:
+            self.handle_one_request()
+            self._handle_pending()
+        finally:
+            self.finish()
+
+    def _handle_pending(self):
+        """Serve requests that already arrived (pipelined), then go idle."""
+        park = getattr(self.server, 'park_idle', False)
+        while not self.close_connection:
+            if park and not self._input_pending():
+                self.idle = True
+                return
+            self.handle_one_request()
+
+    def _input_pending(self):
+        """True if the next request has started to arrive; never blocks."""
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            # Let handle_one_request run into the error and close
+            return True
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def finish(self):
+        if self.idle:
+            # Parked: keep rfile (and anything it buffered) for resume()
+            self.wfile.flush()
+            return
+        super().finish()
+
+    def end_headers(self):
+        if self._close_after_response and not self.close_connection:
+            self.send_header('Connection', 'close')
+        super().end_headers()
+
+    def log_request(self, code='-', size='-'):
+        # Requests are already logged by _route (log_request / log_access)
+        pass
+
     def log_message(self, format, *args):
-        sys.stderr.write("[%s] %s\n" % (
-            self.log_date_time_string(), format % args))
+        # Malformed requests, timeouts: through the queued writer, not stderr
+        log_warning(format % args, self.address_string())
+
+    def _compress(self, body, content_type, cached=None):
+        """Compress body for the client's Accept-Encoding when worthwhile.
+
+        cached (a response_cache.Entry) keeps the compressed variant so
+        the same body is only compressed once.
+
+        Returns (body, content_encoding); content_encoding is None when the
+        body is sent uncompressed.
+        """
+        encoding = self._pick_encoding(len(body), content_type)
+        if not encoding:
+            return body, None
+        if cached is not None:
+            packed = cached.compressed(encoding)
+        else:
+            packed = compression.compress(body, encoding)
+        if len(packed) >= len(body):
+            return body, None
+        return packed, encoding
+
+    def _pick_encoding(self, size, content_type):
+        """Content coding _compress would try for a body, or None."""
+        if size < compression.MIN_SIZE or not compression.is_compressible(content_type):
+            return None
+        return compression.negotiate(self.headers.get('Accept-Encoding'))
+
+    def _write_body(self, data):
+        self.wfile.write(data)
+        context.add_bytes(len(data))
+
+    def _send_json(self, status, data, extra_headers=None, cache_key=None):
+        """Encode and send data; a 200 body is stored under cache_key if given.
 
-    def _send_json(self, status, data, extra_headers=None):
-        body = json.dumps(data, default=_json_serial, ensure_ascii=False).encode('utf-8')
+        Complete 200 GET bodies carry an ETag; a matching If-None-Match
+        gets 304 instead. Returns the status code sent.
+        """
+        with context.stage('serialize'):
+            if streaming.is_streaming(data):
+                # Route returned an iterator: buffer a bounded head and only
+                # switch to chunked streaming if the body outgrows it
+                fragments = streaming.iter_json(data, _json_serial)
+                body, rest = streaming.prefetch(fragments)
+                if rest is not None:
+                    # Encoding and writing interleave, so both count as serialize
+                    self._send_json_stream(status, body, rest, extra_headers)
+                    return status
+            else:
+                body = json.dumps(data, default=_json_serial, ensure_ascii=False).encode('utf-8')
+            cached = None
+            if cache_key is not None and status == 200:
+                cached = response_cache.put(cache_key, body)
+            etag = None
+            if status == 200 and self.command == 'GET':
+                etag = cached.etag if cached is not None else conditional.body_etag(body)
+                if conditional.none_match(self.headers.get('If-None-Match'), etag):
+                    # Revalidations (the inbox polls) must not pay for gzip
+                    return self._send_not_modified(
+                        etag, self._pick_encoding(len(body), 'application/json'))
+            body, encoding = self._compress(body, 'application/json', cached=cached)
+        self._send_json_body(status, body, encoding, extra_headers, etag)
+        return status
+
+    def _send_cached(self, entry):
+        """Send a response_cache.Entry without encoding it again.
+
+        Returns the status code sent.
+        """
+        with context.stage('serialize'):
+            if conditional.none_match(self.headers.get('If-None-Match'), entry.etag):
+                return self._send_not_modified(
+                    entry.etag, self._pick_encoding(len(entry.body), 'application/json'))
+            body, encoding = self._compress(entry.body, 'application/json', cached=entry)
+        self._send_json_body(200, body, encoding, etag=entry.etag)
+        return 200
+
+    def _send_not_modified(self, etag, encoding, last_modified=None):
+        """Answer a conditional GET whose validator matched; returns 304.
+
+        encoding is the content coding a 200 would be sent with, so the
+        ETag matches that representation's. JSON callers pass the
+        negotiated coding without compressing the body; a body too
+        incompressible to be sent encoded is the rare mismatch, and
+        none_match() ignores the suffix anyway.
+        """
+        self.send_response(304)
+        self.send_header('ETag', conditional.header_value(etag, encoding))
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        self.send_header('Vary', 'Accept-Encoding')
+        for k, v in cors_headers().items():
+            self.send_header(k, v)
+        self.end_headers()
+        return 304
+
+    def _send_json_body(self, status, body, encoding, extra_headers=None, etag=None):
         self.send_response(status)
         self.send_header('Content-Type', 'application/json; charset=utf-8')
         self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if etag:
+            self.send_header('ETag', conditional.header_value(etag, encoding))
+            # Let browsers keep the body but revalidate it on every use
+            self.send_header('Cache-Control', 'no-cache')
         # CORS
         for k, v in cors_headers().items():
             self.send_header(k, v)
@@ -74,11 +315,110 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
             for k, v in extra_headers.items():
                 self.send_header(k, v)
         self.end_headers()
-        self.wfile.write(body)
+        self._write_body(body)
+
+    def _send_text(self, status, text, content_type):
+        body, encoding = self._compress(text.encode('utf-8'), content_type)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        self._write_body(body)
+
+    def _serve_profiles(self, method, path):
+        """List stored request profiles or download one as a pstats file.
+
+        Returns:
+            (status code, username) for the access log
+        """
+        with context.stage('auth'):
+            user, err = authenticate(self.headers)
+        if err:
+            self._send_json(401, {'error': err})
+            return 401, None
+        username = user.get('username', 'anonymous')
+        if not profiling.is_admin(user):
+            self._send_json(403, {'error': 'admin only'})
+            return 403, username
+        if method != 'GET':
+            self._send_json(405, {'error': 'Method not allowed'}, {'Allow': 'GET'})
+            return 405, username
+
+        if path == PROFILES_PATH:
+            context.set_route(PROFILES_PATH)
+            self._send_json(200, {'items': profiling.list_profiles()})
+            return 200, username
+
+        context.set_route(PROFILES_PATH + '/<int:profile_id>')
+        profile_id = path[len(PROFILES_PATH) + 1:]
+        data = profiling.get_profile(int(profile_id)) if profile_id.isdigit() else None
+        if data is None:
+            self._send_json(404, {'error': 'profile not found'})
+            return 404, username
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Content-Disposition', f'attachment; filename="profile-{profile_id}.pstats"')
+        self.end_headers()
+        self._write_body(data)
+        return 200, username
+
+    def _send_json_stream(self, status, head, fragments, extra_headers=None):
+        """Send a JSON body incrementally.
+
+        Uses Transfer-Encoding: chunked for HTTP/1.1 clients and a
+        close-delimited body for HTTP/1.0. Compression, when negotiated,
+        is applied incrementally as well.
+        """
+        encoding = compression.negotiate(self.headers.get('Accept-Encoding'))
+        chunked = self.request_version != 'HTTP/1.0'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Connection', 'close')
+        for k, v in cors_headers().items():
+            self.send_header(k, v)
+        if extra_headers:
+            for k, v in extra_headers.items():
+                self.send_header(k, v)
+        self.end_headers()
+
+        def write(data):
+            if not data:
+                return
+            if chunked:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                context.add_bytes(len(data))
+            else:
+                self._write_body(data)
+
+        packer = compression.compressor(encoding) if encoding else None
+        try:
+            for chunk in streaming.iter_chunks(head, fragments):
+                write(packer.compress(chunk) if packer else chunk)
+            if packer:
+                write(packer.flush())
+        except Exception as e:
+            # Headers are gone; drop the connection so the client sees a
+            # truncated body instead of a bogus complete one
+            log_error(self.path, f"Streaming response aborted: {e}", traceback.format_exc())
+            self.close_connection = True
+            return
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
 
     def _read_body(self):
+        self._body_read = True
         length = int(self.headers.get('Content-Length', 0))
-        if length == 0:
+        if length <= 0:
             return None
         raw = self.rfile.read(length)
         content_type = self.headers.get('Content-Type', '')
@@ -86,19 +426,46 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
             return json.loads(raw)
         return raw.decode('utf-8', errors='replace')
 
+    def _discard_body(self):
+        """Consume an unread request body so the next request on this
+        connection does not start in the middle of it."""
+        if self._body_read:
+            return
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            self.close_connection = True
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            self.close_connection = True
+            return
+        if length <= 0:
+            return
+        if length > MAX_DISCARD_BYTES:
+            self.close_connection = True
+            return
+        self.rfile.read(length)
+
     def _get_query_params(self):
         parsed = urlparse(self.path)
         params = {}
-        for k, v in parse_qs(parsed.query).items():
-            params[k] = v[0] if len(v) == 1 else v
+        for k, v in parse_qs(parsed.query, keep_blank_values=True).items():
+            v = [x for x in v if x or k in BLANK_QUERY_PARAMS]
+            if v:
+                params[k] = v[0] if len(v) == 1 else v
         return params
 
     def _route(self, method):
-        start_time = time.time()
         parsed = urlparse(self.path)
         path = parsed.path.rstrip('/')
+        ctx = context.begin(method, path)
+        metrics.request_started()
         username = None
         status_code = 200
+        self._body_read = False
+        self.requests_on_connection += 1
+        self._close_after_response = (
+            MAX_KEEPALIVE_REQUESTS > 0 and self.requests_on_connection >= MAX_KEEPALIVE_REQUESTS)
 
         try:
             # CORS preflight
@@ -107,14 +474,16 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 self.send_response(status)
                 for k, v in headers.items():
                     self.send_header(k, v)
+                self.send_header('Content-Length', str(len(body)))
                 self.end_headers()
                 if body:
-                    self.wfile.write(body)
+                    self._write_body(body)
                 status_code = status
                 return
 
             # API version / health
             if path == '/api' or path == '/api/version':
+                context.set_route(path)
                 self._send_json(200, {
                     'name': 'hurricanesoft-api',
                     'version': __version__,
@@ -123,16 +492,30 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
                 status_code = 200
                 return
 
+            if path == '/api/metrics' and method == 'GET':
+                context.set_route(path)
+                with context.stage('auth'):
+                    user, err = authenticate(self.headers)
+                if err:
+                    self._send_json(401, {'error': err})
+                    status_code = 401
+                    return
+                username = user.get('username', 'anonymous')
+                self._send_text(200, _render_metrics(), 'text/plain; version=0.0.4; charset=utf-8')
+                status_code = 200
+                return
+
+            if path == PROFILES_PATH or path.startswith(PROFILES_PATH + '/'):
+                status_code, username = self._serve_profiles(method, path)
+                return
+
             # Find matching route
-            matched_prefix = None
-            for prefix in ROUTE_MAP:
-                if path == prefix or path.startswith(prefix + '/'):
-                    matched_prefix = prefix
-                    break
+            matched_prefix = _match_prefix(path)
 
             if matched_prefix:
                 # Authenticate
-                user, err = authenticate(self.headers)
+                with context.stage('auth'):
+                    user, err = authenticate(self.headers)
                 if err:
                     self._send_json(401, {'error': err})
                     status_code = 401
@@ -142,79 +525,175 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
 
                 # Parse body/params
                 if method in ('POST', 'PUT', 'PATCH', 'DELETE'):
-                    body = self._read_body()
+                    try:
+                        body = self._read_body()
+                    except ValueError:
+                        self._send_json(400, {'error': 'Invalid request body'})
+                        status_code = 400
+                        return
                     if body is None:
                         body = {}
                 else:
                     body = self._get_query_params()
 
-                # Dispatch to route handler
+                # Dispatch to route handler. The DB scope also covers sending,
+                # since streamed responses may still be reading rows.
+                profile = None
                 try:
                     mod = _get_route_module(matched_prefix)
-                    status, data = mod.handle(method, path, body, user)
-                    self._send_json(status, data)
-                    status_code = status
+                    cache_key = response_cache.key_for(getattr(mod, 'routes', None), method, path,
+                                                       body, username)
+                    if cache_key is not None:
+                        entry = response_cache.get(cache_key)
+                        if entry is not None:
+                            status_code = self._send_cached(entry)
+                            return
+                    profile = profiling.begin(method, path, self.headers.get(profiling.HEADER), user,
+                                              lambda: _route_template(mod, method, path))
+                    with dbpool.scope():
+                        with context.stage('handler'):
+                            status, data = mod.handle(method, path, body, user)
+                        status_code = self._send_json(status, data, cache_key=cache_key)
+                except RouteError as e:
+                    headers = {'Allow': ', '.join(e.allowed)} if e.allowed else None
+                    status_code = self._send_json(e.status, {'error': e.message}, headers)
                 except Exception as e:
                     tb = traceback.format_exc()
                     log_error(path, str(e), tb)
                     self._send_json(500, {'error': str(e)})
                     status_code = 500
+                finally:
+                    if profile is not None:
+                        profiling.finish(profile, ctx.route, status_code)
                 return
 
             # Static file serving for web dashboard
             if STATIC_DIR:
-                self._serve_static(path)
-                status_code = 200  # or whatever _serve_static sets
+                status_code = self._serve_static(path)
                 return
 
             self._send_json(404, {'error': 'not found'})
             status_code = 404
         
         finally:
+            self._discard_body()
             # Log request
-            duration_ms = (time.time() - start_time) * 1000
-            log_request(method, path, username or 'anonymous', status_code, duration_ms)
+            context.end()
+            log_request(method, path, username or 'anonymous', status_code, ctx.elapsed() * 1000)
+            log_access(ctx, status_code, username, self.client_address[0])
+            metrics.observe_request(ctx.route or 'other', method, status_code,
+                                    ctx.elapsed(), ctx.bytes_out)
+            profiling.note_latency(method, ctx.route, ctx.elapsed())
 
     def _serve_static(self, path):
-        """Serve static files from STATIC_DIR."""
+        """Serve static files from STATIC_DIR; returns the status code sent."""
+        context.set_route('static')
         if path == '' or path == '/':
             path = '/index.html'
-        file_path = os.path.join(STATIC_DIR, path.lstrip('/'))
-        file_path = os.path.realpath(file_path)
+        try:
+            asset = static_files.lookup(path)
+            if asset is None:
+                # SPA fallback: serve index.html for non-file paths
+                asset = static_files.lookup('/index.html')
+        except PermissionError:
+            return self._send_json(403, {'error': 'forbidden'})
+        if asset is None:
+            return self._send_json(404, {'error': 'not found'})
 
-        # Security: prevent directory traversal
-        if not file_path.startswith(os.path.realpath(STATIC_DIR)):
-            self._send_json(403, {'error': 'forbidden'})
-            return
+        if asset.data is not None:
+            return self._send_asset(asset, None)
+        # Large file: sent from disk; make sure the headers describe the
+        # version actually opened
+        try:
+            f = open(asset.path, 'rb')
+        except OSError:
+            return self._send_json(404, {'error': 'not found'})
+        with f:
+            st = os.fstat(f.fileno())
+            if asset.stamp != (st.st_mtime_ns, st.st_size):
+                asset = static_files.reload(asset, st)
+            return self._send_asset(asset, f)
 
-        if not os.path.isfile(file_path):
-            # SPA fallback: serve index.html for non-file paths
-            index = os.path.join(STATIC_DIR, 'index.html')
-            if os.path.isfile(index):
-                file_path = index
-            else:
-                self._send_json(404, {'error': 'not found'})
-                return
+    def _send_asset(self, asset, f):
+        """Send a static_files.Asset (from memory, or from open file f)."""
+        # If-None-Match takes precedence over If-Modified-Since
+        if_none_match = self.headers.get('If-None-Match')
+        if (conditional.none_match(if_none_match, asset.etag) if if_none_match else
+                conditional.not_modified_since(self.headers.get('If-Modified-Since'), asset.mtime)):
+            return self._send_not_modified(asset.etag, self._asset_encoding(asset),
+                                           asset.last_modified)
 
-        # Guess content type
-        ext = os.path.splitext(file_path)[1].lower()
-        content_types = {
-            '.html': 'text/html', '.css': 'text/css', '.js': 'application/javascript',
-            '.json': 'application/json', '.png': 'image/png', '.jpg': 'image/jpeg',
-            '.gif': 'image/gif', '.svg': 'image/svg+xml', '.ico': 'image/x-icon',
-            '.woff': 'font/woff', '.woff2': 'font/woff2', '.ttf': 'font/ttf',
-        }
-        ct = content_types.get(ext, 'application/octet-stream')
-
-        with open(file_path, 'rb') as f:
-            data = f.read()
-        self.send_response(200)
-        self.send_header('Content-Type', ct)
-        self.send_header('Content-Length', str(len(data)))
+        byte_range = None
+        if_range = self.headers.get('If-Range')
+        if not if_range or if_range in (conditional.header_value(asset.etag), asset.last_modified):
+            try:
+                byte_range = static_files.parse_range(self.headers.get('Range'), asset.size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{asset.size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return 416
+
+        status, encoding, body = 200, None, asset.data
+        first, last = 0, asset.size - 1
+        if byte_range is not None:
+            status = 206
+            first, last = byte_range
+            if body is not None:
+                body = body[first:last + 1]
+        else:
+            encoding = self._asset_encoding(asset)
+            if encoding:
+                body = asset.variants[encoding]
+        length = len(body) if body is not None else last - first + 1
+
+        versioned = not asset.is_html and 'v=' in urlparse(self.path).query
+        self.send_response(status)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(length))
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {first}-{last}/{asset.size}')
+        if compression.is_compressible(asset.content_type):
+            self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('ETag', conditional.header_value(asset.etag, encoding))
+        self.send_header('Last-Modified', asset.last_modified)
+        self.send_header('Cache-Control', STATIC_IMMUTABLE if versioned else 'no-cache')
+        self.send_header('Accept-Ranges', 'bytes')
         for k, v in cors_headers().items():
             self.send_header(k, v)
         self.end_headers()
-        self.wfile.write(data)
+        if body is not None:
+            self._write_body(body)
+        else:
+            self._send_file(f, first, length)
+        return status
+
+    def _asset_encoding(self, asset):
+        """Content coding a full 200 of asset is sent with, or None.
+
+        Only in-memory assets with a precompressed variant are sent encoded.
+        """
+        if asset.data is None:
+            return None
+        encoding = self._pick_encoding(asset.size, asset.content_type)
+        return encoding if encoding in asset.variants else None
+
+    def _send_file(self, f, offset, count):
+        """Write count bytes of f from offset, zero-copy where possible."""
+        if isinstance(self.connection, socket.socket):
+            context.add_bytes(self.connection.sendfile(f, offset, count))
+            return
+        # asyncio engine: writes go through the event loop, not a socket
+        f.seek(offset)
+        while count > 0:
+            chunk = f.read(min(STATIC_CHUNK_SIZE, count))
+            if not chunk:
+                break
+            self._write_body(chunk)
+            count -= len(chunk)
 
     def do_GET(self):
         self._route('GET')
@@ -235,16 +714,297 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
         self._route('OPTIONS')
 
 
-def run(host='0.0.0.0', port=8080, static_dir=None):
-    """Start the API server."""
+class _IdleConnections:
+    """Keep-alive connections waiting for their next request.
+
+    Parked connections sit in a selector watched by a single thread
+    instead of each blocking a pool worker. A connection that becomes
+    readable is queued for a worker again; one that stays quiet for the
+    keep-alive timeout is closed.
+    """
+
+    def __init__(self, server):
+        self._server = server
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._incoming = deque()    # parked by workers, not yet registered
+        self._deadlines = deque()   # (deadline, item), earliest first
+        self._running = True
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='hs-idle', daemon=True)
+        self._thread.start()
+
+    def park(self, item):
+        """Watch item = (request, client_address, handler) for its next request."""
+        with self._lock:
+            if self._running:
+                self._incoming.append(item)
+                item = None
+        if item is not None:
+            self._close(item)
+            return
+        self._wake()
+
+    def close(self):
+        """Close every parked connection and stop the thread."""
+        with self._lock:
+            self._running = False
+        self._wake()
+        self._thread.join(timeout=5)
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'x')
+        except OSError:
+            pass    # Socket buffer full: a wakeup is already pending
+
+    def _run(self):
+        while self._running:
+            timeout = None
+            if self._deadlines:
+                timeout = max(0.0, self._deadlines[0][0] - time.monotonic())
+            for key, _ in self._selector.select(timeout):
+                if key.fileobj is self._wake_r:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                self._server._pending.put(key.data)
+            while self._incoming:
+                item = self._incoming.popleft()
+                self._selector.register(item[0], selectors.EVENT_READ, item)
+                self._deadlines.append((time.monotonic() + item[2].timeout, item))
+            self._expire()
+        for key in list(self._selector.get_map().values()):
+            if key.fileobj is not self._wake_r:
+                self._close(key.data)
+        while self._incoming:
+            self._close(self._incoming.popleft())
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, item = self._deadlines.popleft()
+            try:
+                key = self._selector.get_key(item[0])
+            except (KeyError, ValueError):
+                continue    # Resumed (and maybe closed) since
+            if key.data is item:
+                self._selector.unregister(item[0])
+                self._close(item)
+
+    def _close(self, item):
+        request, _, handler = item
+        handler.idle = False
+        try:
+            handler.finish()
+        except OSError:
+            pass
+        self._server.shutdown_request(request)
+
+
+class ThreadPoolHTTPServer(http.server.HTTPServer):
+    """HTTPServer that dispatches connections onto a bounded worker pool.
+
+    The accept loop hands each connection to a queue drained by a fixed set
+    of worker threads. When the queue is full the accept loop blocks, so
+    overload backs up into the kernel listen backlog instead of spawning
+    unbounded threads. Between requests, keep-alive connections wait in
+    _IdleConnections and do not hold a worker.
+    """
+
+    request_queue_size = 128
+    # Handlers hand idle keep-alive connections back (see APIHandler.idle)
+    park_idle = True
+
+    def __init__(self, server_address, handler_class, workers=DEFAULT_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE, reuse_port=False, sock=None,
+                 bind_and_activate=True):
+        self.workers = max(1, workers)
+        self.reuse_port = reuse_port
+        self._pending = queue.Queue(maxsize=max(1, queue_size))
+        self._threads = []
+        self._idle = None
+        super().__init__(server_address, handler_class,
+                         bind_and_activate=bind_and_activate and sock is None)
+        if sock is not None:
+            # Serve an already-listening socket (pre-fork shared socket)
+            self.socket.close()
+            self.socket = sock
+            self.server_address = sock.getsockname()
+
+    def server_bind(self):
+        if self.reuse_port:
+            if not hasattr(socket, 'SO_REUSEPORT'):
+                raise OSError('SO_REUSEPORT is not supported on this platform')
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def _start_workers(self):
+        # Started lazily from serve_forever so forked children get live threads
+        if self._threads:
+            return
+        self._idle = _IdleConnections(self)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, args=(i,),
+                                 name=f'hs-worker-{i}', daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _worker(self, worker_id):
+        state = context.worker_state()
+        state.worker_id = worker_id
+        state.requests = 0
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            request, client_address, handler = item
+            try:
+                if handler is None:
+                    handler = self.RequestHandlerClass(request, client_address, self)
+                else:
+                    handler.resume()
+            except Exception:
+                handler = None
+                self.handle_error(request, client_address)
+            if getattr(handler, 'idle', False):
+                self._idle.park(item[:2] + (handler,))
+            else:
+                self.shutdown_request(request)
+
+    def serve_forever(self, poll_interval=0.5):
+        self._start_workers()
+        super().serve_forever(poll_interval)
+
+    def process_request(self, request, client_address):
+        # Blocks when the queue is full (bounded accept queue)
+        self._pending.put((request, client_address, None))
+
+    def server_close(self):
+        super().server_close()
+        if self._idle is not None:
+            self._idle.close()
+        for _ in self._threads:
+            self._pending.put(None)
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+
+
+def _setup_process(static_root):
+    """Initialise per-process state.
+
+    In pre-fork mode this runs in each child after fork. Route modules
+    already imported by the supervisor are inherited, not re-imported.
+    """
     global STATIC_DIR
+    STATIC_DIR = static_root
+    _compile_prefixes()
+    _route_modules.clear()
+    for prefix in ROUTE_MAP:
+        try:
+            _get_route_module(prefix)
+        except Exception as e:
+            log_error(prefix, f"Failed to load route module: {e}")
+
+
+def make_server(host, port, engine='threads', workers=DEFAULT_WORKERS,
+                queue_size=DEFAULT_QUEUE_SIZE, reuse_port=False, sock=None):
+    """Build the HTTP server for the selected engine.
+
+    Args:
+        engine: 'threads' (ThreadPoolHTTPServer) or 'asyncio' (AsyncioHTTPServer)
+        sock: Already-listening socket to serve instead of binding host:port
+    """
+    if engine == 'asyncio':
+        from hurricanesoft_api.aioserver import AsyncioHTTPServer
+        return AsyncioHTTPServer((host, port), APIHandler, workers=workers,
+                                 reuse_port=reuse_port, sock=sock)
+    return ThreadPoolHTTPServer((host, port), APIHandler, workers=workers,
+                                queue_size=queue_size, reuse_port=reuse_port, sock=sock)
+
+
+def _run_prefork(host, port, static_root, engine, workers, queue_size, processes, reuse_port):
+    """Fork worker processes sharing one listening port."""
+    from hurricanesoft_api.prefork import Supervisor
+
+    if not hasattr(os, 'fork'):
+        raise SystemExit('--processes requires a platform with os.fork()')
+
+    # Without SO_REUSEPORT the parent binds once and children inherit the socket
+    shared = None
+    if not reuse_port:
+        shared = socket.create_server((host, port), backlog=ThreadPoolHTTPServer.request_queue_size)
+
+    def worker_main(slot):
+        server = make_server(host, port, engine=engine, workers=workers,
+                             queue_size=queue_size, reuse_port=reuse_port, sock=shared)
+        _setup_process(static_root)
+        log_info(f"Worker {slot} (pid {os.getpid()}) serving on {host}:{port}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+    mode = 'SO_REUSEPORT' if reuse_port else 'shared socket'
+    print(f"🌀 HurricaneSoft API Server v{__version__}")
+    print(f"🚀 Listening on {host}:{port} ({processes} processes × {workers} workers, {engine}, {mode})")
+    print(f"📡 Endpoints: {', '.join(ROUTE_MAP.keys())}")
+    log_info(f"Server started v{__version__} on {host}:{port} with {processes} processes")
+
+    Supervisor(processes, worker_main).run()
+    if shared:
+        shared.close()
+    print("\n🛑 Server stopped.")
+
+
+def run(host='0.0.0.0', port=8080, static_dir=None, workers=DEFAULT_WORKERS,
+        queue_size=DEFAULT_QUEUE_SIZE, processes=1, reuse_port=False, engine='threads',
+        keepalive_timeout=KEEPALIVE_TIMEOUT, max_keepalive_requests=MAX_KEEPALIVE_REQUESTS,
+        gzip_level=compression.LEVEL, gzip_min_size=compression.MIN_SIZE,
+        db_pool_min=dbpool.MIN_SIZE, db_pool_max=dbpool.MAX_SIZE,
+        db_pool_idle_timeout=dbpool.IDLE_TIMEOUT, profile_sample=profiling.SAMPLE,
+        profile_slow_ms=profiling.SLOW_MS, profile_keep=profiling.KEEP,
+        dashboard_refresh=None, response_cache_mb=response_cache.MAX_BYTES / (1024 * 1024)):
+    """Start the API server."""
+    global MAX_KEEPALIVE_REQUESTS
+    APIHandler.timeout = keepalive_timeout
+    MAX_KEEPALIVE_REQUESTS = max_keepalive_requests
+    compression.configure(level=gzip_level, min_size=gzip_min_size)
+    dbpool.configure(min_size=db_pool_min, max_size=db_pool_max, idle_timeout=db_pool_idle_timeout)
+    profiling.configure(sample=profile_sample, slow_ms=profile_slow_ms, keep=profile_keep)
+    response_cache.configure(max_bytes=response_cache_mb * 1024 * 1024)
+    _get_route_module('/api/dashboard').configure(refresh_interval=dashboard_refresh)
+
+    static_root = None
     if static_dir and os.path.isdir(static_dir):
-        STATIC_DIR = os.path.realpath(static_dir)
-        print(f"📁 Static files: {STATIC_DIR}")
+        static_root = os.path.realpath(static_dir)
+        print(f"📁 Static files: {static_root}")
+    # Index once; pre-forked workers share the in-memory copies
+    static_files.load(static_root)
+
+    # Create tool schemas once; forked workers inherit the readiness
+    bootstrap.run()
+
+    if processes > 1:
+        _run_prefork(host, port, static_root, engine, workers, queue_size, processes, reuse_port)
+        return
 
-    server = http.server.HTTPServer((host, port), APIHandler)
+    _setup_process(static_root)
+    server = make_server(host, port, engine=engine, workers=workers,
+                         queue_size=queue_size, reuse_port=reuse_port)
     print(f"🌀 HurricaneSoft API Server v{__version__}")
-    print(f"🚀 Listening on {host}:{port}")
+    print(f"🚀 Listening on {host}:{port} ({server.workers} workers, {engine})")
     print(f"📡 Endpoints: {', '.join(ROUTE_MAP.keys())}")
     
     log_info(f"Server started v{__version__} on {host}:{port}")
@@ -264,8 +1024,57 @@ def main():
     parser.add_argument('--port', type=int, default=8080, help='Bind port (default: 8080)')
     default_static = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
     parser.add_argument('--static', default=default_static, help='Static files directory for web dashboard')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Worker threads handling requests (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f'Max accepted connections waiting for a worker (default: {DEFAULT_QUEUE_SIZE})')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Pre-forked worker processes sharing the port (default: 1)')
+    parser.add_argument('--reuse-port', action='store_true',
+                        help='Bind each process with SO_REUSEPORT instead of sharing one socket')
+    parser.add_argument('--engine', choices=('threads', 'asyncio'), default='threads',
+                        help='Connection handling engine (default: threads)')
+    parser.add_argument('--keepalive-timeout', type=float, default=KEEPALIVE_TIMEOUT,
+                        help=f'Idle seconds before a keep-alive connection is closed (default: {KEEPALIVE_TIMEOUT})')
+    parser.add_argument('--max-keepalive-requests', type=int, default=MAX_KEEPALIVE_REQUESTS,
+                        help=f'Requests served per connection before closing it, 0 = unlimited '
+                             f'(default: {MAX_KEEPALIVE_REQUESTS})')
+    parser.add_argument('--gzip-level', type=int, default=compression.LEVEL,
+                        help=f'gzip/deflate level 1-9, 0 disables compression (default: {compression.LEVEL})')
+    parser.add_argument('--gzip-min-size', type=int, default=compression.MIN_SIZE,
+                        help=f'Only compress bodies of at least this many bytes (default: {compression.MIN_SIZE})')
+    parser.add_argument('--db-pool-min', type=int, default=dbpool.MIN_SIZE,
+                        help=f'DB connections kept open per tool when idle (default: {dbpool.MIN_SIZE})')
+    parser.add_argument('--db-pool-max', type=int, default=dbpool.MAX_SIZE,
+                        help=f'Max PostgreSQL connections per tool (default: {dbpool.MAX_SIZE})')
+    parser.add_argument('--db-pool-idle-timeout', type=float, default=dbpool.IDLE_TIMEOUT,
+                        help=f'Seconds before surplus idle DB connections are closed '
+                             f'(default: {dbpool.IDLE_TIMEOUT})')
+    parser.add_argument('--profile-sample', type=float, default=profiling.SAMPLE,
+                        help=f'Fraction of requests to profile with cProfile (default: {profiling.SAMPLE})')
+    parser.add_argument('--profile-slow-ms', type=float, default=profiling.SLOW_MS,
+                        help=f'Profile the next request to routes slower than this, 0 = off '
+                             f'(default: {profiling.SLOW_MS})')
+    parser.add_argument('--profile-keep', type=int, default=profiling.KEEP,
+                        help=f'Request profiles kept for /api/admin/profiles (default: {profiling.KEEP})')
+    dashboard = _get_route_module('/api/dashboard')
+    parser.add_argument('--dashboard-refresh', type=float, default=dashboard.REFRESH_INTERVAL,
+                        help=f'Seconds between background refreshes of the dashboard snapshot '
+                             f'(default: {dashboard.REFRESH_INTERVAL})')
+    default_cache_mb = response_cache.MAX_BYTES / (1024 * 1024)
+    parser.add_argument('--response-cache-mb', type=float, default=default_cache_mb,
+                        help=f'Memory for cached GET responses in MB, 0 disables (default: {default_cache_mb:g})')
     args = parser.parse_args()
-    run(host=args.host, port=args.port, static_dir=args.static)
+    run(host=args.host, port=args.port, static_dir=args.static,
+        workers=args.workers, queue_size=args.queue_size,
+        processes=args.processes, reuse_port=args.reuse_port, engine=args.engine,
+        keepalive_timeout=args.keepalive_timeout,
+        max_keepalive_requests=args.max_keepalive_requests,
+        gzip_level=args.gzip_level, gzip_min_size=args.gzip_min_size,
+        db_pool_min=args.db_pool_min, db_pool_max=args.db_pool_max,
+        db_pool_idle_timeout=args.db_pool_idle_timeout, profile_sample=args.profile_sample,
+        profile_slow_ms=args.profile_slow_ms, profile_keep=args.profile_keep,
+        dashboard_refresh=args.dashboard_refresh, response_cache_mb=args.response_cache_mb)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,264 @@
+"""Static asset index for the web dashboard.
+
+load() indexes the static directory once at startup (before pre-forked
+workers are started, so they share it). Files up to MEMORY_MAX_SIZE are
+kept in memory together with their gzip/deflate variants, compressed
+once; larger files are sent from disk with sendfile(). Every asset is
+re-stat'ed at most every CHECK_INTERVAL seconds and reloaded when its
+mtime or size changed, and files added later are picked up on first
+request.
+
+Long-lived caching: local ``src="/..."`` / ``href="/..."`` references in
+HTML files are rewritten to ``/app.js?v=<etag>``. Versioned URLs change
+whenever the file does, so server.py sends them with a one-year
+Cache-Control; HTML and unversioned requests are revalidated with the
+ETag / Last-Modified validators instead.
+"""
+import os
+import re
+import threading
+import time
+
+from hurricanesoft_api import compression, conditional
+
+
+# Files up to this size are kept in memory
+MEMORY_MAX_SIZE = 256 * 1024
+# Total bytes kept in memory; further files are served from disk
+MEMORY_MAX_TOTAL = 32 * 1024 * 1024
+# Seconds between stat() calls on an asset
+CHECK_INTERVAL = 2
+# Remembered missing paths (SPA routes such as /todo)
+MISSING_ENTRIES = 1024
+
+CONTENT_TYPES = {
+    '.html': 'text/html', '.css': 'text/css', '.js': 'application/javascript',
+    '.json': 'application/json', '.png': 'image/png', '.jpg': 'image/jpeg',
+    '.gif': 'image/gif', '.svg': 'image/svg+xml', '.ico': 'image/x-icon',
+    '.woff': 'font/woff', '.woff2': 'font/woff2', '.ttf': 'font/ttf',
+}
+
+_ASSET_REF_RE = re.compile(rb'\b(src|href)="(/[^"?#]*)"')
+
+_root = None
+_assets = {}        # URL path -> Asset
+_missing = {}       # URL path -> monotonic time it was found missing
+_memory = 0         # bytes held by in-memory assets
+_version = 0        # bumped whenever an asset changes, so HTML is re-versioned
+_lock = threading.RLock()
+
+
+class Asset:
+    """One static file version."""
+
+    __slots__ = ('url', 'path', 'content_type', 'stamp', 'mtime', 'size', 'etag',
+                 'last_modified', 'data', 'variants', 'version', 'refs', 'checked_at')
+
+    def __init__(self, url, path, st):
+        ext = os.path.splitext(path)[1].lower()
+        self.url = url
+        self.path = path
+        self.content_type = CONTENT_TYPES.get(ext, 'application/octet-stream')
+        self.stamp = (st.st_mtime_ns, st.st_size)   # File version on disk
+        self.mtime = st.st_mtime
+        self.size = st.st_size
+        self.etag = conditional.file_etag(st)
+        self.last_modified = conditional.http_date(st.st_mtime)
+        self.data = None        # Contents when kept in memory
+        self.variants = {}      # content coding -> compressed contents
+        self.version = None     # _version the HTML rewrite was built for
+        self.refs = ()          # URLs of the assets an HTML file references
+        self.checked_at = time.monotonic()
+
+    @property
+    def is_html(self):
+        return self.content_type == 'text/html'
+
+    def memory_size(self):
+        return len(self.data or b'') + sum(len(v) for v in self.variants.values())
+
+
+def load(root):
+    """Index root; call once at startup, before forking workers."""
+    global _root, _memory
+    with _lock:
+        _root = os.path.realpath(root) if root else None
+        _assets.clear()
+        _missing.clear()
+        _memory = 0
+        if _root is None:
+            return
+        files = []
+        for dirpath, _, filenames in os.walk(_root):
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                files.append(('/' + os.path.relpath(path, _root).replace(os.sep, '/'), path))
+        # HTML last, so the assets it references are already indexed
+        files.sort(key=lambda f: CONTENT_TYPES.get(os.path.splitext(f[1])[1].lower()) == 'text/html')
+        for url, path in files:
+            _build(url, path)
+
+
+def lookup(url):
+    """Return the current Asset for a URL path, or None if there is no such file.
+
+    Raises:
+        PermissionError: url resolves outside the static directory
+    """
+    asset = _assets.get(url)
+    now = time.monotonic()
+    if asset is not None and now - asset.checked_at < CHECK_INTERVAL and (
+            not asset.is_html or asset.version == _version):
+        return asset
+    if asset is None:
+        seen = _missing.get(url)
+        if seen is not None and now - seen < CHECK_INTERVAL:
+            return None
+    with _lock:
+        return _refresh(url, now)
+
+
+def reload(asset, st):
+    """Replace asset after a caller found a newer version on disk (st)."""
+    with _lock:
+        if _assets.get(asset.url) is not asset:
+            return _assets.get(asset.url) or asset
+        return _build(asset.url, asset.path, st)
+
+
+def parse_range(header, size):
+    """Parse a single-range ``Range: bytes=...`` header.
+
+    Returns:
+        (first, last) inclusive byte offsets, or None to ignore the header
+        (absent, malformed or multi-range)
+
+    Raises:
+        ValueError: the range cannot be satisfied (416)
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, sep, last = header[6:].strip().partition('-')
+    if not sep or not (first or last) or not (first + last).isdigit():
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError('unsatisfiable range')
+        return max(0, size - length), size - 1
+    first = int(first)
+    if first >= size:
+        raise ValueError('unsatisfiable range')
+    last = int(last) if last else size - 1
+    if first > last:
+        return None
+    return first, min(last, size - 1)
+
+
+def _refresh(url, now):
+    """Re-check url on disk and update the index (lock held)."""
+    asset = _assets.get(url)
+    if asset is None:
+        path = _resolve(url)
+    else:
+        path = asset.path
+    try:
+        st = os.stat(path) if path else None
+    except OSError:
+        st = None
+    if st is None or not os.path.isfile(path):
+        if asset is not None:
+            _drop(url)
+        if len(_missing) >= MISSING_ENTRIES:
+            _missing.clear()
+        _missing[url] = now
+        return None
+    _missing.pop(url, None)
+    if asset is not None and asset.stamp == (st.st_mtime_ns, st.st_size):
+        asset.checked_at = now
+        for ref in asset.refs:
+            # A changed reference bumps _version, so the page is re-versioned
+            target = _assets.get(ref)
+            if target is None or now - target.checked_at >= CHECK_INTERVAL:
+                _refresh(ref, now)
+        if asset.is_html and asset.version != _version:
+            return _build(url, path, st)
+        return asset
+    return _build(url, path, st)
+
+
+def _resolve(url):
+    if _root is None:
+        return None
+    path = os.path.realpath(os.path.join(_root, url.lstrip('/')))
+    # Security: prevent directory traversal
+    if path != _root and not path.startswith(_root + os.sep):
+        raise PermissionError(url)
+    return path
+
+
+def _build(url, path, st=None):
+    """(Re)load one file into the index (lock held)."""
+    global _memory, _version
+    if st is None:
+        st = os.stat(path)
+    asset = Asset(url, path, st)
+    old = _assets.get(url)
+    if old is not None:
+        _memory -= old.memory_size()
+    if not asset.is_html and (old is None or old.stamp != asset.stamp):
+        _version += 1
+    if asset.is_html:
+        asset.version = _version
+    if asset.size <= MEMORY_MAX_SIZE and _memory + asset.size <= MEMORY_MAX_TOTAL:
+        with open(path, 'rb') as f:
+            asset.data = f.read()
+        if asset.is_html:
+            asset.data, asset.refs, newest = _version_refs(asset.data)
+            asset.size = len(asset.data)
+            asset.etag = conditional.body_etag(asset.data)
+            # The page changes when a referenced asset does
+            if newest > asset.mtime:
+                asset.mtime = newest
+                asset.last_modified = conditional.http_date(newest)
+        if compression.is_compressible(asset.content_type) and asset.size >= compression.MIN_SIZE:
+            for encoding in ('gzip', 'deflate'):
+                packed = compression.compress(asset.data, encoding)
+                if len(packed) < asset.size:
+                    asset.variants[encoding] = packed
+        _memory += asset.memory_size()
+    _assets[url] = asset
+    return asset
+
+
+def _drop(url):
+    global _memory, _version
+    old = _assets.pop(url)
+    _memory -= old.memory_size()
+    _version += 1
+
+
+def _version_refs(html):
+    """Append ?v=<etag> to references to other indexed assets.
+
+    Returns:
+        (rewritten html, referenced URLs, newest mtime of the referenced assets)
+    """
+    newest = 0.0
+    refs = []
+
+    def replace(m):
+        nonlocal newest
+        url = m.group(2).decode('utf-8', 'replace')
+        try:
+            target = _assets.get(url) or _refresh(url, time.monotonic())
+        except PermissionError:
+            target = None
+        if target is None or target.is_html:
+            return m.group(0)
+        refs.append(url)
+        newest = max(newest, target.mtime)
+        return m.group(1) + b'="' + m.group(2) + b'?v=' + target.etag.encode('ascii') + b'"'
+    html = _ASSET_REF_RE.sub(replace, html)
+    return html, tuple(refs), newest
@@ -0,0 +1,103 @@
+"""Incremental JSON encoding for streamed responses.
+
+Route handlers may return an iterator (typically a generator of row
+dicts) instead of a list, either as the whole response or as a value of
+the top-level dict, such as the ``items`` of a paginated envelope.
+iter_json() walks that structure and yields JSON text fragments while
+pulling rows lazily, so the full list is never held in memory.
+
+A value that depends on what an iterator produced (the next_cursor of a
+keyset page) can be wrapped in Deferred; it is computed when the encoder
+reaches it, after the values before it in the dict were consumed.
+
+Small results stay small: prefetch() buffers up to BUFFER_LIMIT bytes and
+the server only switches to Transfer-Encoding: chunked when the body
+turns out to be larger than that.
+"""
+import json
+from collections.abc import Iterator
+
+
+# Encoded bytes buffered before a response is switched to chunked streaming
+BUFFER_LIMIT = 64 * 1024
+# Target size of each chunk written while streaming
+CHUNK_SIZE = 16 * 1024
+
+
+class Deferred:
+    """A value computed by fn() when iter_json() reaches it."""
+
+    __slots__ = ('fn',)
+
+    def __init__(self, fn):
+        self.fn = fn
+
+
+def is_streaming(data):
+    """True if data is, or directly contains, an iterator to stream."""
+    if isinstance(data, Iterator):
+        return True
+    if isinstance(data, dict):
+        return any(isinstance(v, Iterator) for v in data.values())
+    return False
+
+
+def iter_json(obj, default=None):
+    """Yield JSON text fragments for obj, consuming iterators lazily.
+
+    Output matches json.dumps(obj, ensure_ascii=False) with iterators
+    encoded as arrays.
+    """
+    if isinstance(obj, dict) and is_streaming(obj):
+        yield '{'
+        first = True
+        for key, value in obj.items():
+            if not first:
+                yield ', '
+            first = False
+            yield json.dumps(str(key), ensure_ascii=False)
+            yield ': '
+            yield from iter_json(value, default)
+        yield '}'
+    elif isinstance(obj, Iterator):
+        yield '['
+        first = True
+        for item in obj:
+            if not first:
+                yield ', '
+            first = False
+            yield from iter_json(item, default)
+        yield ']'
+    elif isinstance(obj, Deferred):
+        yield from iter_json(obj.fn(), default)
+    else:
+        yield json.dumps(obj, default=default, ensure_ascii=False)
+
+
+def prefetch(fragments, limit=BUFFER_LIMIT):
+    """Encode fragments until limit bytes are buffered.
+
+    Returns:
+        (head bytes, remaining fragment iterator) — the iterator is None
+        when everything fit within limit.
+    """
+    buf = bytearray()
+    for fragment in fragments:
+        buf += fragment.encode('utf-8')
+        if len(buf) >= limit:
+            return bytes(buf), fragments
+    return bytes(buf), None
+
+
+def iter_chunks(head, fragments, size=CHUNK_SIZE):
+    """Yield encoded chunks of roughly size bytes, starting with head."""
+    if head:
+        yield head
+    buf = bytearray()
+    for fragment in fragments:
+        buf += fragment.encode('utf-8')
+        if len(buf) >= size:
+            yield bytes(buf)
+            buf.clear()
+    if buf:
+        yield bytes(buf)
@@ -0,0 +1,57 @@
+"""Idle pooled connections are closed even when no request releases one."""
+import time
+import unittest
+
+from hurricanesoft_api import dbpool
+
+
+class _Conn:
+
+    def __init__(self):
+        self.closed = False
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class IdleReapTest(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = (dbpool.MIN_SIZE, dbpool.MAX_SIZE, dbpool.IDLE_TIMEOUT,
+                       dbpool.REAP_INTERVAL, dbpool._reaper_pid)
+        dbpool.configure(min_size=1, max_size=10, idle_timeout=0.2)
+        dbpool.REAP_INTERVAL = 0.05
+        dbpool._reaper_pid = None       # start a reaper using the short interval
+        self.conns = []
+        dbpool._pools.pop('reaptool', None)
+
+    def tearDown(self):
+        dbpool._pools.pop('reaptool', None)
+        (dbpool.MIN_SIZE, dbpool.MAX_SIZE, dbpool.IDLE_TIMEOUT,
+         dbpool.REAP_INTERVAL, dbpool._reaper_pid) = self._saved
+
+    def _factory(self):
+        conn = _Conn()
+        self.conns.append(conn)
+        return conn, 'postgres'
+
+    def test_idle_connections_closed_after_burst(self):
+        pool = dbpool._pools['reaptool'] = dbpool.Pool('reaptool', self._factory)
+        dbpool._ensure_reaper()
+        burst = [pool.acquire() for _ in range(4)]
+        for conn in burst:
+            pool.release(conn)
+        self.assertEqual(pool.stats()['open'], 4)
+
+        deadline = time.monotonic() + 3
+        while pool.stats()['open'] > 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(pool.stats()['open'], 1)
+        self.assertEqual(sum(conn.closed for conn in self.conns), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
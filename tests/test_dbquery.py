@@ -0,0 +1,143 @@
+"""Database-side pagination must return what the tool's list function returns."""
+import sqlite3
+import unittest
+
+from hurricanesoft_api import dbpool, dbquery
+
+
+def _list_with_tags(conn, status=None, limit=None):
+    """A list function that post-processes its rows in Python."""
+    sql = "SELECT id, title, status, created FROM items"
+    params = []
+    if status:
+        sql += " WHERE status = ?"
+        params.append(status)
+    sql += " ORDER BY created DESC, id DESC"
+    rows = []
+    for row in conn.execute(sql, params).fetchall():
+        item = dict(row)
+        item['title'] = item['title'].upper()
+        item['tags'] = [r['name'] for r in conn.execute(
+            "SELECT name FROM tags WHERE item_id = ? ORDER BY name", (item['id'],))]
+        rows.append(item)
+    return rows
+
+
+def _list_filtered(conn, limit=None):
+    """A list function that drops rows after fetching them."""
+    rows = conn.execute("SELECT id, title, status, created FROM items ORDER BY id DESC").fetchall()
+    return [dict(r) for r in rows if r['id'] % 3]
+
+
+class PaginateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, title TEXT, status TEXT, created TEXT)")
+        self.conn.execute("CREATE TABLE tags (item_id INTEGER, name TEXT)")
+        for i in range(1, 26):
+            self.conn.execute("INSERT INTO items VALUES (?, ?, ?, ?)",
+                              (i, f'item {i}', 'done' if i % 2 else 'open', f'2026-01-{i % 7 + 1:02d}'))
+            self.conn.execute("INSERT INTO tags VALUES (?, ?)", (i, f'tag{i % 4}'))
+        dbquery._counts.clear()
+        dbpool._backends['pagetool'] = 'sqlite'
+
+    def tearDown(self):
+        dbpool._backends.pop('pagetool', None)
+        self.conn.close()
+
+    def _page(self, list_fn, page, per_page=10, **kwargs):
+        result = dbquery.paginate('pagetool', self.conn, list_fn, kwargs=kwargs,
+                                  page=page, per_page=per_page)
+        return result, list(result['items'])
+
+    def test_pages_match_list_function(self):
+        full = _list_with_tags(self.conn)
+        for page in (1, 2, 3):
+            result, items = self._page(_list_with_tags, page)
+            self.assertEqual(items, full[(page - 1) * 10:page * 10])
+            self.assertEqual(result['total'], len(full))
+
+    def test_pages_match_with_filter_arguments(self):
+        full = _list_with_tags(self.conn, status='open')
+        result, items = self._page(_list_with_tags, 1, status='open')
+        self.assertEqual(items, full[:10])
+        self.assertEqual(result['total'], len(full))
+
+    def test_python_side_filtering_falls_back(self):
+        full = _list_filtered(self.conn)
+        result, items = self._page(_list_filtered, 2)
+        self.assertEqual(items, full[10:20])
+        self.assertEqual(result['total'], len(full))
+
+    def test_keyset_first_page_matches_list_function(self):
+        full = sorted(_list_with_tags(self.conn), key=lambda r: r['id'], reverse=True)
+        result = dbquery.paginate_keyset('pagetool', self.conn, _list_with_tags,
+                                         keys=('id',), per_page=10)
+        self.assertEqual(list(result['items']), full[:10])
+
+
+
+def _list_named(conn, status=None, limit=None):
+    """A list function using named parameters."""
+    sql = "SELECT id, title, status, created FROM items WHERE status != :skip"
+    return [dict(r) for r in conn.execute(sql, {'skip': 'gone'}).fetchall()]
+
+
+def _list_twice(conn, limit=None):
+    """A list function that cannot be captured (two statements)."""
+    conn.execute("SELECT 1").fetchall()
+    return [dict(r) for r in conn.execute("SELECT id, title, status, created FROM items").fetchall()]
+
+
+class KeysetNullTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, title TEXT, status TEXT, created TEXT)")
+        self.conn.execute("CREATE TABLE tags (item_id INTEGER, name TEXT)")
+        for i in range(1, 12):
+            # Every third row has no date, including ids on page boundaries
+            created = None if i % 3 == 0 else f'2026-01-{i % 4 + 1:02d}'
+            self.conn.execute("INSERT INTO items VALUES (?, ?, 'open', ?)", (i, f'item {i}', created))
+        dbpool._backends['pagetool'] = 'sqlite'
+
+    def tearDown(self):
+        dbpool._backends.pop('pagetool', None)
+        self.conn.close()
+
+    def _expected(self, descending):
+        rows = [dict(r) for r in self.conn.execute("SELECT * FROM items")]
+        dated = sorted((r for r in rows if r['created'] is not None),
+                       key=lambda r: (r['created'], r['id']), reverse=descending)
+        undated = sorted((r for r in rows if r['created'] is None),
+                         key=lambda r: r['id'], reverse=descending)
+        return [r['id'] for r in dated + undated]
+
+    def _walk(self, list_fn, descending=True):
+        ids, cursor = [], None
+        for _ in range(20):
+            result = dbquery.paginate_keyset('pagetool', self.conn, list_fn, keys=('created', 'id'),
+                                             cursor=cursor, per_page=2, descending=descending)
+            ids += [r['id'] for r in result['items']]
+            cursor = result['next_cursor'].fn()
+            if cursor is None:
+                return ids
+        self.fail('cursor never ended')
+
+    def test_null_keys_cross_page_boundaries(self):
+        for descending in (True, False):
+            self.assertEqual(self._walk(_list_with_tags, descending), self._expected(descending))
+
+    def test_named_parameters(self):
+        self.assertEqual(self._walk(_list_named), self._expected(True))
+
+    def test_python_fallback(self):
+        for descending in (True, False):
+            self.assertEqual(self._walk(_list_twice, descending), self._expected(descending))
+
+
+if __name__ == '__main__':
+    unittest.main()
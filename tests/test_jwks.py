@@ -0,0 +1,129 @@
+"""Local JWT verification against a file:// JWKS document."""
+import base64
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from hurricanesoft_api import jwks
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _int_b64(value):
+    return _b64(value.to_bytes((value.bit_length() + 7) // 8, 'big'))
+
+
+def _is_prime(n, rng):
+    if n % 2 == 0:
+        return n == 2
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d, r = d // 2, r + 1
+    for _ in range(32):
+        x = pow(rng.randrange(2, n - 1), d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _rsa_key(bits=1024, seed=8017):
+    """A deterministic test key pair: (n, e, d)."""
+    rng = random.Random(seed)
+    e = 65537
+    while True:
+        primes = []
+        while len(primes) < 2:
+            p = rng.getrandbits(bits // 2) | (1 << (bits // 2 - 1)) | 1
+            if (p - 1) % e and _is_prime(p, rng):
+                primes.append(p)
+        p, q = primes
+        n = p * q
+        if p != q and n.bit_length() == bits:
+            return n, e, pow(e, -1, (p - 1) * (q - 1))
+
+
+KID = 'test-key'
+N, E, D = _rsa_key()
+
+
+def _sign(claims, kid=KID, d=D):
+    header = _b64(json.dumps({'alg': 'RS256', 'typ': 'JWT', 'kid': kid}).encode())
+    payload = _b64(json.dumps(claims).encode())
+    signed = f"{header}.{payload}".encode('ascii')
+    hash_fn, prefix = jwks._ALGORITHMS['RS256']
+    k = (N.bit_length() + 7) // 8
+    t = prefix + hash_fn(signed).digest()
+    encoded = b'\x00\x01' + b'\xff' * (k - len(t) - 3) + b'\x00' + t
+    signature = pow(int.from_bytes(encoded, 'big'), d, N).to_bytes(k, 'big')
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+class VerifyTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'keys': [{'kty': 'RSA', 'use': 'sig', 'alg': 'RS256', 'kid': KID,
+                                 'n': _int_b64(N), 'e': _int_b64(E)}]}, f)
+        self.lids = {'jwks_uri': 'file://' + self.path}
+        jwks._keysets.clear()
+
+    def tearDown(self):
+        jwks._keysets.clear()
+        os.unlink(self.path)
+
+    def _claims(self, **extra):
+        claims = {'sub': 'u-1', 'preferred_username': 'alice', 'exp': time.time() + 300}
+        claims.update(extra)
+        return claims
+
+    def test_valid_token(self):
+        claims = jwks.verify(_sign(self._claims()), self.lids)
+        self.assertEqual(claims['preferred_username'], 'alice')
+
+    def test_bad_signature(self):
+        token = _sign(self._claims(), d=D + 2)
+        with self.assertRaises(jwks.TokenError):
+            jwks.verify(token, self.lids)
+
+    def test_tampered_payload(self):
+        header, _, signature = _sign(self._claims()).split('.')
+        payload = _b64(json.dumps(self._claims(preferred_username='mallory')).encode())
+        with self.assertRaises(jwks.TokenError):
+            jwks.verify(f"{header}.{payload}.{signature}", self.lids)
+
+    def test_expired_token(self):
+        token = _sign(self._claims(exp=time.time() - jwks.LEEWAY - 60))
+        with self.assertRaises(jwks.TokenError):
+            jwks.verify(token, self.lids)
+
+    def test_missing_exp(self):
+        claims = self._claims()
+        del claims['exp']
+        with self.assertRaises(jwks.TokenError):
+            jwks.verify(_sign(claims), self.lids)
+
+    def test_unknown_kid(self):
+        with self.assertRaises(jwks.Unverifiable):
+            jwks.verify(_sign(self._claims(), kid='rotated'), self.lids)
+
+    def test_missing_username_falls_back_to_userinfo(self):
+        claims = self._claims()
+        del claims['preferred_username']
+        with self.assertRaises(jwks.Unverifiable):
+            jwks.verify(_sign(claims), self.lids)
+
+
+if __name__ == '__main__':
+    unittest.main()
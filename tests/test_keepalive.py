@@ -0,0 +1,74 @@
+"""Idle keep-alive connections must not hold pool workers."""
+import http.client
+import threading
+import time
+import unittest
+
+from hurricanesoft_api import server
+
+
+WORKERS = 2
+
+
+class IdleKeepAliveTest(unittest.TestCase):
+
+    def setUp(self):
+        self._timeout = server.APIHandler.timeout
+        server.APIHandler.timeout = 5
+        self.httpd = server.ThreadPoolHTTPServer(('127.0.0.1', 0), server.APIHandler,
+                                                 workers=WORKERS)
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.conns = []
+
+    def tearDown(self):
+        for conn in self.conns:
+            conn.close()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join(timeout=5)
+        server.APIHandler.timeout = self._timeout
+
+    def _get(self, conn):
+        conn.request('GET', '/api/version')
+        resp = conn.getresponse()
+        resp.read()
+        return resp
+
+    def _connect(self):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+        self.conns.append(conn)
+        return conn
+
+    def test_idle_connections_do_not_block_new_clients(self):
+        idle = [self._connect() for _ in range(WORKERS * 2)]
+        for conn in idle:
+            self.assertEqual(self._get(conn).status, 200)
+
+        start = time.monotonic()
+        resp = self._get(self._connect())
+        self.assertEqual(resp.status, 200)
+        self.assertLess(time.monotonic() - start, 1.0)
+
+        # The parked connections are still usable
+        for conn in idle:
+            self.assertEqual(self._get(conn).status, 200)
+
+    def test_pipelined_requests_are_all_answered(self):
+        conn = self._connect()
+        conn.connect()
+        conn.sock.sendall(b'GET /api/version HTTP/1.1\r\nHost: test\r\n\r\n' * 3)
+        # One reader for all three: an HTTPResponse per response would
+        # buffer (and drop) the bytes of the responses that follow it
+        rfile = conn.sock.makefile('rb')
+        for _ in range(3):
+            status = rfile.readline().split()[1]
+            headers = http.client.parse_headers(rfile)
+            rfile.read(int(headers['Content-Length']))
+            self.assertEqual(status, b'200')
+        rfile.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""The background log writer must survive failing outputs."""
+import io
+import logging
+import time
+import unittest
+
+from hurricanesoft_api import logger
+
+
+class _BrokenStream:
+    """A stdout whose reader went away."""
+
+    def write(self, data):
+        raise BrokenPipeError(32, 'Broken pipe')
+
+    def flush(self):
+        raise BrokenPipeError(32, 'Broken pipe')
+
+
+class _FailingFlush(io.StringIO):
+    """A log file on a full disk: writes are buffered, flushing fails."""
+
+    def flush(self):
+        raise OSError(28, 'No space left on device')
+
+
+def _record(n):
+    return logging.makeLogRecord({'name': 'hurricanesoft_api', 'levelno': logging.INFO,
+                                  'levelname': 'INFO', 'msg': f'line {n}'})
+
+
+class WriterFailureTest(unittest.TestCase):
+
+    def setUp(self):
+        self._raise = logging.raiseExceptions
+        logging.raiseExceptions = False     # keep handleError quiet
+
+    def tearDown(self):
+        logging.raiseExceptions = self._raise
+
+    def _run_writer(self, broken):
+        good = io.StringIO()
+        outputs = [logger._StreamOutput(broken), logger._StreamOutput(good)]
+        writer = logger._Writer(outputs, maxsize=100, block=False)
+        writer.start()
+        for n in range(20):
+            writer.handler.handle(_record(n))
+            if n == 0:
+                time.sleep(0.1)     # let the first batch fail on its own
+        writer.stop()
+        self.assertFalse(writer._thread.is_alive())
+        self.assertEqual(writer.handler.dropped, 0)
+        return good.getvalue().splitlines()
+
+    def test_broken_pipe(self):
+        self.assertEqual(self._run_writer(_BrokenStream()), [f'line {n}' for n in range(20)])
+
+    def test_failing_flush(self):
+        self.assertEqual(self._run_writer(_FailingFlush()), [f'line {n}' for n in range(20)])
+
+
+if __name__ == '__main__':
+    unittest.main()